@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Static asset pipeline for Apni Holidays
+Builds minified, content-hashed copies of static/css and static/js with
+.gz/.br siblings, and serves them with far-future immutable caching.
+
+Build before starting the app:
+    python assets.py
+"""
+
+import os
+import re
+import json
+import gzip
+import hashlib
+import mimetypes
+from flask import send_from_directory, url_for, abort
+
+from compression import brotli, choose_encoding
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_PATH = os.path.join(DIST_DIR, 'manifest.json')
+SOURCE_DIRS = ('css', 'js')
+ONE_YEAR = 365 * 24 * 60 * 60
+
+# Logical name ('css/index.css') -> fingerprinted name ('css/index.3f2a9c1b.css')
+_manifest = {}
+
+
+# ------------------ Build ------------------
+
+def minify_css(text):
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    text = re.sub(r':\s+', ':', text)
+    return text.replace(';}', '}').strip()
+
+
+def minify_js(text):
+    """Conservative: drop indentation, blank lines and whole-line comments"""
+    lines = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line and not line.startswith('//'):
+            lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+
+def build_asset(logical_name):
+    """Write the fingerprinted file and its compressed siblings, return its name"""
+    with open(os.path.join(STATIC_DIR, logical_name), encoding='utf-8') as f:
+        source = f.read()
+    minified = minify_css(source) if logical_name.endswith('.css') else minify_js(source)
+    data = minified.encode('utf-8')
+
+    digest = hashlib.sha256(data).hexdigest()[:10]
+    root, ext = os.path.splitext(logical_name)
+    built_name = f"{root}.{digest}{ext}"
+    built_path = os.path.join(DIST_DIR, built_name)
+    os.makedirs(os.path.dirname(built_path), exist_ok=True)
+
+    with open(built_path, 'wb') as f:
+        f.write(data)
+    with open(built_path + '.gz', 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(built_path + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+    return built_name
+
+
+def build():
+    manifest = {}
+    for folder in SOURCE_DIRS:
+        source_dir = os.path.join(STATIC_DIR, folder)
+        for filename in sorted(os.listdir(source_dir)):
+            if filename.endswith(('.css', '.js')):
+                logical_name = f"{folder}/{filename}"
+                manifest[logical_name] = build_asset(logical_name)
+                print(f"  {logical_name} -> dist/{manifest[logical_name]}")
+
+    os.makedirs(DIST_DIR, exist_ok=True)
+    with open(MANIFEST_PATH, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    print(f"✅ Built {len(manifest)} static assets into {DIST_DIR}")
+    return manifest
+
+
+# ------------------ Runtime ------------------
+
+def load_manifest():
+    global _manifest
+    try:
+        with open(MANIFEST_PATH) as f:
+            _manifest = json.load(f)
+    except FileNotFoundError:
+        print("⚠️ No static asset manifest, serving unversioned files (run: python assets.py)")
+        _manifest = {}
+    except Exception as e:
+        print(f"Error loading asset manifest: {e}")
+        _manifest = {}
+    return _manifest
+
+
+def static_url(filename):
+    """URL for a static asset, fingerprinted when it has been built"""
+    built_name = _manifest.get(filename)
+    if built_name:
+        return url_for('send_asset', filename=built_name)
+    return url_for('static', filename=filename)
+
+
+def send_asset(filename):
+    """Serve a fingerprinted asset, precompressed when the client allows it"""
+    if filename.endswith(('.gz', '.br')) or not os.path.isfile(os.path.join(DIST_DIR, filename)):
+        abort(404)
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    encoding = choose_encoding()
+    suffix = {'br': '.br', 'gzip': '.gz'}.get(encoding)
+    if suffix and not os.path.isfile(os.path.join(DIST_DIR, filename + suffix)):
+        encoding = suffix = None
+
+    response = send_from_directory(DIST_DIR, filename + (suffix or ''),
+                                   mimetype=mimetype, max_age=ONE_YEAR)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    # The name changes whenever the content does, so the file never needs revalidating
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def init_assets(app):
+    load_manifest()
+    app.add_url_rule('/static/dist/<path:filename>', 'send_asset', send_asset)
+    app.add_template_global(static_url)
+
+
+if __name__ == "__main__":
+    build()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark: filtering and sorting the package catalog with Python loops vs
+the NumPy columnar snapshot, at 1k/10k/100k synthetic packages.
+
+"loop" is the plain path: matches_conditions() over every package dict,
+then sort by the listing key and slice one page. "columnar" is
+CatalogColumns.select() over the prebuilt snapshot; the one-off cost of
+building the snapshot (paid once per catalog change) is shown separately.
+
+Usage: python benchmarks/bench_catalog.py [repeats]
+"""
+
+import os
+import sys
+import time
+import random
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import (
+    package_filters, listing_order, order_key, matches_conditions, derived_fields
+)
+from catalog_columns import CatalogColumns, np
+
+SIZES = (1000, 10000, 100000)
+PAGE_SIZE = 12
+DESTINATIONS = ['Thailand', 'Dubai', 'Bali', 'Singapore', 'Maldives', 'Turkey', 'Sri Lanka', 'Vietnam']
+CASES = [
+    ('all packages', {}),
+    ('destination', {'destination': 'thailand'}),
+    ('dest+days+budget', {'destination': 'bali', 'duration': '6-10', 'budget': 'under-50k'}),
+]
+
+
+def make_catalog(n, seed=42):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    catalog = {}
+    for i in range(n):
+        price = float(rng.randrange(15000, 250000, 500))
+        package = {
+            'id': f"pkg_{i:06d}",
+            'title': f"Package {i}",
+            'destination': rng.choice(DESTINATIONS),
+            'days': rng.randint(2, 14),
+            'price': price,
+            'discount_price': price * 0.85 if rng.random() < 0.4 else None,
+            'featured': rng.random() < 0.05,
+            'status': 'active' if rng.random() < 0.9 else 'inactive',
+            'created_at': start + timedelta(minutes=rng.randrange(0, 60 * 24 * 600)),
+        }
+        package.update(derived_fields(package))
+        catalog[package['id']] = package
+    return catalog
+
+
+def loop_page(catalog, filters, order):
+    key = order_key(order)
+    packages = [p for p in catalog.values() if matches_conditions(p, filters)]
+    packages.sort(key=key)
+    return packages[:PAGE_SIZE]
+
+
+def timed(func, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main_bench():
+    if np is None:
+        print("NumPy is not installed: pip install numpy")
+        return
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f"{'packages':>9}  {'query':<18}{'loop (ms)':>11}{'columnar (ms)':>15}{'speedup':>9}")
+    for n in SIZES:
+        catalog = make_catalog(n)
+        build_ms, columns = timed(lambda: CatalogColumns(catalog), 1)
+        for label, params in CASES:
+            filters = package_filters(**params)
+            order = listing_order(filters)
+            loop_ms, expected = timed(lambda: loop_page(catalog, filters, order), repeats)
+            col_ms, actual = timed(lambda: columns.select(filters, order, limit=PAGE_SIZE), repeats)
+            assert [p['id'] for p in actual] == [p['id'] for p in expected], label
+            print(f"{n:>9}  {label:<18}{loop_ms:>11.2f}{col_ms:>15.2f}{loop_ms / col_ms:>8.1f}x")
+        print(f"{n:>9}  {'(snapshot build)':<18}{'':>11}{build_ms:>15.2f}")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark: password verification latency under each hash policy.
+
+Every login pays one verification, so this is the per-login CPU cost of a
+PASSWORD_HASH_METHOD setting (see hash_policy.py). Times are for a single
+verification run inline on this machine, without the hashing pool.
+argon2 policies are skipped unless argon2-cffi is installed.
+
+Usage: python benchmarks/bench_password_hash.py [repeats]
+"""
+
+import os
+import sys
+import time
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hash_policy import generate_hash, check_hash, PasswordHasher, PASSWORD_HASH_METHOD
+
+POLICIES = (
+    'pbkdf2:sha256:600000',
+    'pbkdf2:sha256:1000000',
+    'scrypt:16384:8:1',
+    'scrypt:32768:8:1',
+    'argon2:2:19456:1',
+    'argon2:3:65536:4',
+)
+PASSWORD = 'Rajesh@123'
+
+
+def main_bench():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    print(f"current policy: {PASSWORD_HASH_METHOD}")
+    print(f"{'policy':<24}{'median (ms)':>13}{'min (ms)':>10}{'max (ms)':>10}")
+    for method in POLICIES:
+        if method.startswith('argon2:') and PasswordHasher is None:
+            print(f"{method:<24}{'skipped, pip install argon2-cffi':>33}")
+            continue
+        stored = generate_hash(PASSWORD, method)
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            assert check_hash(stored, PASSWORD)
+            times.append((time.perf_counter() - start) * 1000)
+        print(f"{method:<24}{statistics.median(times):>13.1f}{min(times):>10.1f}{max(times):>10.1f}")
+
+
+if __name__ == "__main__":
+    main_bench()
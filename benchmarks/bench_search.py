@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: package search latency at 1k/10k/50k synthetic packages.
+
+"query" is one search_packages() call for a page of results, ranked by
+BM25 and limited with the top-k heap, as /packages?search= runs it; its
+cost grows with the number of packages the query matches, shown alongside.
+"build" is indexing the whole catalog once. "resync" is syncing after a
+reload that rebuilt every package dict with unchanged text, which is
+what the CATALOG_TTL path and mock mode do.
+
+Usage: python benchmarks/bench_search.py [repeats]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import package_filters
+from search_index import PackageSearchIndex, search_packages
+import search_index
+
+SIZES = (1000, 10000, 50000)
+PAGE_SIZE = 12
+DESTINATIONS = ['Thailand', 'Dubai', 'Bali', 'Singapore', 'Maldives', 'Turkey', 'Sri Lanka', 'Vietnam']
+# Common travel words first, then filler words, drawn with a Zipf-like skew
+WORDS = ('beach resort island tour city temple desert safari cruise dinner spa market '
+         'snorkeling sunset villa breakfast transfer sightseeing heritage adventure hotel').split()
+WORDS += [f"word{i}" for i in range(5000)]
+WORD_WEIGHTS = [1 / rank for rank in range(1, len(WORDS) + 1)]
+QUERIES = [
+    ('prefix', 'thai', {}),
+    ('two words', 'bali beach', {}),
+    ('phrase', '"city tour"', {}),
+    ('word+filters', 'resort', {'duration': '6-10', 'budget': 'under-50k'}),
+]
+
+
+def make_catalog(n, seed=7):
+    rng = random.Random(seed)
+    catalog = {}
+    for i in range(n):
+        destination = rng.choice(DESTINATIONS)
+        price = float(rng.randrange(15000, 250000, 500))
+        catalog[f"pkg_{i:06d}"] = {
+            'id': f"pkg_{i:06d}",
+            'title': f"{destination} {' '.join(rng.choices(WORDS, WORD_WEIGHTS, k=3))}",
+            'destination': destination,
+            'destination_key': destination.lower(),
+            'highlights': [' '.join(rng.choices(WORDS, WORD_WEIGHTS, k=3)) for _ in range(3)],
+            'search_text': ' '.join(rng.choices(WORDS, WORD_WEIGHTS, k=60)),
+            'days': rng.randint(2, 14),
+            'price': price,
+            'effective_price': price,
+            'status': 'active',
+        }
+    return catalog
+
+
+def timed(func, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main_bench():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    print(f"{'packages':>9}  {'case':<14}{'ms':>10}{'matches':>9}")
+    for n in SIZES:
+        catalog = make_catalog(n)
+        search_index.package_index = index = PackageSearchIndex()
+        print(f"{n:>9}  {'build':<14}{timed(lambda: index.sync(catalog), 1):>10.2f}")
+        reloaded = {pid: dict(pkg) for pid, pkg in catalog.items()}
+        print(f"{n:>9}  {'resync':<14}{timed(lambda: index.sync(reloaded), 1):>10.2f}")
+        for label, query, params in QUERIES:
+            filters = package_filters(**params)
+            ms = timed(lambda: search_packages(query, filters, limit=PAGE_SIZE + 1, catalog=reloaded), repeats)
+            matches = len(index.search(query, reloaded))
+            print(f"{n:>9}  {label:<14}{ms:>10.2f}{matches:>9}")
+
+
+if __name__ == "__main__":
+    main_bench()
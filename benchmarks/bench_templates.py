@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: requests/sec with per-request template compilation vs the
+precompiled template registry.
+
+"before" disables the Jinja template cache so every render compiles the
+page from source, which is what render_template_string used to do.
+"after" renders from the templates compiled at startup. The page cache is
+cleared before every request so both measure rendering, not cache hits.
+
+Usage: python benchmarks/bench_templates.py [requests_per_url]
+"""
+
+import os
+import sys
+import time
+import contextlib
+import io
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Force the mock data backend so the numbers measure rendering, not the network
+import firestore_utils
+from unittest.mock import Mock
+firestore_utils.db = Mock(_is_mock=True)
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import main
+from response_cache import page_cache
+
+URLS = ['/', '/packages', '/admin/users']
+
+
+def make_client():
+    client = main.app.test_client()
+    with client.session_transaction() as sess:
+        sess['is_admin'] = True
+        sess['admin_name'] = 'Bench Admin'
+        sess['user_id'] = 'bench_admin'
+        sess['user_name'] = 'Bench Admin'
+        sess['user_email'] = 'admin@apniholidays.com'
+    return client
+
+
+def run(client, url, n):
+    with contextlib.redirect_stdout(io.StringIO()):
+        client.get(url)  # warm up
+        start = time.perf_counter()
+        for _ in range(n):
+            page_cache.clear()
+            response = client.get(url)
+            assert response.status_code == 200, (url, response.status_code)
+            response.get_data()  # /admin/users is streamed, render all of it
+            response.close()
+        elapsed = time.perf_counter() - start
+    return n / elapsed
+
+
+def main_bench():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    env = main.app.jinja_env
+    compiled_cache = env.cache
+    client = make_client()
+
+    print(f"{'URL':<16}{'before (req/s)':>16}{'after (req/s)':>16}{'speedup':>10}")
+    for url in URLS:
+        env.cache = None
+        before = run(client, url, n)
+        env.cache = compiled_cache
+        after = run(client, url, n)
+        print(f"{url:<16}{before:>16.1f}{after:>16.1f}{after / before:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Package catalog helpers for Apni Holidays
+Filtering, ordering and cursor pagination shared by the /packages page and the JSON API
+"""
+
+import json
+import math
+import base64
+import operator
+from datetime import datetime, timezone
+
+
+# Sidebar filter values as Firestore-style (field, op, value) conditions
+DURATION_FILTERS = {
+    '3-5': [('days', '>=', 3), ('days', '<=', 5)],
+    '6-10': [('days', '>=', 6), ('days', '<=', 10)],
+    '10+': [('days', '>', 10)],
+}
+BUDGET_FILTERS = {
+    'under-50k': [('effective_price', '<', 50000)],
+    '50k-1l': [('effective_price', '>=', 50000), ('effective_price', '<=', 100000)],
+    '1l+': [('effective_price', '>', 100000)],
+}
+_OPERATORS = {'==': operator.eq, '<': operator.lt, '<=': operator.le,
+              '>': operator.gt, '>=': operator.ge}
+
+
+def effective_price(pkg):
+    return pkg.get('discount_price') or pkg.get('price', 0)
+
+
+def normalize_destination(destination):
+    """Lookup key for a destination: 'Sri  Lanka ' -> 'sri lanka'"""
+    return ' '.join(str(destination or '').lower().split())
+
+
+# What list views need: card fields plus the fields listings filter and
+# sort on. Everything else (itinerary, inclusions, ...) is only read with
+# the full document on the details page.
+SUMMARY_FIELDS = (
+    'id', 'title', 'destination', 'destination_key', 'days', 'price', 'discount_price',
+    'effective_price', 'image_url', 'highlights', 'excerpt', 'search_text', 'featured', 'status',
+    'created_at', 'updated_at',
+)
+EXCERPT_LENGTH = 120
+# Summary fields for the search index only, left out of API responses
+INTERNAL_FIELDS = ('search_text',)
+
+
+def excerpt(text, length=EXCERPT_LENGTH):
+    text = str(text or '')
+    return text[:length] + '...' if len(text) > length else text
+
+
+def summarize(pkg):
+    """The summary of a full package document, as stored in package_summaries"""
+    full = dict(pkg, **derived_fields(pkg))
+    full['excerpt'] = excerpt(pkg.get('description'))
+    full['search_text'] = search_text(pkg)
+    return {field: full[field] for field in SUMMARY_FIELDS if field in full}
+
+
+def search_text(pkg):
+    """The full description and itinerary, whitespace collapsed, for search"""
+    return ' '.join(' '.join(str(pkg.get(field) or '').split())
+                    for field in ('description', 'itinerary')).strip()
+
+
+def derived_fields(pkg):
+    """Stored copies of computed values so Firestore can filter on them"""
+    return {
+        'effective_price': effective_price(pkg),
+        'destination_key': normalize_destination(pkg.get('destination')),
+    }
+
+
+def package_filters(destination='', duration='', budget='', status='active'):
+    """The /packages sidebar filters as a list of (field, op, value) conditions"""
+    filters = []
+    if status:
+        filters.append(('status', '==', status))
+    if destination:
+        filters.append(('destination_key', '==', normalize_destination(destination)))
+    filters.extend(DURATION_FILTERS.get(duration, []))
+    filters.extend(BUDGET_FILTERS.get(budget, []))
+    return filters
+
+
+def field_value(pkg, field):
+    if field in pkg:
+        return pkg[field]
+    if field == 'effective_price':
+        return effective_price(pkg)
+    if field == 'destination_key':
+        return normalize_destination(pkg.get('destination'))
+    return None
+
+
+def matches_conditions(pkg, filters):
+    """Evaluate package_filters() conditions the way Firestore would"""
+    for field, op, expected in filters:
+        value = field_value(pkg, field)
+        try:
+            if value is None or not _OPERATORS[op](value, expected):
+                return False
+        except TypeError:
+            return False
+    return True
+
+
+def _timestamp(value):
+    if isinstance(value, datetime):
+        try:
+            return value.timestamp()
+        except (OverflowError, ValueError):
+            return 0.0
+    return 0.0
+
+
+# Listing orders as (field, descending) pairs, ending in the unique id.
+# order_key() turns one into a sort key that ascends in listing order,
+# which is also what a cursor stores.
+LISTING_ORDER = (('featured', True), ('created_at', False), ('id', False))
+NEWEST_FIRST = (('created_at', True), ('id', False))
+
+
+def sort_value(pkg, field):
+    if field == 'featured':
+        return bool(pkg.get('featured', False))
+    if field == 'created_at':
+        return _timestamp(pkg.get('created_at'))
+    if field == 'id':
+        return str(pkg.get('id', ''))
+    return field_value(pkg, field)
+
+
+def _directed(value, descending):
+    if not descending:
+        return value
+    return (not value) if isinstance(value, bool) else -value
+
+
+def order_key(order):
+    def key(pkg):
+        return tuple(_directed(sort_value(pkg, field), descending) for field, descending in order)
+    return key
+
+
+def listing_order(filters=()):
+    """LISTING_ORDER with any range-filtered fields ordered just before the id.
+
+    Firestore needs range-filtered fields in the ordering; putting them
+    after created_at leaves the order the same in practice.
+    """
+    ranges = sorted({field for field, op, _ in filters if op != '=='})
+    return LISTING_ORDER[:-1] + tuple((field, False) for field in ranges) + LISTING_ORDER[-1:]
+
+
+def _cursor_value_ok(field, value):
+    if field == 'featured':
+        return isinstance(value, bool)
+    if field == 'id':
+        return isinstance(value, str)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    try:
+        return math.isfinite(float(value))
+    except OverflowError:
+        return False
+
+
+def cursor_fields(order, after):
+    """Field values for Firestore's start_after() from a decoded cursor.
+
+    Raises ValueError when ``after`` does not match ``order`` in length or
+    element types, so a tampered cursor is rejected on every path.
+    """
+    if len(after) != len(order):
+        raise ValueError("Cursor does not match this listing")
+    fields = {}
+    for (field, descending), value in zip(order, after):
+        if not _cursor_value_ok(field, value):
+            raise ValueError(f"Invalid cursor value for {field}: {value!r}")
+        value = _directed(value, descending)
+        if field == 'created_at':
+            try:
+                value = datetime.fromtimestamp(value, tz=timezone.utc)
+            except (OverflowError, OSError, ValueError):
+                raise ValueError(f"Invalid cursor value for {field}: {value!r}")
+        fields[field] = value
+    return fields
+
+
+# Featured first, then by created_at, with the id as a stable tie-breaker
+sort_key = order_key(LISTING_ORDER)
+
+
+# ------------------ Cursor pagination ------------------
+
+def encode_cursor(pkg, key=sort_key):
+    """Opaque cursor pointing just after ``pkg`` in ``key`` order"""
+    raw = json.dumps(list(key(pkg)), separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        after = json.loads(raw)
+        if not isinstance(after, list) or not after:
+            raise ValueError
+        return tuple(after)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+def paginate(packages, limit, cursor=None, key=sort_key):
+    """One page of ``packages`` (already sorted by ``key``) after ``cursor``.
+
+    Returns (page, next_cursor); next_cursor is None on the last page.
+    Keying on the sort key rather than an offset keeps pages stable when
+    packages are added or removed between requests.
+    """
+    if cursor:
+        after = decode_cursor(cursor)
+        try:
+            if packages and len(key(packages[0])) != len(after):
+                raise TypeError
+            packages = [pkg for pkg in packages if key(pkg) > after]
+        except TypeError:
+            # A cursor from a differently ordered listing
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+    page = packages[:limit]
+    next_cursor = encode_cursor(page[-1], key) if len(packages) > limit else None
+    return page, next_cursor
+
+
+# ------------------ JSON serialization ------------------
+
+def project(pkg, fields=None):
+    """JSON-ready copy of ``pkg`` limited to ``fields`` (id is always kept)"""
+    if fields:
+        keys = ['id'] + [f for f in fields if f != 'id' and f not in INTERNAL_FIELDS]
+    else:
+        keys = [key for key in pkg.keys() if key not in INTERNAL_FIELDS]
+    result = {}
+    for key in keys:
+        if key not in pkg:
+            continue
+        value = pkg[key]
+        result[key] = value.isoformat() if isinstance(value, datetime) else value
+    return result
+
+
+def parse_fields(value):
+    return [f.strip() for f in value.split(',') if f.strip()] if value else None
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Columnar catalog snapshot for Apni Holidays
+NumPy arrays of the fields the listings filter and sort on, so large
+catalogs are filtered with boolean masks and ordered with lexsort instead
+of Python loops over package dicts. Optional: without NumPy, or below
+COLUMNAR_MIN_PACKAGES, callers keep using the plain loops in catalog.py.
+"""
+
+import os
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # Optional, plain Python filtering without it
+    np = None
+
+from catalog import field_value, sort_value
+
+COLUMNAR_MIN_PACKAGES = int(os.environ.get("COLUMNAR_MIN_PACKAGES", "1000"))
+
+# Numeric columns hold NaN where the field is missing, text columns ""
+NUMERIC_COLUMNS = ('days', 'price', 'discount_price', 'effective_price', 'created_at')
+TEXT_COLUMNS = ('id', 'status', 'destination_key')
+
+_OPERATORS = {
+    '==': lambda column, value: column == value,
+    '<': lambda column, value: column < value,
+    '<=': lambda column, value: column <= value,
+    '>': lambda column, value: column > value,
+    '>=': lambda column, value: column >= value,
+}
+
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return float('nan')
+    return float(value)
+
+
+class CatalogColumns:
+    """Column arrays for one catalog dict, row i describing packages[i]"""
+
+    def __init__(self, catalog):
+        self.packages = list(catalog.values())
+        self.columns = {}
+        for field in NUMERIC_COLUMNS:
+            if field == 'created_at':
+                values = [sort_value(pkg, field) for pkg in self.packages]
+            else:
+                values = [_number(field_value(pkg, field)) for pkg in self.packages]
+            self.columns[field] = np.array(values, dtype=np.float64)
+        for field in TEXT_COLUMNS:
+            values = [sort_value(pkg, field) if field == 'id' else field_value(pkg, field)
+                      for pkg in self.packages]
+            self.columns[field] = np.array([v if isinstance(v, str) else '' for v in values], dtype=str)
+        self.columns['featured'] = np.array([pkg.get('featured') is True for pkg in self.packages], dtype=bool)
+        # Rank of each id in sorted order, for sorting by id inside lexsort
+        self.id_rank = np.empty(len(self.packages), dtype=np.int64)
+        self.id_rank[np.argsort(self.columns['id'], kind='stable')] = np.arange(len(self.packages))
+
+    def __len__(self):
+        return len(self.packages)
+
+    def mask(self, filters):
+        """Boolean mask of the rows matching (field, op, value) conditions"""
+        mask = np.ones(len(self.packages), dtype=bool)
+        for field, op, value in filters:
+            column = self.columns[field]
+            if column.dtype == np.float64:
+                value = _number(value)
+            mask &= _OPERATORS[op](column, value)
+        return mask
+
+    def _directed(self, field, descending, rows):
+        column = self.columns[field][rows]
+        if not descending:
+            return column
+        if column.dtype == bool:
+            return ~column
+        if column.dtype == np.float64:
+            return -column
+        raise ValueError(f"Can't sort {field} descending")
+
+    def select(self, filters, order=None, after=None, limit=None):
+        """Packages matching ``filters``, in ``order`` after the ``after`` key.
+
+        ``order`` and ``after`` follow catalog.order_key(); without an
+        order the packages come back in catalog order.
+        """
+        mask = self.mask(filters)
+        rows = np.flatnonzero(mask)
+        if order:
+            if after is not None:
+                # Lexicographic (key > after), one column at a time
+                greater = np.zeros(len(rows), dtype=bool)
+                equal = np.ones(len(rows), dtype=bool)
+                for (field, descending), value in zip(order, after):
+                    column = self._directed(field, descending, rows)
+                    if column.dtype == bool:
+                        value = bool(value)
+                    greater |= equal & (column > value)
+                    equal &= column == value
+                rows = rows[greater]
+            keys = [self.id_rank[rows] if field == 'id' else self._directed(field, descending, rows)
+                    for field, descending in order]
+            rows = rows[np.lexsort(keys[::-1])]
+        if limit is not None:
+            rows = rows[:limit]
+        return [self.packages[i] for i in rows]
+
+
+_snapshot = None
+_snapshot_source = None
+_lock = threading.Lock()
+
+
+def catalog_columns(catalog):
+    """The columnar snapshot of ``catalog``, or None when it isn't worth using.
+
+    Snapshots are rebuilt only when the catalog dict is replaced.
+    """
+    global _snapshot, _snapshot_source
+    if np is None or len(catalog) < COLUMNAR_MIN_PACKAGES:
+        return None
+    with _lock:
+        if catalog is not _snapshot_source:
+            _snapshot = CatalogColumns(catalog)
+            _snapshot_source = catalog
+        return _snapshot
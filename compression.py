@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Response compression for Apni Holidays
+gzip/brotli for HTML and JSON responses, negotiated from Accept-Encoding
+"""
+
+import os
+import gzip
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Optional, gzip only without it
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", "500"))
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/xml', 'text/javascript',
+    'application/javascript', 'application/json', 'application/xml', 'image/svg+xml',
+}
+
+# On-the-fly responses favour speed; cached bodies are compressed once, so go for size
+FAST_LEVELS = {'br': 5, 'gzip': 6}
+CACHED_LEVELS = {'br': 11, 'gzip': 9}
+
+
+def supported_encodings():
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def choose_encoding():
+    """Best encoding the client accepts, or None for identity"""
+    return request.accept_encodings.best_match(supported_encodings())
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def should_compress(response):
+    return (
+        response.status_code == 200
+        and not response.direct_passthrough
+        and 'Content-Encoding' not in response.headers
+        and response.mimetype in COMPRESSIBLE_TYPES
+    )
+
+
+def gzip_stream(chunks):
+    """gzip a streamed body, flushing after each chunk so it still streams"""
+    compressor = zlib.compressobj(FAST_LEVELS['gzip'], zlib.DEFLATED, 31)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def encode_response(response, cache=None):
+    """Compress ``response`` in place for the client's Accept-Encoding.
+
+    ``cache`` is an optional dict of already-compressed bodies by encoding
+    (kept alongside a response-cache entry), so a cached page is compressed
+    once and then served as stored bytes on every hit.
+    """
+    response.vary.add('Accept-Encoding')
+    if not should_compress(response):
+        return response
+
+    if response.is_streamed:
+        # Size is unknown up front; streamed pages are the big ones anyway
+        if request.accept_encodings['gzip']:
+            response.response = gzip_stream(response.response)
+            response.headers['Content-Encoding'] = 'gzip'
+            response.headers.pop('Content-Length', None)
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+
+    encoding = choose_encoding()
+    if encoding is None:
+        return response
+
+    if cache is not None:
+        compressed = cache.get(encoding)
+        if compressed is None:
+            compressed = cache[encoding] = compress(body, encoding, CACHED_LEVELS[encoding])
+    else:
+        compressed = compress(body, encoding, FAST_LEVELS[encoding])
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    # The compressed bytes are a different representation of the same page
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    """Compress every eligible response on its way out"""
+    app.after_request(encode_response)
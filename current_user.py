@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Current user for Apni Holidays
+Resolves the logged-in user once per request into flask.g (g.user_id,
+g.user, g.is_admin), from the short-lived per-worker user cache rather than
+a Firestore query on every page view.
+"""
+
+from flask import g, request, session
+
+from firestore_utils import get_user_cached
+
+# Static files, including the built bundles served by assets.send_asset
+ASSET_ENDPOINTS = ('static', 'send_asset')
+
+
+def load_current_user():
+    g.user_id = session.get('user_id')
+    g.user = None
+    g.is_admin = bool(session.get('is_admin'))
+    if g.user_id is None or request.endpoint in ASSET_ENDPOINTS:
+        return
+
+    g.user = get_user_cached(g.user_id)
+    if not g.is_admin and g.user and g.user.get('role') == 'admin':
+        # Promoted since logging in
+        g.is_admin = True
+        session['is_admin'] = True
+
+
+def init_current_user(app):
+    """Register the loader; call after init_timing so its reads are timed"""
+    app.before_request(load_current_user)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Facet counts for Apni Holidays
+Active packages per destination, duration bucket and budget bucket for the
+/packages filters, kept up to date as packages change instead of being
+counted on every request.
+"""
+
+import os
+import threading
+from datetime import datetime
+
+from catalog import DURATION_FILTERS, BUDGET_FILTERS, matches_conditions, normalize_destination
+from firestore_utils import (
+    init_firestore, on_package_change, on_package_write, get_package_by_id, get_package_catalog,
+    catalog_is_live
+)
+
+# Also write the counts to the stats/facets document after every package write
+FACETS_PERSIST = os.environ.get("FACETS_PERSIST", "false").lower() == "true"
+
+
+def _bucket(pkg, buckets):
+    for name, conditions in buckets.items():
+        if matches_conditions(pkg, conditions):
+            return name
+    return None
+
+
+def facet_values(pkg):
+    """(destination key, destination name, duration bucket, budget bucket),
+    or None for packages that aren't listed"""
+    if not pkg or pkg.get('status') != 'active':
+        return None
+    name = ' '.join(str(pkg.get('destination') or '').split())
+    return (normalize_destination(name), name,
+            _bucket(pkg, DURATION_FILTERS), _bucket(pkg, BUDGET_FILTERS))
+
+
+class FacetCounts:
+    """Counts maintained from each package's contribution.
+
+    Built once from the in-memory catalog, then adjusted per package as
+    on_package_change reports writes, so a count never needs a scan.
+    Without a live catalog listener, writes made by other workers aren't
+    reported, so the counts are rebuilt when the catalog reloads instead.
+    """
+
+    def __init__(self):
+        self.destination = {}   # destination key -> count
+        self.names = {}         # destination key -> display name
+        self.duration = {}      # DURATION_FILTERS key -> count
+        self.budget = {}        # BUDGET_FILTERS key -> count
+        self.version = 0
+        self._contributions = {}  # package_id -> facet_values()
+        self._source = None
+        self._lock = threading.Lock()
+
+    def _count(self, values, delta):
+        key, name, duration, budget = values
+        for counts, bucket in ((self.destination, key), (self.duration, duration), (self.budget, budget)):
+            if not bucket:
+                continue
+            counts[bucket] = counts.get(bucket, 0) + delta
+            if counts[bucket] <= 0:
+                del counts[bucket]
+        if key in self.destination:
+            self.names.setdefault(key, name)
+        else:
+            self.names.pop(key, None)
+
+    def _set(self, package_id, values):
+        old = self._contributions.pop(package_id, None)
+        if old:
+            self._count(old, -1)
+        if values:
+            self._count(values, 1)
+            self._contributions[package_id] = values
+
+    def _rebuild(self, catalog):
+        self.destination, self.names, self.duration, self.budget = {}, {}, {}, {}
+        self._contributions = {}
+        for package_id, package in catalog.items():
+            self._set(package_id, facet_values(package))
+        self._source = catalog
+        self.version += 1
+
+    def _ensure_loaded(self):
+        if self._source is not None and catalog_is_live():
+            return
+        catalog = get_package_catalog()
+        if catalog is not self._source:
+            self._rebuild(catalog)
+
+    def update(self, package_id, package):
+        with self._lock:
+            if self._source is None:
+                return  # Not built yet, the first read will see the change
+            self._set(package_id, facet_values(package))
+            self.version += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._source = None
+
+    def snapshot(self):
+        """Counts for templates; destinations also as (key, name, count) by name"""
+        with self._lock:
+            self._ensure_loaded()
+            return {
+                'destinations': sorted(((key, self.names.get(key, key), count)
+                                        for key, count in self.destination.items()),
+                                       key=lambda item: item[1].lower()),
+                'destination_counts': dict(self.destination),
+                'duration': dict(self.duration),
+                'budget': dict(self.budget),
+                'version': self.version,
+            }
+
+
+facet_counts = FacetCounts()
+
+
+def save_facets():
+    """Write the current counts to the stats/facets document"""
+    try:
+        db = init_firestore()
+        if hasattr(db, '_is_mock') or not hasattr(db, 'collection'):
+            return
+        counts = facet_counts.snapshot()
+        db.collection('stats').document('facets').set({
+            'destination': counts['destination_counts'],
+            'duration': counts['duration'],
+            'budget': counts['budget'],
+            'updated_at': datetime.now(),
+        })
+    except Exception as e:
+        print(f"Error saving facet counts: {e}")
+
+
+@on_package_change
+def _on_package_change(package_id):
+    if package_id is None:
+        facet_counts.invalidate()
+    else:
+        # With a live listener every write is reported again once it has
+        # reached the catalog, so the catalog copy is always the one to count
+        package = get_package_catalog().get(package_id) if catalog_is_live() else get_package_by_id(package_id)
+        facet_counts.update(package_id, package)
+
+
+@on_package_write
+def _on_package_write(package_id):
+    # Only the worker that made the write saves, instead of every worker
+    # rewriting the document when its catalog listener sees the change
+    if not FACETS_PERSIST:
+        return
+    if package_id is not None and catalog_is_live():
+        # The listener may not have delivered this write yet
+        facet_counts.update(package_id, get_package_by_id(package_id))
+    save_facets()
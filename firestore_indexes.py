@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Firestore composite index definitions for Apni Holidays
+Generates firestore.indexes.json from the queries the app runs, so the
+indexes always match the /packages filters in catalog.py.
+
+    python firestore_indexes.py             # write firestore.indexes.json
+    python firestore_indexes.py --backfill  # also store effective_price/destination_key
+                                            # and summaries for existing packages, and
+                                            # normalized emails/name_key for existing users
+
+Deploy with: firebase deploy --only firestore:indexes
+"""
+
+import os
+import sys
+import json
+from itertools import product
+
+from catalog import DURATION_FILTERS, BUDGET_FILTERS, NEWEST_FIRST, package_filters, listing_order
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEXES_PATH = os.path.join(BASE_DIR, 'firestore.indexes.json')
+
+# Package list queries run against firestore_utils.SUMMARIES
+COLLECTION = 'package_summaries'
+
+# Queries with a fixed ordering, as (collection, [(field, order), ...])
+ORDERED_QUERIES = [
+    # iter_packages(): status == x order by created_at desc
+    (COLLECTION, [('status', 'ASCENDING'), ('created_at', 'DESCENDING')]),
+    # get_featured_packages(): status == x, featured == true order by created_at desc
+    (COLLECTION, [('status', 'ASCENDING'), ('featured', 'ASCENDING'), ('created_at', 'DESCENDING')]),
+    # get_bookings(user_id): user_id == x order by created_at desc
+    ('bookings', [('user_id', 'ASCENDING'), ('created_at', 'DESCENDING')]),
+    # get_inquiries(status): status == x order by created_at desc
+    ('inquiries', [('status', 'ASCENDING'), ('created_at', 'DESCENDING')]),
+]
+# Equality filters get_packages() pages NEWEST_FIRST with
+PAGED_EQUALITY_FILTERS = [['status'], ['status', 'featured']]
+
+
+def _index(collection, fields):
+    return {
+        'collectionGroup': collection,
+        'queryScope': 'COLLECTION',
+        'fields': [{'fieldPath': field, 'order': order} for field, order in fields],
+    }
+
+
+def _direction(descending):
+    return 'DESCENDING' if descending else 'ASCENDING'
+
+
+def order_fields(order):
+    """Index fields for a catalog order; the document id is implied when it
+    sorts in the same direction as the field before it"""
+    fields = []
+    for field, descending in order:
+        if field == 'id':
+            if fields and fields[-1][1] == _direction(descending):
+                continue
+            field = '__name__'
+        fields.append((field, _direction(descending)))
+    return fields
+
+
+def filter_indexes():
+    """Indexes for every combination of sidebar filters.
+
+    Unpaged queries need one when a range condition is used (equality-only
+    combinations are served by Firestore's single-field indexes). With range
+    conditions on more than one field, Firestore orders by those fields by
+    name, so the index lists them the same way. Paged queries order by
+    listing_order(), which always needs a composite index.
+    """
+    seen = []
+    for destination, duration, budget in product(
+            ['', 'any'], [''] + list(DURATION_FILTERS), [''] + list(BUDGET_FILTERS)):
+        filters = package_filters(destination, duration, budget)
+        equality = [(field, 'ASCENDING') for field, op, _ in filters if op == '==']
+        ranges = sorted({field for field, op, _ in filters if op != '=='})
+        candidates = [equality + order_fields(listing_order(filters))]
+        if ranges:
+            candidates.insert(0, equality + [(field, 'ASCENDING') for field in ranges])
+        for fields in candidates:
+            if fields not in seen:
+                seen.append(fields)
+    return [_index(COLLECTION, fields) for fields in seen]
+
+
+def paged_indexes():
+    return [_index(COLLECTION, [(field, 'ASCENDING') for field in equality] + order_fields(NEWEST_FIRST))
+            for equality in PAGED_EQUALITY_FILTERS]
+
+
+def build_indexes():
+    indexes = [_index(collection, fields) for collection, fields in ORDERED_QUERIES]
+    indexes.extend(paged_indexes())
+    indexes.extend(filter_indexes())
+    return {'indexes': indexes, 'fieldOverrides': []}
+
+
+def write_indexes(path=INDEXES_PATH):
+    spec = build_indexes()
+    with open(path, 'w') as f:
+        json.dump(spec, f, indent=2)
+        f.write('\n')
+    print(f"✅ Wrote {len(spec['indexes'])} composite indexes to {path}")
+    return spec
+
+
+if __name__ == "__main__":
+    write_indexes()
+    if '--backfill' in sys.argv[1:]:
+        from firestore_utils import backfill_package_fields, backfill_user_fields
+        print(f"✅ Backfilled {backfill_package_fields()} packages")
+        print(f"✅ Backfilled {backfill_user_fields()} users")
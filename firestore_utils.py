@@ -5,14 +5,60 @@ Replaces PostgreSQL database functions
 """
 
 import os
+import time
+import threading
 import firebase_admin
 from firebase_admin import credentials, firestore
 from datetime import datetime
-from werkzeug.security import check_password_hash, generate_password_hash
+from password_hashing import verify_password, hash_password
+from hash_policy import needs_rehash
+from timing import timed_db
+from catalog_columns import catalog_columns
+from ttl_cache import TTLCache, MISSING
+from write_behind import WriteBehindBuffer
+from google.api_core.exceptions import NotFound
+from catalog import (
+    derived_fields, summarize, package_filters, matches_conditions, NEWEST_FIRST, listing_order,
+    order_key, paginate, encode_cursor, decode_cursor, cursor_fields
+)
 
 # Global Firestore client
 db = None
 
+# Callbacks run after a package write succeeds (cache invalidation etc.)
+_package_listeners = []
+
+def on_package_change(callback):
+    """Register callback(package_id) to run after a package is added, updated or deleted"""
+    _package_listeners.append(callback)
+    return callback
+
+def _notify_package_change(package_id):
+    for callback in _package_listeners:
+        try:
+            callback(package_id)
+        except Exception as e:
+            print(f"Package change listener error: {e}")
+
+_package_write_listeners = []
+
+def on_package_write(callback):
+    """Register callback(package_id) to run after this worker writes a package.
+
+    Unlike on_package_change, it isn't called again when the catalog
+    listener reports the write, nor for writes made by other workers.
+    """
+    _package_write_listeners.append(callback)
+    return callback
+
+def _notify_package_write(package_id):
+    _notify_package_change(package_id)
+    for callback in _package_write_listeners:
+        try:
+            callback(package_id)
+        except Exception as e:
+            print(f"Package write listener error: {e}")
+
 def init_firestore():
     """Initialize Firestore client with environment variables"""
     global db
@@ -52,51 +98,399 @@ def init_firestore():
         db._is_mock = True
         return db
 
-# ------------------ Package Management ------------------
+# ------------------ Package Catalog Cache ------------------
+#
+# Each worker keeps every package summary in memory. With a real
+# Firestore client it is kept current by an on_snapshot listener; in mock
+# mode, or if the listener can't be started, it is reloaded every
+# CATALOG_TTL seconds instead.
 
-def get_packages(featured_only=False, status='active'):
+CATALOG_TTL = int(os.getenv("CATALOG_TTL", "60"))
+# List views read this denormalized copy of each package (catalog.summarize),
+# kept in sync on write. Full documents are only read by get_package_by_id.
+SUMMARIES = 'package_summaries'
+CATALOG_LISTENER_TIMEOUT = int(os.getenv("CATALOG_LISTENER_TIMEOUT", "10"))
+
+class _PackageCatalog:
+    def __init__(self):
+        self.packages = {}  # id -> package summary, replaced wholesale on every change
+        self.loaded_at = None
+        self.watch = None
+        self.listener_failed = False
+        self.ready = threading.Event()
+        self.lock = threading.Lock()
+
+    def is_live(self):
+        return self.watch is not None and self.ready.is_set() and self.watch.is_active
+
+_catalog = _PackageCatalog()
+
+def _on_catalog_snapshot(col_snapshot, changes, read_time):
+    """Listener callback (runs on a Firestore thread): apply changes copy-on-write"""
     try:
+        initial = not _catalog.ready.is_set()
+        packages = {} if initial else dict(_catalog.packages)
+        for change in changes:
+            doc = change.document
+            if change.type.name == 'REMOVED':
+                packages.pop(doc.id, None)
+            else:
+                packages[doc.id] = dict(doc.to_dict(), id=doc.id)
+        _catalog.packages = packages
+        _catalog.loaded_at = time.monotonic()
+        _catalog.ready.set()
+        if not initial:
+            # Writes from other workers land here too, so downstream caches stay in sync
+            for change in changes:
+                _notify_package_change(change.document.id)
+    except Exception as e:
+        print(f"Error applying package snapshot: {e}")
+
+def _start_catalog_listener(db):
+    try:
+        _catalog.watch = db.collection(SUMMARIES).on_snapshot(_on_catalog_snapshot)
+        if _catalog.ready.wait(CATALOG_LISTENER_TIMEOUT):
+            print(f"✅ Package catalog listener active ({len(_catalog.packages)} packages)")
+            return True
+        print("⚠️ Package catalog listener slow to start, loading directly")
+    except Exception as e:
+        print(f"⚠️ Package catalog listener unavailable: {e}")
+        _catalog.watch = None
+        _catalog.listener_failed = True
+    return False
+
+def catalog_is_live():
+    """True while the on_snapshot listener keeps the catalog current"""
+    return _catalog.is_live()
+
+def get_package_catalog():
+    """The in-memory catalog as an id -> package summary dict, loading it if needed.
+
+    The catalog replaces this dict (never mutates it) whenever packages
+    change, and unchanged packages keep the same dict object, so callers can
+    detect changes by identity. Neither the dict nor the packages in it
+    may be mutated.
+    """
+    if _catalog.is_live():
+        return _catalog.packages
+
+    with _catalog.lock:
+        if _catalog.is_live():
+            return _catalog.packages
+        if _catalog.loaded_at is not None and time.monotonic() - _catalog.loaded_at < CATALOG_TTL:
+            return _catalog.packages
+
         db = init_firestore()
         if hasattr(db, '_is_mock') or not hasattr(db, 'collection'):
             print("Using mock data for packages")
             from mock_data import PACKAGES
-            packages = PACKAGES.copy()
-            if status:
-                packages = [p for p in packages if p.get('status') == status]
-            if featured_only:
-                packages = [p for p in packages if p.get('featured') is True]
-            packages.sort(key=lambda x: x.get('created_at', datetime.now()), reverse=True)
-            return packages
+            _catalog.packages = {p['id']: summarize(p) for p in PACKAGES}
         else:
-            query = db.collection('packages')
-            if featured_only:
-                query = query.where(filter=firestore.FieldFilter('featured', '==', True))
-            elif status:
-                query = query.where(filter=firestore.FieldFilter('status', '==', status))
-            docs = query.stream()
-            packages = [dict(doc.to_dict(), id=doc.id) for doc in docs]
-            return packages
+            if _catalog.watch is not None and _catalog.ready.is_set() and not _catalog.watch.is_active:
+                print("⚠️ Package catalog listener stopped, restarting")
+                _catalog.watch = None
+                _catalog.ready.clear()
+            if _catalog.watch is None and not _catalog.listener_failed:
+                if _start_catalog_listener(db):
+                    return _catalog.packages
+            docs = db.collection(SUMMARIES).stream()
+            _catalog.packages = {doc.id: dict(doc.to_dict(), id=doc.id) for doc in docs}
+        _catalog.loaded_at = time.monotonic()
+        return _catalog.packages
+
+def _expire_catalog(package_id=None):
+    """Force a reload on next read when running without a listener"""
+    _catalog.loaded_at = None
+
+on_package_change(_expire_catalog)
+
+# Fields that effective_price/destination_key are computed from
+_DERIVED_SOURCE_FIELDS = {'price', 'discount_price', 'destination'}
+
+def _created_timestamp(package):
+    created = package.get('created_at')
+    if isinstance(created, datetime):
+        try:
+            return created.timestamp()
+        except (OverflowError, ValueError):
+            pass
+    return 0.0
+
+# ------------------ Package Management ------------------
+
+def _is_mock(db):
+    return hasattr(db, '_is_mock') or not hasattr(db, 'collection')
+
+def _package_page(filters, order, limit, cursor=None):
+    """One page of packages matching ``filters`` in ``order``, after ``cursor``.
 
+    Returns (packages, next_cursor). While the catalog listener is live, or
+    in mock mode, the in-memory catalog is paged; otherwise the Firestore
+    query resumes with start_after() and reads at most limit + 1 documents.
+    Raises ValueError for a malformed cursor.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    if after is not None:
+        try:
+            start = cursor_fields(order, after)
+        except ValueError:
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+    key = order_key(order)
+    try:
+        db = init_firestore()
+        if _catalog.is_live() or _is_mock(db):
+            catalog = get_package_catalog()
+            columns = catalog_columns(catalog)
+            if columns is None:
+                packages = [p for p in catalog.values() if matches_conditions(p, filters)]
+                packages.sort(key=key)
+                return paginate(packages, limit, cursor, key=key)
+            packages = columns.select(filters, order, after, limit + 1)
+            page = packages[:limit]
+            return page, encode_cursor(page[-1], key) if len(packages) > limit else None
+
+        collection = db.collection(SUMMARIES)
+        query = collection
+        for field, op, value in filters:
+            query = query.where(filter=firestore.FieldFilter(field, op, value))
+        for field, descending in order:
+            query = query.order_by(
+                '__name__' if field == 'id' else field,
+                direction=firestore.Query.DESCENDING if descending else firestore.Query.ASCENDING)
+        if after is not None:
+            start['__name__'] = collection.document(start.pop('id'))
+            query = query.start_after(start)
+
+        docs = [dict(doc.to_dict(), id=doc.id) for doc in query.limit(limit + 1).stream()]
+        page = docs[:limit]
+        return page, encode_cursor(page[-1], key) if len(docs) > limit else None
+    except ValueError:
+        raise
+    except Exception as e:
+        print(f"Error fetching package page: {e}")
+        return [], None
+
+@timed_db
+def get_packages(featured_only=False, status='active', limit=None, cursor=None):
+    """Packages newest first.
+
+    Without ``limit``, returns every matching package from the in-memory
+    catalog as a new list. With ``limit``, returns (packages, next_cursor)
+    for the page after ``cursor`` (see _package_page); next_cursor is None
+    on the last page.
+
+    The package dicts may be shared with the catalog cache and must be
+    treated as read-only.
+    """
+    if limit is not None:
+        filters = [('status', '==', status)] if status else []
+        if featured_only:
+            filters.append(('featured', '==', True))
+        return _package_page(filters, NEWEST_FIRST, limit, cursor)
+
+    try:
+        packages = list(get_package_catalog().values())
     except Exception as e:
         print(f"Error fetching packages: {e}")
         try:
             from mock_data import PACKAGES
-            return [p for p in PACKAGES if (not status or p.get('status') == status) and (not featured_only or p.get('featured'))]
+            packages = list(PACKAGES)
         except Exception as mock_error:
             print(f"Mock data also failed: {mock_error}")
             return []
 
+    if status:
+        packages = [p for p in packages if p.get('status') == status]
+    if featured_only:
+        packages = [p for p in packages if p.get('featured') is True]
+    packages.sort(key=_created_timestamp, reverse=True)
+    return packages
+
+@timed_db
+def get_featured_packages(limit=6):
+    """The newest ``limit`` active featured packages, for the homepage.
+
+    One Firestore query (status == 'active', featured == True, created_at
+    desc, limit) that reads at most ``limit`` documents and needs the
+    (status, featured, created_at desc) index. Answered from the catalog,
+    without reads, while the listener is live.
+    """
+    try:
+        db = init_firestore()
+        if _catalog.is_live() or _is_mock(db):
+            packages = [p for p in get_package_catalog().values()
+                        if p.get('status') == 'active' and p.get('featured') is True]
+            packages.sort(key=_created_timestamp, reverse=True)
+            return packages[:limit]
+        query = (db.collection(SUMMARIES)
+                 .where(filter=firestore.FieldFilter('status', '==', 'active'))
+                 .where(filter=firestore.FieldFilter('featured', '==', True))
+                 .order_by('created_at', direction=firestore.Query.DESCENDING)
+                 .limit(limit))
+        return [dict(doc.to_dict(), id=doc.id) for doc in query.stream()]
+    except Exception as e:
+        print(f"Error fetching featured packages: {e}")
+        return []
+
+@timed_db
+def query_packages(destination='', duration='', budget='', status='active', limit=None, cursor=None):
+    """Packages matching the /packages sidebar filters.
+
+    The filters become Firestore equality/range conditions on the stored
+    destination_key, days and effective_price fields, so only matching
+    documents are read (see firestore.indexes.json for the indexes this
+    needs). While the catalog listener is live the same conditions are
+    checked against the in-memory catalog instead, which reads nothing.
+
+    Without ``limit``, returns every match in no particular order. With
+    ``limit``, returns (packages, next_cursor) for the page after
+    ``cursor``, featured first and then oldest first (catalog.LISTING_ORDER).
+    """
+    filters = package_filters(destination, duration, budget, status)
+    if limit is not None:
+        return _package_page(filters, listing_order(filters), limit, cursor)
+    try:
+        db = init_firestore()
+        if _catalog.is_live() or _is_mock(db):
+            catalog = get_package_catalog()
+            columns = catalog_columns(catalog)
+            if columns is not None:
+                return columns.select(filters)
+            return [p for p in catalog.values() if matches_conditions(p, filters)]
+        query = db.collection(SUMMARIES)
+        for field, op, value in filters:
+            query = query.where(filter=firestore.FieldFilter(field, op, value))
+        return [dict(doc.to_dict(), id=doc.id) for doc in query.stream()]
+    except Exception as e:
+        print(f"Error querying packages: {e}")
+        return []
+
+@timed_db
+def iter_packages(status='active'):
+    """Yield package summaries newest first, one document at a time.
+
+    Streams the Firestore query instead of building a list, so callers can
+    start producing output before the whole collection has been read.
+    Needs the (status, created_at desc) composite index.
+    """
+    try:
+        db = init_firestore()
+        if hasattr(db, '_is_mock') or not hasattr(db, 'collection'):
+            from mock_data import PACKAGES
+            packages = [summarize(p) for p in PACKAGES if not status or p.get('status') == status]
+            packages.sort(key=lambda x: x.get('created_at', datetime.min), reverse=True)
+            yield from packages
+            return
+        query = db.collection(SUMMARIES)
+        if status:
+            query = query.where(filter=firestore.FieldFilter('status', '==', status))
+        query = query.order_by('created_at', direction=firestore.Query.DESCENDING)
+        for doc in query.stream():
+            yield dict(doc.to_dict(), id=doc.id)
+    except Exception as e:
+        print(f"Error streaming packages: {e}")
+
+@timed_db
+def _fetch_package(package_id):
+    db = init_firestore()
+    if hasattr(db, '_is_mock') or not hasattr(db, 'collection'):
+        from mock_data import PACKAGES
+        for package in PACKAGES:
+            if package.get('id') == package_id:
+                return package.copy()
+        return None
+    doc = db.collection('packages').document(package_id).get()
+    if doc.exists:
+        return dict(doc.to_dict(), id=doc.id)
+    return None
+
 def get_package_by_id(package_id):
+    try:
+        return _fetch_package(package_id)
+    except Exception as e:
+        print(f"Error fetching package {package_id}: {e}")
+        return None
+
+@timed_db
+def get_packages_by_ids(package_ids):
+    """Package summaries for many ids in one round trip, as an id -> package dict.
+
+    Ids are de-duplicated and unknown ids are left out. Answered from the
+    catalog while its listener is live (and in mock mode), otherwise with
+    a single Firestore get_all().
+    """
+    ids = list(dict.fromkeys(package_id for package_id in package_ids if package_id))
+    if not ids:
+        return {}
     try:
         db = init_firestore()
-        doc = db.collection('packages').document(package_id).get()
-        if doc.exists:
-            return dict(doc.to_dict(), id=doc.id)
+        if _catalog.is_live() or _is_mock(db):
+            catalog = get_package_catalog()
+            return {package_id: catalog[package_id] for package_id in ids if package_id in catalog}
+        refs = [db.collection(SUMMARIES).document(package_id) for package_id in ids]
+        return {doc.id: dict(doc.to_dict(), id=doc.id) for doc in db.get_all(refs) if doc.exists}
+    except Exception as e:
+        print(f"Error fetching packages by id: {e}")
+        return {}
+
+def attach_packages(rows):
+    """Set row['package'] on bookings/inquiries from their package_id, batched"""
+    packages = get_packages_by_ids(row.get('package_id') for row in rows)
+    for row in rows:
+        row['package'] = packages.get(row.get('package_id'))
+    return rows
+
+# ------------------ Package Detail Cache ------------------
+#
+# Read-through cache of full package documents for the detail pages. Ids
+# that don't exist are remembered separately, for a shorter time, so
+# requests for made-up ids can't evict real packages.
+
+PACKAGE_CACHE_SIZE = int(os.getenv("PACKAGE_CACHE_SIZE", "1000"))
+PACKAGE_CACHE_TTL = int(os.getenv("PACKAGE_CACHE_TTL", "300"))
+PACKAGE_NEGATIVE_CACHE_SIZE = int(os.getenv("PACKAGE_NEGATIVE_CACHE_SIZE", "5000"))
+PACKAGE_NEGATIVE_CACHE_TTL = int(os.getenv("PACKAGE_NEGATIVE_CACHE_TTL", "30"))
+
+_package_cache = TTLCache(PACKAGE_CACHE_SIZE, PACKAGE_CACHE_TTL)
+_missing_packages = TTLCache(PACKAGE_NEGATIVE_CACHE_SIZE, PACKAGE_NEGATIVE_CACHE_TTL)
+
+def _evict_package(package_id=None):
+    if package_id is None:
+        _package_cache.clear()
+        _missing_packages.clear()
+    else:
+        _package_cache.pop(package_id)
+        _missing_packages.pop(package_id)
+
+on_package_change(_evict_package)
+
+def get_package_cached(package_id):
+    """get_package_by_id() through the detail cache.
+
+    The returned dict is shared with the cache and must not be mutated.
+    Lookup errors return None without being cached.
+    """
+    package = _package_cache.get(package_id)
+    if package is not MISSING:
+        return package
+    if _missing_packages.get(package_id) is not MISSING:
         return None
+
+    try:
+        package = _fetch_package(package_id)
     except Exception as e:
         print(f"Error fetching package {package_id}: {e}")
         return None
+    if package is None:
+        _missing_packages.set(package_id, True)
+    else:
+        _package_cache.set(package_id, package)
+    return package
+
+def package_cache_stats():
+    return {'packages': _package_cache.stats(), 'missing': _missing_packages.stats()}
 
+@timed_db
 def add_package(package_data):
     try:
         db = init_firestore()
@@ -105,62 +499,243 @@ def add_package(package_data):
             package_data['id'] = f"pkg_{package_data['destination'].lower().replace(' ', '_')}_{timestamp}"
         package_data['created_at'] = datetime.now()
         package_data['updated_at'] = datetime.now()
-        db.collection('packages').document(package_data['id']).set(package_data)
+        package_data.update(derived_fields(package_data))
+        batch = db.batch()
+        batch.set(db.collection('packages').document(package_data['id']), package_data)
+        batch.set(db.collection(SUMMARIES).document(package_data['id']), summarize(package_data))
+        batch.commit()
+        _notify_package_write(package_data['id'])
         return package_data['id']
     except Exception as e:
         print(f"Error adding package: {e}")
         return None
 
+@timed_db
 def update_package(package_id, package_data):
     try:
         db = init_firestore()
         package_data['updated_at'] = datetime.now()
-        db.collection('packages').document(package_id).update(package_data)
+        # Partial updates still need the other fields for the derived fields and summary
+        current = {}
+        if not _is_mock(db):
+            doc = db.collection('packages').document(package_id).get()
+            current = doc.to_dict() if doc.exists else {}
+        if _DERIVED_SOURCE_FIELDS & package_data.keys():
+            package_data.update(derived_fields({**current, **package_data}))
+        batch = db.batch()
+        batch.update(db.collection('packages').document(package_id), package_data)
+        batch.set(db.collection(SUMMARIES).document(package_id),
+                  summarize({**current, **package_data, 'id': package_id}))
+        batch.commit()
+        _notify_package_write(package_id)
         return True
     except Exception as e:
         print(f"Error updating package {package_id}: {e}")
         return False
 
+@timed_db
 def delete_package(package_id):
     try:
         db = init_firestore()
-        db.collection('packages').document(package_id).delete()
+        batch = db.batch()
+        batch.delete(db.collection('packages').document(package_id))
+        batch.delete(db.collection(SUMMARIES).document(package_id))
+        batch.commit()
+        _notify_package_write(package_id)
         return True
     except Exception as e:
         print(f"Error deleting package {package_id}: {e}")
         return False
 
+@timed_db
+def backfill_package_fields():
+    """Store effective_price/destination_key on packages written before they
+    existed, and (re)write every package's summary"""
+    try:
+        db = init_firestore()
+        batch = db.batch()
+        pending = updated = 0
+        for doc in db.collection('packages').stream():
+            package = dict(doc.to_dict(), id=doc.id)
+            fields = derived_fields(package)
+            if not all(package.get(k) == v for k, v in fields.items()):
+                batch.update(doc.reference, fields)
+                package.update(fields)
+                pending += 1
+            batch.set(db.collection(SUMMARIES).document(doc.id), summarize(package))
+            pending += 1
+            updated += 1
+            if pending >= 498:  # Firestore batch limit is 500 writes
+                batch.commit()
+                batch = db.batch()
+                pending = 0
+        if pending:
+            batch.commit()
+        if updated:
+            _notify_package_write(None)
+        return updated
+    except Exception as e:
+        print(f"Error backfilling package fields: {e}")
+        return 0
+
+# ------------------ Bookings & Inquiries ------------------
+
+@timed_db
+def add_booking(booking_data):
+    try:
+        db = init_firestore()
+        booking_data.setdefault('id', f"book_{int(datetime.now().timestamp() * 1000)}")
+        booking_data['created_at'] = datetime.now()
+        if _is_mock(db):
+            from mock_data import BOOKINGS
+            BOOKINGS.append(dict(booking_data))
+            return booking_data['id']
+        db.collection('bookings').document(booking_data['id']).set(booking_data)
+        return booking_data['id']
+    except Exception as e:
+        print(f"Error adding booking: {e}")
+        return None
+
+@timed_db
+def get_bookings(user_id=None, limit=100):
+    """Bookings newest first, optionally for one user, each with its package attached.
+
+    Needs the (user_id, created_at desc) index when filtering by user.
+    """
+    try:
+        db = init_firestore()
+        if _is_mock(db):
+            from mock_data import BOOKINGS
+            bookings = [dict(b) for b in BOOKINGS if not user_id or b.get('user_id') == user_id]
+            bookings.sort(key=_created_timestamp, reverse=True)
+            return attach_packages(bookings[:limit])
+        query = db.collection('bookings')
+        if user_id:
+            query = query.where(filter=firestore.FieldFilter('user_id', '==', user_id))
+        query = query.order_by('created_at', direction=firestore.Query.DESCENDING).limit(limit)
+        return attach_packages([dict(doc.to_dict(), id=doc.id) for doc in query.stream()])
+    except Exception as e:
+        print(f"Error fetching bookings: {e}")
+        return []
+
+@timed_db
+def add_inquiry(inquiry_data):
+    try:
+        db = init_firestore()
+        inquiry_data.setdefault('id', f"inq_{int(datetime.now().timestamp() * 1000)}")
+        inquiry_data.setdefault('status', 'new')
+        inquiry_data['created_at'] = datetime.now()
+        if _is_mock(db):
+            from mock_data import INQUIRIES
+            INQUIRIES.append(dict(inquiry_data))
+            return inquiry_data['id']
+        db.collection('inquiries').document(inquiry_data['id']).set(inquiry_data)
+        return inquiry_data['id']
+    except Exception as e:
+        print(f"Error adding inquiry: {e}")
+        return None
+
+@timed_db
+def get_inquiries(status=None, limit=100):
+    """Inquiries newest first, each with the package it asks about (if any).
+
+    Needs the (status, created_at desc) index when filtering by status.
+    """
+    try:
+        db = init_firestore()
+        if _is_mock(db):
+            from mock_data import INQUIRIES
+            inquiries = [dict(i) for i in INQUIRIES if not status or i.get('status') == status]
+            inquiries.sort(key=_created_timestamp, reverse=True)
+            return attach_packages(inquiries[:limit])
+        query = db.collection('inquiries')
+        if status:
+            query = query.where(filter=firestore.FieldFilter('status', '==', status))
+        query = query.order_by('created_at', direction=firestore.Query.DESCENDING).limit(limit)
+        return attach_packages([dict(doc.to_dict(), id=doc.id) for doc in query.stream()])
+    except Exception as e:
+        print(f"Error fetching inquiries: {e}")
+        return []
+
 # ------------------ User Management ------------------
 
+# Per-worker email -> user id index, so repeat lookups are a single
+# document get instead of a query. Entries are checked against the
+# fetched user's email, so ids changed or deleted by other workers are
+# dropped on the next lookup; writes in this worker update it directly.
+USER_EMAIL_INDEX_SIZE = int(os.getenv("USER_EMAIL_INDEX_SIZE", "10000"))
+USER_EMAIL_INDEX_TTL = int(os.getenv("USER_EMAIL_INDEX_TTL", "3600"))
+
+_user_ids_by_email = TTLCache(USER_EMAIL_INDEX_SIZE, USER_EMAIL_INDEX_TTL)
+
+def normalize_email(email):
+    """Emails are stored and looked up trimmed and lower-cased"""
+    return (email or '').strip().lower()
+
+def _query_user_by_email(db, email):
+    if _is_mock(db):
+        from mock_data import USERS
+        for user in USERS:
+            if user.get('email') == email:  # Exact match, like the Firestore query
+                return user.copy()
+        return None
+    query = db.collection('users').where(filter=firestore.FieldFilter('email', '==', email)).limit(1)
+    docs = list(query.stream())
+    if docs:
+        return dict(docs[0].to_dict(), id=docs[0].id)
+    return None
+
+@timed_db
 def get_user_by_email(email):
+    key = normalize_email(email)
+    if not key:
+        return None
     try:
+        user_id = _user_ids_by_email.get(key)
+        if user_id is not MISSING:
+            user = _fetch_user(user_id)
+            if user and normalize_email(user.get('email')) == key:
+                return user
+            _user_ids_by_email.pop(key)
+
+        # Stored emails are normalized too (backfill_user_fields for older users)
         db = init_firestore()
-        if hasattr(db, '_is_mock') or not hasattr(db, 'collection'):
-            from mock_data import USERS
-            for user in USERS:
-                if user.get('email') == email:
-                    return user.copy()
-            return None
-        query = db.collection('users').where(filter=firestore.FieldFilter('email', '==', email))
-        docs = list(query.stream())
-        if docs:
-            return dict(docs[0].to_dict(), id=docs[0].id)
-        return None
+        user = _query_user_by_email(db, key)
+        if user is None and not _user_backfill_done:
+            # Older users may still have a mixed-case email on file; finding
+            # them here keeps logins working and sign-ups from duplicating them
+            ensure_user_backfill()
+            user = _query_user_by_email(db, key)
+        if user:
+            _user_ids_by_email.set(key, user['id'])
+        return user
     except Exception as e:
         print(f"Error fetching user by email {email}: {e}")
         return None
 
+@timed_db
+def _fetch_user(user_id):
+    """The user document, or None if it doesn't exist; errors propagate"""
+    db = init_firestore()
+    if _is_mock(db):
+        from mock_data import USERS
+        for user in USERS:
+            if user.get('id') == user_id:
+                return user.copy()
+        return None
+    doc = db.collection('users').document(user_id).get()
+    if doc.exists:
+        return dict(doc.to_dict(), id=doc.id)
+    return None
+
 def get_user_by_id(user_id):
     try:
-        db = init_firestore()
-        doc = db.collection('users').document(user_id).get()
-        if doc.exists:
-            return dict(doc.to_dict(), id=doc.id)
-        return None
+        return _fetch_user(user_id)
     except Exception as e:
         print(f"Error fetching user {user_id}: {e}")
         return None
 
+@timed_db
 def get_all_users():
     try:
         db = init_firestore()
@@ -182,24 +757,62 @@ def get_all_users():
         print(f"Error fetching users: {e}")
         return []
 
+def user_name_key(user):
+    """Case-insensitive sort key for user names, stored as 'name_key'"""
+    return str(user.get('name') or '').strip().lower()
+
+@timed_db
+def iter_users():
+    """Yield users ordered by name, one document at a time.
+
+    Ordered on the stored 'name_key', which add_user/update_user maintain;
+    Firestore leaves out documents without the field, so users written
+    before it existed need one run of firestore_indexes.py --backfill.
+    """
+    try:
+        db = init_firestore()
+        if hasattr(db, '_is_mock') or not hasattr(db, 'collection'):
+            from mock_data import USERS
+            yield from sorted(USERS, key=user_name_key)
+            return
+        for doc in db.collection('users').order_by('name_key').stream():
+            yield dict(doc.to_dict(), id=doc.id)
+    except Exception as e:
+        print(f"Error streaming users: {e}")
+
+@timed_db
 def add_user(user_data):
     try:
         db = init_firestore()
         if 'id' not in user_data:
             timestamp = int(datetime.now().timestamp())
             user_data['id'] = f"usr_{timestamp}"
+        if 'email' in user_data:
+            user_data['email'] = normalize_email(user_data['email'])
+        user_data['name_key'] = user_name_key(user_data)
         user_data['created_at'] = datetime.now()
         user_data['last_login'] = None
         db.collection('users').document(user_data['id']).set(user_data)
+        if user_data.get('email'):
+            _user_ids_by_email.set(user_data['email'], user_data['id'])
         return user_data['id']
     except Exception as e:
         print(f"Error adding user: {e}")
         return None
 
+@timed_db
 def update_user(user_id, user_data):
     try:
         db = init_firestore()
+        if 'email' in user_data:
+            user_data = dict(user_data, email=normalize_email(user_data['email']))
+        if 'name' in user_data:
+            user_data = dict(user_data, name_key=user_name_key(user_data))
         db.collection('users').document(user_id).update(user_data)
+        _user_cache.pop(user_id)
+        if user_data.get('email'):
+            # The old address is dropped when a lookup finds it no longer matches
+            _user_ids_by_email.set(user_data['email'], user_id)
         return True
     except Exception as e:
         print(f"Error updating user {user_id}: {e}")
@@ -208,27 +821,171 @@ def update_user(user_id, user_data):
 def update_user_status(user_id, new_status):
     return update_user(user_id, {'status': new_status})
 
+@timed_db
 def delete_user(user_id):
     try:
         db = init_firestore()
         db.collection('users').document(user_id).delete()
+        _user_cache.pop(user_id)
         return True
     except Exception as e:
         print(f"Error deleting user {user_id}: {e}")
         return False
 
-def authenticate_user(email, password):
-    user = get_user_by_email(email)
-    if user and user.get('password_hash') and check_password_hash(user['password_hash'], password):
+def backfill_user_fields():
+    """Normalize stored emails and store 'name_key' on users written before
+    either existed; returns the number of users updated.
+
+    get_user_by_email only finds normalized emails, so it runs this through
+    ensure_user_backfill() on a lookup miss until the stats/user_backfill
+    marker written at the end shows it has completed.
+    """
+    try:
+        db = init_firestore()
+        if _is_mock(db):
+            return 0
+        batch = db.batch()
+        pending = updated = 0
+        seen_emails = {}
+        for doc in db.collection('users').stream():
+            user = doc.to_dict()
+            fields = {}
+            if user.get('name_key') != user_name_key(user):
+                fields['name_key'] = user_name_key(user)
+            email = normalize_email(user.get('email'))
+            if user.get('email') and user['email'] != email:
+                fields['email'] = email
+            if email and email in seen_emails:
+                print(f"⚠️ Users {seen_emails[email]} and {doc.id} share the email {email}")
+            seen_emails.setdefault(email, doc.id)
+            if fields:
+                batch.update(doc.reference, fields)
+                pending += 1
+                updated += 1
+            if pending >= 500:  # Firestore batch limit is 500 writes
+                batch.commit()
+                batch = db.batch()
+                pending = 0
+        if pending:
+            batch.commit()
+        db.collection('stats').document('user_backfill').set({'completed_at': datetime.now()})
+        if updated:
+            _user_cache.clear()
+            _user_ids_by_email.clear()
+        return updated
+    except Exception as e:
+        print(f"Error backfilling user fields: {e}")
+        return 0
+
+_user_backfill_lock = threading.Lock()
+_user_backfill_done = False
+
+def ensure_user_backfill():
+    """Run backfill_user_fields() unless some worker already completed it.
+
+    Returns True once stored emails are known to be normalized; the marker
+    is read at most until then, so later lookups cost nothing extra.
+    """
+    global _user_backfill_done
+    if _user_backfill_done:
+        return True
+    with _user_backfill_lock:
+        if _user_backfill_done:
+            return True
         try:
-            update_user(user['id'], {'last_login': datetime.now()})
+            db = init_firestore()
+            if _is_mock(db):
+                _user_backfill_done = True
+                return True
+            marker = db.collection('stats').document('user_backfill')
+            if not marker.get().exists:
+                print(f"Normalized {backfill_user_fields()} users before the first email lookup")
+            _user_backfill_done = marker.get().exists
         except Exception as e:
-            print(f"Error updating last_login: {e}")
-        return user
-    elif user and user.get('password') and check_password_hash(user['password'], password):
+            print(f"Error checking the user backfill: {e}")
+        return _user_backfill_done
+
+def stored_password_hash(user):
+    """The user's password hash; older accounts keep it in 'password'"""
+    return user.get('password_hash') or user.get('password')
+
+def upgrade_password_hash(user, password):
+    """After a successful login, rehash a password made under an older hash
+    policy and move legacy 'password' hashes to 'password_hash'.
+
+    Runs in the background so the login response doesn't wait for it; if
+    it fails the next login tries again.
+    """
+    stored = stored_password_hash(user)
+    outdated = needs_rehash(stored)
+    if not outdated and 'password' not in user:
+        return
+
+    def rehash():
+        try:
+            update = {'password_hash': hash_password(password) if outdated else stored}
+            if 'password' in user:
+                update['password'] = firestore.DELETE_FIELD
+            update_user(user['id'], update)
+        except Exception as e:
+            print(f"Error upgrading password hash for {user.get('id')}: {e}")
+
+    threading.Thread(target=rehash, daemon=True).start()
+
+def authenticate_user(email, password):
+    user = get_user_by_email(email)
+    if user and verify_password(stored_password_hash(user), password):
+        upgrade_password_hash(user, password)
+        record_login(user['id'])
         return user
     return None
 
+# ------------------ Buffered User Writes ------------------
+#
+# last_login changes on every login. Rather than a Firestore round trip in
+# the login response, updates like it are coalesced per user and committed
+# in batched writes by write_behind.py, including on shutdown.
+
+@timed_db
+def _commit_user_updates(pending):
+    db = init_firestore()
+    if _is_mock(db):
+        return
+    items = list(pending.items())
+    for start in range(0, len(items), 500):  # Firestore batch limit is 500 writes
+        chunk = items[start:start + 500]
+        batch = db.batch()
+        for user_id, fields in chunk:
+            batch.update(db.collection('users').document(user_id), fields)
+        try:
+            batch.commit()
+        except NotFound:
+            # A user was deleted meanwhile (or never had a document), which
+            # fails the whole batch; write the others one at a time
+            for user_id, fields in chunk:
+                try:
+                    db.collection('users').document(user_id).update(fields)
+                except NotFound:
+                    pass
+    for user_id in pending:
+        _user_cache.pop(user_id)
+
+_user_writes = WriteBehindBuffer(_commit_user_updates)
+
+def queue_user_update(user_id, fields):
+    """update_user() for fields that can be written a few seconds late"""
+    _user_writes.add(user_id, fields)
+
+def record_login(user_id):
+    queue_user_update(user_id, {'last_login': datetime.now()})
+
+def flush_user_updates():
+    return _user_writes.flush()
+
+def user_write_stats():
+    return _user_writes.stats()
+
+@timed_db
 def get_admin_users():
     try:
         db = init_firestore()
@@ -243,14 +1000,46 @@ def is_admin_user(email):
     user = get_user_by_email(email)
     return user and user.get('role') == 'admin' and user.get('status') == 'active'
 
+# ------------------ Current User Cache ------------------
+#
+# The logged-in user is looked up by id on every request (current_user.py).
+# Entries are short-lived so changes made by other workers show up quickly;
+# writes through update_user/delete_user drop them immediately.
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "5000"))
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "30"))
+
+_user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+def get_user_cached(user_id):
+    """get_user_by_id() through the per-worker user cache.
+
+    Ids without a user document are cached as None. The returned dict is
+    shared with the cache and must not be mutated.
+    """
+    user = _user_cache.get(user_id)
+    if user is not MISSING:
+        return user
+    try:
+        user = _fetch_user(user_id)
+    except Exception as e:
+        print(f"Error fetching user {user_id}: {e}")
+        return None
+    _user_cache.set(user_id, user)
+    return user
+
+def user_cache_stats():
+    return _user_cache.stats()
+
 # ------------------ Stats ------------------
 
+@timed_db
 def get_stats():
     try:
         db = init_firestore()
-        packages_count = len(list(db.collection('packages').where('status', '==', 'active').stream()))
+        packages_count = len(list(db.collection(SUMMARIES).where('status', '==', 'active').stream()))
         users_count = len(list(db.collection('users').where('role', '==', 'user').stream()))
-        featured_count = len(list(db.collection('packages').where('featured', '==', True).stream()))
+        featured_count = len(list(db.collection(SUMMARIES).where('featured', '==', True).stream()))
         return {
             'packages': packages_count,
             'users': users_count,
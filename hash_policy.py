@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Password hash policy for Apni Holidays
+Which algorithm and cost new password hashes use, set by
+PASSWORD_HASH_METHOD in Werkzeug's "name:arg:arg" form:
+
+    scrypt:32768:8:1        scrypt with n, r, p (the default)
+    pbkdf2:sha256:600000    PBKDF2 with hash name and iterations
+    argon2:3:65536:4        argon2id with time cost, memory KiB, parallelism
+                            (needs argon2-cffi)
+
+Hashes made under any other policy still verify; needs_rehash() tells
+the login code to replace them.
+"""
+
+import os
+
+from werkzeug.security import (
+    check_password_hash, generate_password_hash, DEFAULT_PBKDF2_ITERATIONS
+)
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import VerificationError, InvalidHashError
+except ImportError:  # Optional, only needed for argon2 policies and hashes
+    PasswordHasher = None
+
+SCRYPT_DEFAULTS = ('32768', '8', '1')
+ARGON2_DEFAULTS = ('3', '65536', '4')
+
+
+def normalize_method(method):
+    """Spell a method out with all its parameters, as it's stored in hashes"""
+    name, *args = method.strip().split(':')
+    if name == 'scrypt':
+        args = args or list(SCRYPT_DEFAULTS)
+    elif name == 'pbkdf2':
+        args = (args or ['sha256'])[:2]
+        if len(args) == 1:
+            args.append(str(DEFAULT_PBKDF2_ITERATIONS))
+    elif name == 'argon2':
+        args = args or list(ARGON2_DEFAULTS)
+        if PasswordHasher is None:
+            raise ValueError("argon2 hashing needs the argon2-cffi package")
+    else:
+        raise ValueError(f"Unsupported password hash method: {method}")
+    return ':'.join([name] + [str(int(a)) if a.isdigit() else a for a in args])
+
+
+PASSWORD_HASH_METHOD = normalize_method(os.environ.get("PASSWORD_HASH_METHOD", "scrypt"))
+
+
+def _argon2_hasher(method):
+    time_cost, memory_cost, parallelism = map(int, method.split(':')[1:])
+    return PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+
+
+def generate_hash(password, method=None):
+    """Hash ``password`` under ``method`` (default: the configured policy)"""
+    method = normalize_method(method) if method else PASSWORD_HASH_METHOD
+    if method.startswith('argon2:'):
+        return _argon2_hasher(method).hash(password)
+    return generate_password_hash(password, method=method)
+
+
+def check_hash(stored_hash, password):
+    """Verify a password against a hash from any supported policy"""
+    if stored_hash.startswith('$argon2'):
+        if PasswordHasher is None:
+            print("Error verifying password: argon2 hash but argon2-cffi isn't installed")
+            return False
+        try:
+            return PasswordHasher().verify(stored_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return check_password_hash(stored_hash, password)
+
+
+def needs_rehash(stored_hash, method=None):
+    """Whether ``stored_hash`` was made under a different policy"""
+    method = normalize_method(method) if method else PASSWORD_HASH_METHOD
+    if stored_hash.startswith('$argon2'):
+        return not method.startswith('argon2:') or _argon2_hasher(method).check_needs_rehash(stored_hash)
+    return stored_hash.split('$', 1)[0] != method
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Login throttle for Apni Holidays
+Token buckets per client IP and per target email, checked before a login
+attempt does any Firestore lookup or password hashing, so credential
+stuffing can't turn into a CPU denial of service on the workers.
+
+Buckets live in each worker's memory by default. Set LOGIN_THROTTLE_DB to
+a SQLite file path to share them between the workers on one machine.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+
+# Sustained attempts per minute and burst size, per IP and per email
+LOGIN_IP_RATE = float(os.environ.get("LOGIN_IP_RATE", "10"))
+LOGIN_IP_BURST = int(os.environ.get("LOGIN_IP_BURST", "20"))
+LOGIN_EMAIL_RATE = float(os.environ.get("LOGIN_EMAIL_RATE", "5"))
+LOGIN_EMAIL_BURST = int(os.environ.get("LOGIN_EMAIL_BURST", "10"))
+LOGIN_THROTTLE_DB = os.environ.get("LOGIN_THROTTLE_DB", "")
+# Full buckets are indistinguishable from missing ones and are dropped this often
+EVICT_INTERVAL = 60
+
+
+def _refill(tokens, stamp, now, rate, burst):
+    return min(burst, tokens + (now - stamp) * rate)
+
+
+class TokenBuckets:
+    """In-process buckets as key -> (tokens, last update), ``rate`` tokens per second"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._next_evict = time.monotonic() + EVICT_INTERVAL
+
+    def take(self, key):
+        """Spend one token for ``key``; False if its bucket is empty"""
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_evict:
+                self._evict(now)
+            tokens, stamp = self._buckets.get(key, (self.burst, now))
+            tokens = _refill(tokens, stamp, now, self.rate, self.burst)
+            allowed = tokens >= 1
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+            return allowed
+
+    def _evict(self, now):
+        full = [key for key, (tokens, stamp) in self._buckets.items()
+                if _refill(tokens, stamp, now, self.rate, self.burst) >= self.burst]
+        for key in full:
+            del self._buckets[key]
+        self._next_evict = now + EVICT_INTERVAL
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteTokenBuckets:
+    """The same buckets in a SQLite file, shared by every worker that opens it"""
+
+    def __init__(self, path, rate, burst, name):
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self.name = name
+        self._local = threading.local()
+        self._next_evict = time.time() + EVICT_INTERVAL
+
+    def _connection(self):
+        # One connection per thread, and none carried across gunicorn's fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute("CREATE TABLE IF NOT EXISTS login_buckets ("
+                         "name TEXT, key TEXT, tokens REAL, stamp REAL, PRIMARY KEY (name, key))")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def take(self, key):
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if now >= self._next_evict:
+                self._evict(conn, now)
+            row = conn.execute("SELECT tokens, stamp FROM login_buckets WHERE name = ? AND key = ?",
+                               (self.name, key)).fetchone()
+            tokens, stamp = row or (self.burst, now)
+            tokens = _refill(tokens, stamp, now, self.rate, self.burst)
+            allowed = tokens >= 1
+            conn.execute("INSERT OR REPLACE INTO login_buckets VALUES (?, ?, ?, ?)",
+                         (self.name, key, tokens - 1 if allowed else tokens, now))
+            conn.execute("COMMIT")
+            return allowed
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn, now):
+        # Buckets untouched for burst / rate seconds have refilled completely
+        conn.execute("DELETE FROM login_buckets WHERE name = ? AND stamp < ?",
+                     (self.name, now - self.burst / self.rate))
+        self._next_evict = now + EVICT_INTERVAL
+
+    def __len__(self):
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM login_buckets WHERE name = ?", (self.name,)).fetchone()[0]
+
+
+def _buckets(name, per_minute, burst):
+    if LOGIN_THROTTLE_DB:
+        return SQLiteTokenBuckets(LOGIN_THROTTLE_DB, per_minute / 60, burst, name)
+    return TokenBuckets(per_minute / 60, burst)
+
+
+_ip_buckets = _buckets('ip', LOGIN_IP_RATE, LOGIN_IP_BURST)
+_email_buckets = _buckets('email', LOGIN_EMAIL_RATE, LOGIN_EMAIL_BURST)
+
+
+def allow_login_attempt(ip, email):
+    """Whether a password login from ``ip`` for ``email`` may go ahead.
+
+    Both buckets are charged for every attempt. If the shared store can't
+    be reached the attempt is allowed; the hashing pool still bounds the cost.
+    """
+    try:
+        ip_ok = _ip_buckets.take(ip or '')
+        email_ok = _email_buckets.take(email or '')
+        return ip_ok and email_ok
+    except Exception as e:
+        print(f"Login throttle error: {e}")
+        return True
+
+
+def throttle_stats():
+    return {'ips': len(_ip_buckets), 'emails': len(_email_buckets)}
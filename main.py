@@ -4,17 +4,43 @@ load_dotenv()
 
 import subprocess
 import json
-from flask import Flask, render_template_string, request, jsonify, redirect, url_for
+from flask import Flask, render_template, request, jsonify, redirect, url_for, make_response, g
 from datetime import datetime
+from werkzeug.middleware.proxy_fix import ProxyFix
 from firestore_utils import (
-    get_packages, get_package_by_id, add_package, update_package, delete_package,
-    get_user_by_email, get_user_by_id, get_all_users, add_user, update_user, delete_user,
-    authenticate_user, get_admin_users, is_admin_user, get_stats
+    get_packages, get_featured_packages, query_packages, iter_packages, get_package_by_id,
+    get_package_cached, package_cache_stats, add_package, update_package, delete_package,
+    add_booking, get_bookings, add_inquiry, get_inquiries,
+    normalize_email, get_user_by_email, get_user_by_id, get_all_users, iter_users, add_user, update_user, delete_user,
+    authenticate_user, stored_password_hash, upgrade_password_hash, get_admin_users, is_admin_user,
+    user_cache_stats, record_login, user_write_stats, get_stats
 )
+from template_registry import precompile_templates, stream_page
+from timing import init_timing, dump_timings
+from current_user import init_current_user
+from password_hashing import verify_password, hash_password, HashingBusy
+from login_throttle import allow_login_attempt, throttle_stats
+from compression import init_compression
+from assets import init_assets
+from catalog import paginate, project, parse_fields, package_filters, decode_cursor
+from search_index import search_packages, relevance_key
+from facets import facet_counts  # Registered before the page cache so it updates first
+from response_cache import page_cache, cached_page, package_validators, conditional_response, set_validators
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "apni-holidays-secret-key-2025")
 
+# Replit/Apache proxy hops in front of the app; request.remote_addr (used by
+# the login throttle) is then taken from the X-Forwarded-For they append.
+# Use 0 when clients connect directly, or the header could be spoofed.
+PROXY_FIX_HOPS = int(os.environ.get("PROXY_FIX_HOPS", "1"))
+if PROXY_FIX_HOPS:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=PROXY_FIX_HOPS, x_proto=PROXY_FIX_HOPS)
+init_timing(app)
+init_current_user(app)
+init_compression(app)
+init_assets(app)
+
 # ✅ Firebase configuration via .env
 FIREBASE_CONFIG = {
     "apiKey": os.environ.get("FIREBASE_API_KEY"),
@@ -26,6 +52,17 @@ FIREBASE_CONFIG = {
     "measurementId": os.environ.get("FIREBASE_MEASUREMENT_ID")
 }
 
+# JSON catalog API page sizes
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+PACKAGES_PAGE_SIZE = 12
+HOMEPAGE_FEATURED = 6
+
+# Shown when the password hashing pool is saturated
+BUSY_MESSAGE = 'Too many sign-ins right now, please try again in a moment.'
+# Shown when login_throttle refuses an attempt
+THROTTLED_MESSAGE = 'Too many login attempts. Please wait a minute and try again.'
+
 # Database is now handled by Firestore
 # Legacy function maintained for compatibility
 def get_db_connection():
@@ -33,686 +70,89 @@ def get_db_connection():
     return None
 
 @app.route('/')
+@cached_page()
 def index():
     """Homepage with featured packages"""
     try:
-        # Get featured packages from Firestore
-        packages = get_packages(featured_only=True)[:6]  # Limit to 6 packages
+        # Get the newest featured packages from Firestore
+        packages = get_featured_packages(limit=HOMEPAGE_FEATURED)
     except Exception as e:
         print(f"Error fetching packages: {e}")
         packages = []
     
-    # Check if user is logged in and if they are admin
+    return render_template('index.html', packages=packages, facets=facet_counts.snapshot())
+
+@app.route('/api/session-nav')
+def api_session_nav():
+    """Per-user navbar fragment for the shared, cacheable public pages"""
     from flask import session
-    user_logged_in = session.get('user_id') is not None
+    user_logged_in = g.user_id is not None
     user_name = session.get('user_name', 'Guest')
+    user_is_admin = g.is_admin
     
-    # Check if user is admin using Firestore
-    user_is_admin = session.get('is_admin', False)
-    if not user_is_admin and user_logged_in:
-        user_email = session.get('user_email', '')
-        try:
-            user = get_user_by_email(user_email)
-            if user and user.get('role') == 'admin':
-                user_is_admin = True
-                session['is_admin'] = True
-        except Exception as e:
-            print(f"Admin check error: {e}")
-            user_is_admin = False
-    
-    return render_template_string("""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Apni Holidays - Discover Your Dream Destination</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-    <style>
-        .hero-section {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 70vh;
-        }
-        .hero-background {
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: url('https://images.unsplash.com/photo-1469474968028-56623f02e42e?auto=format&fit=crop&w=1920&q=80') center/cover;
-            opacity: 0.3;
-        }
-        .package-card {
-            transition: transform 0.3s ease, box-shadow 0.3s ease;
-            border: none;
-            border-radius: 15px;
-            overflow: hidden;
-        }
-        .package-card:hover {
-            transform: translateY(-10px);
-            box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-        }
-        .package-image {
-            height: 250px;
-            object-fit: cover;
-        }
-        .price-badge {
-            position: absolute;
-            top: 15px;
-            right: 15px;
-            background: linear-gradient(45deg, #ff6b6b, #ffa500);
-            color: white;
-            padding: 8px 15px;
-            border-radius: 25px;
-            font-weight: bold;
-        }
-        .discount-price {
-            text-decoration: line-through;
-            color: #999;
-            font-size: 0.9em;
-        }
-        .search-form {
-            backdrop-filter: blur(10px);
-            background: rgba(255, 255, 255, 0.95);
-        }
-        .navbar {
-            backdrop-filter: blur(10px);
-            background: rgba(255, 255, 255, 0.95) !important;
-        }
-        .footer {
-            background: #2c3e50;
-            color: white;
-            padding: 40px 0 20px;
-        }
-        .animate-fade-in {
-            animation: fadeIn 1s ease-in;
-        }
-        .animate-slide-up {
-            animation: slideUp 1s ease-out;
-        }
-        @keyframes fadeIn {
-            from { opacity: 0; transform: translateY(30px); }
-            to { opacity: 1; transform: translateY(0); }
-        }
-        @keyframes slideUp {
-            from { opacity: 0; transform: translateY(50px); }
-            to { opacity: 1; transform: translateY(0); }
-        }
-    </style>
-</head>
-<body>
-    <!-- Navigation -->
-    <nav class="navbar navbar-expand-lg navbar-light fixed-top">
-        <div class="container">
-            <a class="navbar-brand fw-bold" href="/">
-                <i class="fas fa-plane text-primary"></i> Apni Holidays
-            </a>
-            <button class="navbar-toggler" type="button" data-bs-toggle="collapse" data-bs-target="#navbarNav">
-                <span class="navbar-toggler-icon"></span>
-            </button>
-            <div class="collapse navbar-collapse" id="navbarNav">
-                <ul class="navbar-nav me-auto">
-                    <li class="nav-item">
-                        <a class="nav-link" href="/">Home</a>
-                    </li>
-                    <li class="nav-item">
-                        <a class="nav-link" href="/packages">Packages</a>
-                    </li>
-                    <li class="nav-item">
-                        <a class="nav-link" href="/contact">Contact</a>
-                    </li>
-                </ul>
-                <ul class="navbar-nav">
-                    {% if user_logged_in %}
-                    <li class="nav-item dropdown">
-                        <a class="nav-link dropdown-toggle" href="#" id="navbarDropdown" role="button" data-bs-toggle="dropdown">
-                            <i class="fas fa-user me-1"></i>{{ user_name }}
-                        </a>
-                        <ul class="dropdown-menu">
-                            <li><a class="dropdown-item" href="/profile"><i class="fas fa-user me-2"></i>My Profile</a></li>
-                            <li><a class="dropdown-item" href="/my-bookings"><i class="fas fa-suitcase me-2"></i>My Bookings</a></li>
-                            {% if user_is_admin %}
-                            <li><hr class="dropdown-divider"></li>
-                            <li><a class="dropdown-item" href="/admin/dashboard"><i class="fas fa-cog me-2"></i>Admin Panel</a></li>
-                            {% endif %}
-                            <li><hr class="dropdown-divider"></li>
-                            <li><a class="dropdown-item" href="/auth/logout"><i class="fas fa-sign-out-alt me-2"></i>Logout</a></li>
-                        </ul>
-                    </li>
-                    {% else %}
-                    <li class="nav-item">
-                        <a class="nav-link" href="/auth/login">Login</a>
-                    </li>
-                    <li class="nav-item">
-                        <a class="nav-link btn btn-primary text-white px-3 ms-2" href="/auth/register">Sign Up</a>
-                    </li>
-                    {% endif %}
-                </ul>
-            </div>
-        </div>
-    </nav>
-
-    <!-- Hero Section -->
-    <section class="hero-section text-white position-relative overflow-hidden">
-        <div class="hero-background"></div>
-        <div class="container position-relative" style="z-index: 2; padding-top: 100px;">
-            <div class="row align-items-center min-vh-75">
-                <div class="col-lg-6">
-                    <h1 class="display-4 fw-bold mb-4 animate-fade-in">
-                        Discover Your <br>
-                        <span class="text-warning">Dream Destination</span>
-                    </h1>
-                    <p class="lead mb-4 animate-fade-in">
-                        Explore Thailand, Dubai, Bali, Singapore, Maldives, Turkey & more amazing destinations from India
-                    </p>
-                    
-                    <!-- Search Form -->
-                    <div class="search-form rounded-3 p-4 shadow-lg animate-slide-up">
-                        <form method="GET" action="/packages" class="row g-3">
-                            <div class="col-md-4">
-                                <label class="form-label text-dark">Destination</label>
-                                <select name="destination" class="form-select">
-                                    <option value="">Any Destination</option>
-                                    <option value="thailand">Thailand</option>
-                                    <option value="dubai">Dubai</option>
-                                    <option value="bali">Bali</option>
-                                    <option value="singapore">Singapore</option>
-                                    <option value="maldives">Maldives</option>
-                                    <option value="turkey">Turkey</option>
-                                </select>
-                            </div>
-                            <div class="col-md-4">
-                                <label class="form-label text-dark">Duration</label>
-                                <select name="duration" class="form-select">
-                                    <option value="">Any Duration</option>
-                                    <option value="3-5">3–5 Days</option>
-                                    <option value="6-10">6–10 Days</option>
-                                    <option value="10+">10+ Days</option>
-                                </select>
-                            </div>
-                            <div class="col-md-4">
-                                <label class="form-label text-dark">Budget</label>
-                                <select name="budget" class="form-select">
-                                    <option value="">Any Budget</option>
-                                    <option value="under-50k">Under ₹50,000</option>
-                                    <option value="50k-1l">₹50k–₹1L</option>
-                                    <option value="1l+">₹1L+</option>
-                                </select>
-                            </div>
-                            <div class="col-12">
-                                <button type="submit" class="btn btn-primary btn-lg px-4">
-                                    <i class="fas fa-search me-2"></i>Search Packages
-                                </button>
-                            </div>
-                        </form>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </section>
-
-    <!-- Featured Packages Section -->
-    <section class="py-5" style="margin-top: 80px;">
-        <div class="container">
-            <div class="text-center mb-5">
-                <h2 class="display-5 fw-bold">Featured Travel Packages</h2>
-                <p class="lead text-muted">Handpicked destinations for unforgettable experiences</p>
-            </div>
-
-            {% if packages %}
-            <div class="row g-4">
-                {% for package in packages %}
-                <div class="col-lg-4 col-md-6">
-                    <div class="card package-card h-100 shadow-sm">
-                        <div class="position-relative">
-                            <img src="{{ package.image_url }}" class="card-img-top package-image" alt="{{ package.title }}">
-                            <div class="price-badge">
-                                {% if package.discount_price %}
-                                    <div class="discount-price">₹{{ "{:,.0f}".format(package.price) }}</div>
-                                    <div>₹{{ "{:,.0f}".format(package.discount_price) }}</div>
-                                {% else %}
-                                    <div>₹{{ "{:,.0f}".format(package.price) }}</div>
-                                {% endif %}
-                            </div>
-                        </div>
-                        <div class="card-body d-flex flex-column">
-                            <h5 class="card-title">{{ package.title }}</h5>
-                            <p class="text-muted mb-2">
-                                <i class="fas fa-map-marker-alt me-1"></i>{{ package.destination }}
-                                <i class="fas fa-calendar-alt ms-3 me-1"></i>{{ package.days }} Days
-                            </p>
-                            <p class="card-text flex-grow-1">{{ package.description[:120] }}{% if package.description|length > 120 %}...{% endif %}</p>
-                            <div class="mt-auto">
-                                <a href="/package-details?id={{ package.id }}" class="btn btn-primary w-100">
-                                    <i class="fas fa-eye me-2"></i>View Details
-                                </a>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-                {% endfor %}
-            </div>
-            {% else %}
-            <div class="text-center py-5">
-                <i class="fas fa-plane fa-3x text-muted mb-3"></i>
-                <h4>No packages available at the moment</h4>
-                <p class="text-muted">Please check back later for exciting travel packages!</p>
-            </div>
-            {% endif %}
-
-            <div class="text-center mt-5">
-                <a href="/packages" class="btn btn-outline-primary btn-lg">
-                    <i class="fas fa-list me-2"></i>View All Packages
-                </a>
-            </div>
-        </div>
-    </section>
-
-    <!-- Why Choose Us Section -->
-    <section class="py-5 bg-light">
-        <div class="container">
-            <div class="text-center mb-5">
-                <h2 class="display-6 fw-bold">Why Choose Apni Holidays?</h2>
-            </div>
-            <div class="row g-4">
-                <div class="col-lg-3 col-md-6 text-center">
-                    <div class="p-4">
-                        <i class="fas fa-shield-alt fa-3x text-primary mb-3"></i>
-                        <h5>Trusted & Reliable</h5>
-                        <p class="text-muted">Over 1000+ satisfied customers with excellent reviews</p>
-                    </div>
-                </div>
-                <div class="col-lg-3 col-md-6 text-center">
-                    <div class="p-4">
-                        <i class="fas fa-tags fa-3x text-primary mb-3"></i>
-                        <h5>Best Prices</h5>
-                        <p class="text-muted">Competitive pricing with exclusive deals and discounts</p>
-                    </div>
-                </div>
-                <div class="col-lg-3 col-md-6 text-center">
-                    <div class="p-4">
-                        <i class="fas fa-headset fa-3x text-primary mb-3"></i>
-                        <h5>24/7 Support</h5>
-                        <p class="text-muted">Round-the-clock customer support for hassle-free travel</p>
-                    </div>
-                </div>
-                <div class="col-lg-3 col-md-6 text-center">
-                    <div class="p-4">
-                        <i class="fas fa-globe fa-3x text-primary mb-3"></i>
-                        <h5>Global Destinations</h5>
-                        <p class="text-muted">Handpicked destinations across the world</p>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </section>
-
-    <!-- Footer -->
-    <footer class="footer">
-        <div class="container">
-            <div class="row">
-                <div class="col-lg-4 mb-4">
-                    <h5 class="fw-bold mb-3">
-                        <i class="fas fa-plane me-2"></i>Apni Holidays
-                    </h5>
-                    <p class="mb-3">Your trusted travel partner for unforgettable journeys across the globe. Creating memories that last a lifetime.</p>
-                    <div class="social-links">
-                        <a href="#" class="text-white me-3"><i class="fab fa-facebook-f"></i></a>
-                        <a href="#" class="text-white me-3"><i class="fab fa-instagram"></i></a>
-                        <a href="#" class="text-white me-3"><i class="fab fa-twitter"></i></a>
-                        <a href="#" class="text-white"><i class="fab fa-youtube"></i></a>
-                    </div>
-                </div>
-                <div class="col-lg-2 col-md-6 mb-4">
-                    <h6 class="fw-bold mb-3">Quick Links</h6>
-                    <ul class="list-unstyled">
-                        <li><a href="/" class="text-white-50">Home</a></li>
-                        <li><a href="/packages" class="text-white-50">Packages</a></li>
-                        <li><a href="/contact" class="text-white-50">Contact</a></li>
-                        <li><a href="/about" class="text-white-50">About Us</a></li>
-                    </ul>
-                </div>
-                <div class="col-lg-3 col-md-6 mb-4">
-                    <h6 class="fw-bold mb-3">Popular Destinations</h6>
-                    <ul class="list-unstyled">
-                        <li><a href="/packages?destination=thailand" class="text-white-50">Thailand</a></li>
-                        <li><a href="/packages?destination=dubai" class="text-white-50">Dubai</a></li>
-                        <li><a href="/packages?destination=bali" class="text-white-50">Bali</a></li>
-                        <li><a href="/packages?destination=singapore" class="text-white-50">Singapore</a></li>
-                    </ul>
-                </div>
-                <div class="col-lg-3 mb-4">
-                    <h6 class="fw-bold mb-3">Contact Info</h6>
-                    <ul class="list-unstyled">
-                        <li class="mb-2"><i class="fas fa-envelope me-2"></i>info@apniholidays.com</li>
-                        <li class="mb-2"><i class="fas fa-phone me-2"></i>+91 99999 99999</li>
-                        <li><i class="fas fa-map-marker-alt me-2"></i>Mumbai, India</li>
-                    </ul>
-                </div>
-            </div>
-            <hr class="my-4">
-            <div class="text-center">
-                <p class="mb-0">&copy; 2025 Apni Holidays. All rights reserved. | Designed for GoDaddy Hosting</p>
-            </div>
-        </div>
-    </footer>
-
-    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
-</body>
-</html>
-    """, packages=packages, user_logged_in=user_logged_in, user_name=user_name, user_is_admin=user_is_admin)
+    response = jsonify({
+        'logged_in': user_logged_in,
+        'name': user_name if user_logged_in else None,
+        'is_admin': user_is_admin,
+        'html': render_template('_session_nav.html', user_logged_in=user_logged_in,
+                                user_name=user_name, user_is_admin=user_is_admin) if user_logged_in else ''
+    })
+    response.cache_control.private = True
+    response.cache_control.no_store = True
+    return response
+
+def list_packages(destination, duration, budget, search, limit, cursor=None):
+    """One page of filtered packages for /packages and the API.
+
+    Returns (page, next_cursor); raises ValueError for a bad cursor.
+    """
+    if not search:
+        # Featured first, then by created_at, paged in Firestore
+        return query_packages(destination, duration, budget, limit=limit, cursor=cursor)
+
+    # Best match first, ranked and paged from the in-memory search index
+    packages, scores = search_packages(search, package_filters(destination, duration, budget),
+                                       limit=limit + 1, after=decode_cursor(cursor) if cursor else None)
+    return paginate(packages, limit, cursor, key=relevance_key(scores))
 
 @app.route('/packages')
+@cached_page('destination', 'duration', 'budget', 'search', 'cursor')
 def packages():
     """Package listing page with filters"""
     destination = request.args.get('destination', '')
     duration = request.args.get('duration', '')
     budget = request.args.get('budget', '')
     search = request.args.get('search', '')
+    cursor = request.args.get('cursor', '')
     
     try:
-        # Get packages from Firestore with filters
-        all_packages = get_packages()
-        packages = []
-        
-        for pkg in all_packages:
-            # Apply filters
-            if destination and destination.lower() not in pkg.get('destination', '').lower():
-                continue
-                
-            days = pkg.get('days', 0)
-            if duration:
-                if duration == '3-5' and not (3 <= days <= 5):
-                    continue
-                elif duration == '6-10' and not (6 <= days <= 10):
-                    continue
-                elif duration == '10+' and days <= 10:
-                    continue
-            
-            price = pkg.get('discount_price') or pkg.get('price', 0)
-            if budget:
-                if budget == 'under-50k' and price >= 50000:
-                    continue
-                elif budget == '50k-1l' and not (50000 <= price <= 100000):
-                    continue
-                elif budget == '1l+' and price <= 100000:
-                    continue
-            
-            if search:
-                search_lower = search.lower()
-                title = pkg.get('title', '').lower()
-                dest = pkg.get('destination', '').lower() 
-                desc = pkg.get('description', '').lower()
-                if not (search_lower in title or search_lower in dest or search_lower in desc):
-                    continue
-                    
-            packages.append(pkg)
-        
-        # Sort by featured first, then by created_at
-        packages.sort(key=lambda x: (not x.get('featured', False), x.get('created_at', datetime.min)))
-        
+        packages, next_cursor = list_packages(destination, duration, budget, search,
+                                              PACKAGES_PAGE_SIZE, cursor)
+    except ValueError:
+        # Stale or mangled cursor, start over from the first page
+        return redirect(url_for('packages', destination=destination or None, duration=duration or None,
+                                budget=budget or None, search=search or None))
     except Exception as e:
         print(f"Error fetching packages: {e}")
-        packages = []
+        packages, next_cursor = [], None
     
-    # Check if user is logged in and if they are admin
-    from flask import session
-    user_logged_in = session.get('user_id') is not None
-    user_name = session.get('user_name', 'Guest')
+    facets = facet_counts.snapshot()
+    etag, last_modified = package_validators(packages, extra=f"{next_cursor}:{facets['version']}")
+    not_modified = conditional_response(etag, last_modified)
+    if not_modified is not None:
+        return not_modified
     
-    # Check if user is admin using Firestore
-    user_is_admin = session.get('is_admin', False)
-    if not user_is_admin and user_logged_in:
-        user_email = session.get('user_email', '')
-        try:
-            user = get_user_by_email(user_email)
-            if user and user.get('role') == 'admin':
-                user_is_admin = True
-                session['is_admin'] = True
-        except Exception as e:
-            print(f"Admin check error: {e}")
-            user_is_admin = False
-    
-    return render_template_string("""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Travel Packages - Apni Holidays</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-    <style>
-        .package-card {
-            transition: transform 0.3s ease, box-shadow 0.3s ease;
-            border: none;
-            border-radius: 15px;
-            overflow: hidden;
-        }
-        .package-card:hover {
-            transform: translateY(-5px);
-            box-shadow: 0 15px 35px rgba(0,0,0,0.1);
-        }
-        .package-image {
-            height: 250px;
-            object-fit: cover;
-        }
-        .price-badge {
-            position: absolute;
-            top: 15px;
-            right: 15px;
-            background: linear-gradient(45deg, #ff6b6b, #ffa500);
-            color: white;
-            padding: 8px 15px;
-            border-radius: 25px;
-            font-weight: bold;
-        }
-    </style>
-</head>
-<body>
-    <!-- Navigation -->
-    <nav class="navbar navbar-expand-lg navbar-light bg-white shadow-sm">
-        <div class="container">
-            <a class="navbar-brand fw-bold" href="/">
-                <i class="fas fa-plane text-primary"></i> Apni Holidays
-            </a>
-            <button class="navbar-toggler" type="button" data-bs-toggle="collapse" data-bs-target="#navbarNav">
-                <span class="navbar-toggler-icon"></span>
-            </button>
-            <div class="collapse navbar-collapse" id="navbarNav">
-                <ul class="navbar-nav me-auto">
-                    <li class="nav-item">
-                        <a class="nav-link" href="/">Home</a>
-                    </li>
-                    <li class="nav-item">
-                        <a class="nav-link active" href="/packages">Packages</a>
-                    </li>
-                    <li class="nav-item">
-                        <a class="nav-link" href="/contact">Contact</a>
-                    </li>
-                </ul>
-                <ul class="navbar-nav">
-                    {% if user_logged_in %}
-                    <li class="nav-item dropdown">
-                        <a class="nav-link dropdown-toggle" href="#" id="navbarDropdown" role="button" data-bs-toggle="dropdown">
-                            <i class="fas fa-user me-1"></i>{{ user_name }}
-                        </a>
-                        <ul class="dropdown-menu">
-                            <li><a class="dropdown-item" href="/profile"><i class="fas fa-user me-2"></i>My Profile</a></li>
-                            <li><a class="dropdown-item" href="/my-bookings"><i class="fas fa-suitcase me-2"></i>My Bookings</a></li>
-                            {% if user_is_admin %}
-                            <li><hr class="dropdown-divider"></li>
-                            <li><a class="dropdown-item" href="/admin/dashboard"><i class="fas fa-cog me-2"></i>Admin Panel</a></li>
-                            {% endif %}
-                            <li><hr class="dropdown-divider"></li>
-                            <li><a class="dropdown-item" href="/auth/logout"><i class="fas fa-sign-out-alt me-2"></i>Logout</a></li>
-                        </ul>
-                    </li>
-                    {% else %}
-                    <li class="nav-item">
-                        <a class="nav-link" href="/auth/login">Login</a>
-                    </li>
-                    <li class="nav-item">
-                        <a class="nav-link btn btn-primary text-white px-3 ms-2" href="/auth/register">Sign Up</a>
-                    </li>
-                    {% endif %}
-                </ul>
-            </div>
-        </div>
-    </nav>
-
-    <!-- Page Header -->
-    <section class="bg-primary text-white py-5">
-        <div class="container">
-            <div class="row">
-                <div class="col-lg-8">
-                    <h1 class="display-5 fw-bold mb-3">Travel Packages</h1>
-                    <p class="lead">Discover amazing destinations with our carefully curated travel packages</p>
-                </div>
-            </div>
-        </div>
-    </section>
-
-    <!-- Filters Section -->
-    <section class="py-4 bg-light border-bottom">
-        <div class="container">
-            <form method="GET" class="row g-3 align-items-end">
-                <div class="col-lg-2 col-md-6">
-                    <label class="form-label fw-bold">Search</label>
-                    <input type="text" name="search" class="form-control" 
-                           value="{{ search }}" placeholder="Search packages...">
-                </div>
-                
-                <div class="col-lg-2 col-md-6">
-                    <label class="form-label fw-bold">Destination</label>
-                    <select name="destination" class="form-select">
-                        <option value="">All Destinations</option>
-                        <option value="thailand" {% if destination == 'thailand' %}selected{% endif %}>Thailand</option>
-                        <option value="dubai" {% if destination == 'dubai' %}selected{% endif %}>Dubai</option>
-                        <option value="bali" {% if destination == 'bali' %}selected{% endif %}>Bali</option>
-                        <option value="singapore" {% if destination == 'singapore' %}selected{% endif %}>Singapore</option>
-                        <option value="maldives" {% if destination == 'maldives' %}selected{% endif %}>Maldives</option>
-                        <option value="turkey" {% if destination == 'turkey' %}selected{% endif %}>Turkey</option>
-                    </select>
-                </div>
-                
-                <div class="col-lg-2 col-md-6">
-                    <label class="form-label fw-bold">Duration</label>
-                    <select name="duration" class="form-select">
-                        <option value="">Any Duration</option>
-                        <option value="3-5" {% if duration == '3-5' %}selected{% endif %}>3–5 Days</option>
-                        <option value="6-10" {% if duration == '6-10' %}selected{% endif %}>6–10 Days</option>
-                        <option value="10+" {% if duration == '10+' %}selected{% endif %}>10+ Days</option>
-                    </select>
-                </div>
-                
-                <div class="col-lg-2 col-md-6">
-                    <label class="form-label fw-bold">Budget</label>
-                    <select name="budget" class="form-select">
-                        <option value="">Any Budget</option>
-                        <option value="under-50k" {% if budget == 'under-50k' %}selected{% endif %}>Under ₹50,000</option>
-                        <option value="50k-1l" {% if budget == '50k-1l' %}selected{% endif %}>₹50k–₹1L</option>
-                        <option value="1l+" {% if budget == '1l+' %}selected{% endif %}>₹1L+</option>
-                    </select>
-                </div>
-                
-                <div class="col-lg-2 col-md-6">
-                    <button type="submit" class="btn btn-primary w-100">
-                        <i class="fas fa-filter me-1"></i>Filter
-                    </button>
-                </div>
-                
-                <div class="col-lg-2 col-md-6">
-                    <a href="/packages" class="btn btn-outline-secondary w-100">
-                        <i class="fas fa-times me-1"></i>Clear
-                    </a>
-                </div>
-            </form>
-        </div>
-    </section>
-
-    <!-- Packages Grid -->
-    <section class="py-5">
-        <div class="container">
-            {% if packages %}
-                <div class="d-flex justify-content-between align-items-center mb-4">
-                    <h4 class="mb-0">{{ packages|length }} Package(s) Found</h4>
-                    <small class="text-muted">Showing results for your search</small>
-                </div>
-                
-                <div class="row g-4">
-                    {% for package in packages %}
-                        <div class="col-lg-4 col-md-6">
-                            <div class="card package-card h-100 shadow-sm">
-                                <div class="position-relative">
-                                    <img src="{{ package.image_url or '/assets/images/placeholder-package.jpg' }}" 
-                                         class="card-img-top package-image" 
-                                         alt="{{ package.title }}">
-                                    <div class="position-absolute top-0 start-0 m-3">
-                                        <span class="badge bg-warning text-dark">{{ package.days }} Days</span>
-                                        {% if package.featured %}
-                                        <span class="badge bg-primary ms-1">
-                                            <i class="fas fa-star me-1"></i>Featured
-                                        </span>
-                                        {% endif %}
-                                    </div>
-                                    {% if package.discount_price and package.discount_price < package.price %}
-                                        <div class="price-badge">
-                                            {{ "{:.0f}".format((package.price - package.discount_price) / package.price * 100) }}% OFF
-                                        </div>
-                                    {% endif %}
-                                </div>
-                                
-                                <div class="card-body d-flex flex-column">
-                                    <h5 class="card-title fw-bold">{{ package.title }}</h5>
-                                    <p class="text-muted small mb-2">
-                                        <i class="fas fa-map-marker-alt text-primary me-1"></i>{{ package.destination }}
-                                    </p>
-                                    
-                                    <p class="card-text flex-grow-1">
-                                        {{ package.description[:120] }}{% if package.description|length > 120 %}...{% endif %}
-                                    </p>
-                                    
-                                    <div class="d-flex align-items-center justify-content-between mt-auto">
-                                        <div class="price">
-                                            {% if package.discount_price and package.discount_price < package.price %}
-                                                <span class="h5 fw-bold text-primary mb-0">₹{{ "{:,.0f}".format(package.discount_price) }}</span>
-                                                <span class="text-decoration-line-through text-muted ms-2 small">₹{{ "{:,.0f}".format(package.price) }}</span>
-                                            {% else %}
-                                                <span class="h5 fw-bold text-primary mb-0">₹{{ "{:,.0f}".format(package.price) }}</span>
-                                            {% endif %}
-                                            <div class="small text-muted">per person</div>
-                                        </div>
-                                        <a href="/package/{{ package.id }}" class="btn btn-outline-primary">
-                                            View Details
-                                        </a>
-                                    </div>
-                                </div>
-                            </div>
-                        </div>
-                    {% endfor %}
-                </div>
-                
-            {% else %}
-                <div class="text-center py-5">
-                    <i class="fas fa-search display-4 text-muted mb-3"></i>
-                    <h4 class="text-muted">No packages found</h4>
-                    <p class="text-muted mb-4">Try adjusting your search filters or browse all packages</p>
-                    <a href="/packages" class="btn btn-primary">View All Packages</a>
-                </div>
-            {% endif %}
-        </div>
-    </section>
-
-    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
-</body>
-</html>
-    """, packages=packages, destination=destination, duration=duration, budget=budget, search=search, 
-         user_logged_in=user_logged_in, user_name=user_name, user_is_admin=user_is_admin)
+    next_url = None
+    if next_cursor:
+        next_url = url_for('packages', destination=destination or None, duration=duration or None,
+                           budget=budget or None, search=search or None, cursor=next_cursor)
+    response = make_response(render_template('packages.html', packages=packages, destination=destination, duration=duration, budget=budget, search=search,
+                                             cursor=cursor, next_url=next_url, facets=facets))
+    return set_validators(response, etag, last_modified)
 
 @app.route('/package-details')
 @app.route('/package/<package_id>')
+@cached_page('id')
 def package_details(package_id=None):
     """Package details page"""
     if not package_id:
@@ -722,20 +162,8 @@ def package_details(package_id=None):
         return redirect(url_for('packages'))
     
     try:
-        conn = get_db_connection()
-        if conn:
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT id, title, destination, days, price, discount_price, 
-                       description, highlights, inclusions, exclusions, 
-                       itinerary, image_url 
-                FROM packages 
-                WHERE id = %s AND status = 'active'
-            """, (package_id,))
-            package = cur.fetchone()
-            cur.close()
-            conn.close()
-        else:
+        package = get_package_cached(package_id)
+        if package and package.get('status') != 'active':
             package = None
     except Exception as e:
         print(f"Error fetching package: {e}")
@@ -744,252 +172,70 @@ def package_details(package_id=None):
     if not package:
         return redirect(url_for('packages'))
     
-    pkg_data = {
-        'id': package[0],
-        'title': package[1],
-        'destination': package[2],
-        'days': package[3],
-        'price': package[4],
-        'discount_price': package[5],
-        'description': package[6],
-        'highlights': package[7],
-        'inclusions': package[8],
-        'exclusions': package[9],
-        'itinerary': package[10],
-        'image_url': package[11]
-    }
+    etag, last_modified = package_validators([package])
+    not_modified = conditional_response(etag, last_modified)
+    if not_modified is not None:
+        return not_modified
     
-    return render_template_string("""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{{ package.title }} - Apni Holidays</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-    <style>
-        .package-hero {
-            height: 60vh;
-            background: linear-gradient(rgba(0,0,0,0.4), rgba(0,0,0,0.4)), url('{{ package.image_url }}');
-            background-size: cover;
-            background-position: center;
-        }
-        .price-card {
-            position: sticky;
-            top: 100px;
-        }
-        .feature-list li {
-            padding: 8px 0;
-            border-bottom: 1px solid #eee;
-        }
-    </style>
-</head>
-<body>
-    <!-- Navigation -->
-    <nav class="navbar navbar-expand-lg navbar-light bg-white shadow-sm">
-        <div class="container">
-            <a class="navbar-brand fw-bold" href="/">
-                <i class="fas fa-plane text-primary"></i> Apni Holidays
-            </a>
-            <div class="navbar-nav">
-                <a class="nav-link" href="/">Home</a>
-                <a class="nav-link" href="/packages">Packages</a>
-                <a class="nav-link" href="/contact">Contact</a>
-            </div>
-        </div>
-    </nav>
-
-    <!-- Package Hero -->
-    <section class="package-hero d-flex align-items-center text-white">
-        <div class="container">
-            <div class="row">
-                <div class="col-lg-8">
-                    <h1 class="display-4 fw-bold mb-3">{{ package.title }}</h1>
-                    <p class="lead mb-4">
-                        <i class="fas fa-map-marker-alt me-2"></i>{{ package.destination }}
-                        <i class="fas fa-calendar-alt ms-4 me-2"></i>{{ package.days }} Days
-                    </p>
-                </div>
-            </div>
-        </div>
-    </section>
-
-    <div class="container my-5">
-        <div class="row">
-            <!-- Package Details -->
-            <div class="col-lg-8">
-                <div class="card shadow-sm mb-4">
-                    <div class="card-body">
-                        <h3 class="card-title">Package Overview</h3>
-                        <p class="lead">{{ package.description }}</p>
-                    </div>
-                </div>
-
-                {% if package.highlights %}
-                <div class="card shadow-sm mb-4">
-                    <div class="card-body">
-                        <h4 class="card-title">Highlights</h4>
-                        <ul class="feature-list list-unstyled">
-                            {% for highlight in package.highlights.split(',') %}
-                            <li><i class="fas fa-check text-success me-2"></i>{{ highlight.strip() }}</li>
-                            {% endfor %}
-                        </ul>
-                    </div>
-                </div>
-                {% endif %}
-
-                {% if package.inclusions %}
-                <div class="card shadow-sm mb-4">
-                    <div class="card-body">
-                        <h4 class="card-title">What's Included</h4>
-                        <ul class="feature-list list-unstyled">
-                            {% for inclusion in package.inclusions.split(',') %}
-                            <li><i class="fas fa-plus text-success me-2"></i>{{ inclusion.strip() }}</li>
-                            {% endfor %}
-                        </ul>
-                    </div>
-                </div>
-                {% endif %}
-
-                {% if package.exclusions %}
-                <div class="card shadow-sm mb-4">
-                    <div class="card-body">
-                        <h4 class="card-title">What's Not Included</h4>
-                        <ul class="feature-list list-unstyled">
-                            {% for exclusion in package.exclusions.split(',') %}
-                            <li><i class="fas fa-minus text-danger me-2"></i>{{ exclusion.strip() }}</li>
-                            {% endfor %}
-                        </ul>
-                    </div>
-                </div>
-                {% endif %}
+    response = make_response(render_template('package_details.html', package=package, today=lambda: datetime.now().strftime('%Y-%m-%d')))
+    return set_validators(response, etag, last_modified)
 
-                {% if package.itinerary %}
-                <div class="card shadow-sm mb-4">
-                    <div class="card-body">
-                        <h4 class="card-title">Detailed Itinerary</h4>
-                        <div class="itinerary-content">
-                            {% for day in package.itinerary.split('\n') %}
-                            {% if day.strip() %}
-                            <div class="mb-3 p-3 bg-light rounded">
-                                <p class="mb-0">{{ day.strip() }}</p>
-                            </div>
-                            {% endif %}
-                            {% endfor %}
-                        </div>
-                    </div>
-                </div>
-                {% endif %}
-            </div>
-
-            <!-- Booking Sidebar -->
-            <div class="col-lg-4">
-                <div class="card shadow price-card">
-                    <div class="card-body">
-                        <div class="text-center mb-4">
-                            {% if package.discount_price and package.discount_price < package.price %}
-                                <div class="h2 text-primary fw-bold">₹{{ "{:,.0f}".format(package.discount_price) }}</div>
-                                <div class="text-decoration-line-through text-muted">₹{{ "{:,.0f}".format(package.price) }}</div>
-                                <div class="badge bg-danger">{{ "{:.0f}".format((package.price - package.discount_price) / package.price * 100) }}% OFF</div>
-                            {% else %}
-                                <div class="h2 text-primary fw-bold">₹{{ "{:,.0f}".format(package.price) }}</div>
-                            {% endif %}
-                            <div class="text-muted">per person</div>
-                        </div>
-
-                        <form id="bookingForm" action="/booking" method="POST" class="needs-validation" novalidate>
-                            <input type="hidden" name="package_id" value="{{ package.id }}">
-                            
-                            <div class="mb-3">
-                                <label class="form-label">Travel Date</label>
-                                <input type="date" class="form-control" name="travel_date" required min="{{ today() }}">
-                            </div>
-                            
-                            <div class="mb-3">
-                                <label class="form-label">Number of Travelers</label>
-                                <select class="form-select" name="travelers" required>
-                                    <option value="">Select travelers</option>
-                                    {% for i in range(1, 11) %}
-                                    <option value="{{ i }}">{{ i }} {{ 'Person' if i == 1 else 'People' }}</option>
-                                    {% endfor %}
-                                </select>
-                            </div>
-                            
-                            <div class="mb-3">
-                                <label class="form-label">Full Name</label>
-                                <input type="text" class="form-control" name="name" placeholder="Enter full name" required>
-                            </div>
-                            
-                            <div class="mb-3">
-                                <label class="form-label">Email</label>
-                                <input type="email" class="form-control" name="email" placeholder="Enter email" required>
-                            </div>
-                            
-                            <div class="mb-4">
-                                <label class="form-label">Phone</label>
-                                <input type="tel" class="form-control" name="phone" placeholder="Enter phone number" required>
-                            </div>
-                            
-                            <button type="submit" class="btn btn-primary w-100 btn-lg">
-                                <i class="fas fa-credit-card me-2"></i>Book Now
-                            </button>
-                        </form>
-                        
-                        <div class="text-center mt-3">
-                            <small class="text-muted">
-                                <i class="fas fa-shield-alt me-1"></i>Secure booking process
-                            </small>
-                        </div>
-                    </div>
-                </div>
-
-                <!-- Contact Info -->
-                <div class="card shadow mt-4">
-                    <div class="card-body text-center">
-                        <h5>Need Help?</h5>
-                        <p class="text-muted">Our travel experts are here to help</p>
-                        <div class="d-grid gap-2">
-                            <a href="tel:+919999999999" class="btn btn-outline-primary">
-                                <i class="fas fa-phone me-2"></i>Call Us
-                            </a>
-                            <a href="https://wa.me/919999999999" class="btn btn-outline-success">
-                                <i class="fab fa-whatsapp me-2"></i>WhatsApp
-                            </a>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
-    <script>
-    document.getElementById('bookingForm').addEventListener('submit', async function(e) {
-        e.preventDefault();
-        const formData = new FormData(this);
-        
-        try {
-            const response = await fetch('/booking', {
-                method: 'POST',
-                body: formData
-            });
-            const result = await response.json();
-            
-            if (result.status === 'success') {
-                alert('Booking submitted successfully! Booking ID: ' + result.booking_id + '. Total amount: ₹' + result.total_amount.toLocaleString());
-                this.reset();
-            } else {
-                alert('Booking failed: ' + result.message);
-            }
-        } catch (error) {
-            alert('Failed to submit booking. Please try again.');
-        }
-    });
-    </script>
-</body>
-</html>
-    """, package=pkg_data, today=lambda: datetime.now().strftime('%Y-%m-%d'))
+@app.route('/api/packages')
+@cached_page('destination', 'duration', 'budget', 'search', 'cursor', 'limit', 'fields')
+def api_packages():
+    """Paginated JSON package listing with the /packages filters"""
+    destination = request.args.get('destination', '')
+    duration = request.args.get('duration', '')
+    budget = request.args.get('budget', '')
+    search = request.args.get('search', '')
+    fields = parse_fields(request.args.get('fields', ''))
+    try:
+        limit = min(max(int(request.args.get('limit', API_PAGE_SIZE)), 1), API_MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'limit must be a number'}), 400
+    
+    try:
+        page, next_cursor = list_packages(destination, duration, budget, search,
+                                          limit, request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        print(f"Error fetching API packages: {e}")
+        return jsonify({'status': 'error', 'message': 'Failed to fetch packages'}), 500
+    
+    etag, last_modified = package_validators(page, extra=next_cursor)
+    not_modified = conditional_response(etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    
+    response = jsonify({
+        'status': 'success',
+        'packages': [project(pkg, fields) for pkg in page],
+        'next_cursor': next_cursor
+    })
+    return set_validators(response, etag, last_modified)
+
+@app.route('/api/packages/<package_id>')
+@cached_page('fields')
+def api_package_detail(package_id):
+    """Single package as JSON"""
+    try:
+        package = get_package_cached(package_id)
+    except Exception as e:
+        print(f"Error fetching API package {package_id}: {e}")
+        return jsonify({'status': 'error', 'message': 'Failed to fetch package'}), 500
+    
+    if not package or package.get('status') != 'active':
+        return jsonify({'status': 'error', 'message': 'Package not found'}), 404
+    
+    etag, last_modified = package_validators([package])
+    not_modified = conditional_response(etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    
+    fields = parse_fields(request.args.get('fields', ''))
+    response = jsonify({'status': 'success', 'package': project(package, fields)})
+    return set_validators(response, etag, last_modified)
 
 @app.route('/contact', methods=['GET', 'POST'])
 def contact():
@@ -1004,152 +250,23 @@ def contact():
         package_id = request.form.get('package_id', '')
         
         try:
-            conn = get_db_connection()
-            if conn:
-                cur = conn.cursor()
-                inquiry_id = f"inq_{int(datetime.now().timestamp())}"
-                cur.execute("""
-                    INSERT INTO inquiries (id, name, email, phone, subject, message, package_id, status, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, 'new', %s)
-                """, (inquiry_id, name, email, phone, subject, message, package_id or None, datetime.now()))
-                conn.commit()
-                cur.close()
-                conn.close()
-                
+            inquiry_id = add_inquiry({
+                'name': name,
+                'email': email,
+                'phone': phone,
+                'subject': subject,
+                'message': message,
+                'package_id': package_id or None
+            })
+            if inquiry_id:
                 return jsonify({'status': 'success', 'message': 'Thank you! Your inquiry has been submitted successfully.'})
             else:
-                return jsonify({'status': 'error', 'message': 'Database connection failed'})
+                return jsonify({'status': 'error', 'message': 'Failed to submit inquiry. Please try again.'})
         except Exception as e:
             print(f"Contact form error: {e}")
             return jsonify({'status': 'error', 'message': 'Failed to submit inquiry. Please try again.'})
     
-    return render_template_string("""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Contact Us - Apni Holidays</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-</head>
-<body>
-    <nav class="navbar navbar-expand-lg navbar-light bg-white shadow-sm">
-        <div class="container">
-            <a class="navbar-brand fw-bold" href="/">
-                <i class="fas fa-plane text-primary"></i> Apni Holidays
-            </a>
-            <div class="navbar-nav">
-                <a class="nav-link" href="/">Home</a>
-                <a class="nav-link" href="/packages">Packages</a>
-                <a class="nav-link active" href="/contact">Contact</a>
-            </div>
-        </div>
-    </nav>
-
-    <div class="container my-5">
-        <div class="row">
-            <div class="col-lg-8 mx-auto">
-                <div class="text-center mb-5">
-                    <h1 class="display-5 fw-bold">Contact Us</h1>
-                    <p class="lead text-muted">Get in touch with our travel experts</p>
-                </div>
-
-                <div class="card shadow">
-                    <div class="card-body p-5">
-                        <form id="contactForm" method="POST">
-                            <div class="row g-3">
-                                <div class="col-md-6">
-                                    <label class="form-label">Full Name *</label>
-                                    <input type="text" class="form-control" name="name" required>
-                                </div>
-                                <div class="col-md-6">
-                                    <label class="form-label">Email Address *</label>
-                                    <input type="email" class="form-control" name="email" required>
-                                </div>
-                                <div class="col-md-6">
-                                    <label class="form-label">Phone Number *</label>
-                                    <input type="tel" class="form-control" name="phone" required>
-                                </div>
-                                <div class="col-md-6">
-                                    <label class="form-label">Subject</label>
-                                    <input type="text" class="form-control" name="subject" placeholder="General Inquiry">
-                                </div>
-                                <div class="col-12">
-                                    <label class="form-label">Message *</label>
-                                    <textarea class="form-control" name="message" rows="5" required 
-                                              placeholder="Tell us about your travel plans..."></textarea>
-                                </div>
-                                <div class="col-12">
-                                    <button type="submit" class="btn btn-primary btn-lg">
-                                        <i class="fas fa-paper-plane me-2"></i>Send Message
-                                    </button>
-                                </div>
-                            </div>
-                        </form>
-                    </div>
-                </div>
-
-                <div class="row mt-5">
-                    <div class="col-md-4 text-center mb-4">
-                        <div class="card h-100">
-                            <div class="card-body">
-                                <i class="fas fa-phone fa-2x text-primary mb-3"></i>
-                                <h5>Call Us</h5>
-                                <p class="text-muted">+91 99999 99999</p>
-                            </div>
-                        </div>
-                    </div>
-                    <div class="col-md-4 text-center mb-4">
-                        <div class="card h-100">
-                            <div class="card-body">
-                                <i class="fas fa-envelope fa-2x text-primary mb-3"></i>
-                                <h5>Email Us</h5>
-                                <p class="text-muted">info@apniholidays.com</p>
-                            </div>
-                        </div>
-                    </div>
-                    <div class="col-md-4 text-center mb-4">
-                        <div class="card h-100">
-                            <div class="card-body">
-                                <i class="fab fa-whatsapp fa-2x text-primary mb-3"></i>
-                                <h5>WhatsApp</h5>
-                                <p class="text-muted">+91 99999 99999</p>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
-    <script>
-    document.getElementById('contactForm').addEventListener('submit', async function(e) {
-        e.preventDefault();
-        const formData = new FormData(this);
-        
-        try {
-            const response = await fetch('/contact', {
-                method: 'POST',
-                body: formData
-            });
-            const result = await response.json();
-            
-            if (result.status === 'success') {
-                alert('Thank you! Your message has been sent successfully.');
-                this.reset();
-            } else {
-                alert('Error: ' + result.message);
-            }
-        } catch (error) {
-            alert('Failed to send message. Please try again.');
-        }
-    });
-    </script>
-</body>
-</html>
-    """)
+    return render_template('contact.html')
 
 @app.route('/booking', methods=['POST'])
 def booking():
@@ -1163,36 +280,35 @@ def booking():
         phone = request.form.get('phone')
         
         # Get package details for pricing
-        conn = get_db_connection()
-        if conn:
-            cur = conn.cursor()
-            cur.execute("SELECT price, discount_price FROM packages WHERE id = %s", (package_id,))
-            package = cur.fetchone()
+        package = get_package_cached(package_id) if package_id else None
+        
+        if package and package.get('status') == 'active':
+            price_per_person = package.get('discount_price') or package.get('price', 0)
+            total_amount = price_per_person * travelers
             
-            if package:
-                price_per_person = package[1] if package[1] else package[0]
-                total_amount = price_per_person * travelers
-                
-                booking_id = f"book_{int(datetime.now().timestamp())}"
-                cur.execute("""
-                    INSERT INTO bookings (id, package_id, traveler_name, traveler_email, traveler_phone,
-                                        number_of_travelers, travel_date, total_amount, 
-                                        payment_status, booking_status, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 'pending', 'pending', %s)
-                """, (booking_id, package_id, name, email, phone, travelers, travel_date, 
-                      total_amount, datetime.now()))
-                conn.commit()
-                
-                return jsonify({
-                    'status': 'success',
-                    'message': 'Booking request submitted successfully!',
-                    'booking_id': booking_id,
-                    'total_amount': total_amount
-                })
-            else:
-                return jsonify({'status': 'error', 'message': 'Package not found'})
+            booking_id = add_booking({
+                'package_id': package_id,
+                'user_id': g.user_id,
+                'traveler_name': name,
+                'traveler_email': email,
+                'traveler_phone': phone,
+                'number_of_travelers': travelers,
+                'travel_date': travel_date,
+                'total_amount': total_amount,
+                'payment_status': 'pending',
+                'booking_status': 'pending'
+            })
+            if not booking_id:
+                return jsonify({'status': 'error', 'message': 'Booking failed. Please try again.'})
+            
+            return jsonify({
+                'status': 'success',
+                'message': 'Booking request submitted successfully!',
+                'booking_id': booking_id,
+                'total_amount': total_amount
+            })
         else:
-            return jsonify({'status': 'error', 'message': 'Database connection failed'})
+            return jsonify({'status': 'error', 'message': 'Package not found'})
             
     except Exception as e:
         print(f"Booking error: {e}")
@@ -1205,21 +321,25 @@ def auth_login():
     error_message = ''
     
     if request.method == 'POST':
-        email = request.form.get('email')
+        email = normalize_email(request.form.get('email'))
         password = request.form.get('password')
         
         if not email or not password:
             error_message = 'Please enter both email and password'
+        elif not allow_login_attempt(request.remote_addr, email):
+            return render_template('login.html', error_message=THROTTLED_MESSAGE,
+                                   firebase_config=FIREBASE_CONFIG), 429
         else:
             try:
                 # Use Firestore to authenticate user
                 user = get_user_by_email(email)
                 
                 if user and user.get('status') == 'active':
-                    stored_password = user.get('password_hash')
+                    stored_password = stored_password_hash(user)
                     if stored_password:
-                        from werkzeug.security import check_password_hash
-                        if check_password_hash(stored_password, password):
+                        if verify_password(stored_password, password):
+                            upgrade_password_hash(user, password)
+                            record_login(user['id'])
                             # Set user session
                             session['user_id'] = user.get('id')
                             session['user_name'] = user.get('name')
@@ -1231,131 +351,13 @@ def auth_login():
                         error_message = 'Invalid email or password'
                 else:
                     error_message = 'Invalid email or password'
+            except HashingBusy:
+                error_message = BUSY_MESSAGE
             except Exception as e:
                 print(f"Login error: {e}")
                 error_message = 'Login failed. Please try again.'
     
-    return render_template_string("""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Login - Apni Holidays</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-</head>
-<body class="bg-light">
-    <div class="min-vh-100 d-flex align-items-center">
-        <div class="container">
-            <div class="row justify-content-center">
-                <div class="col-md-6 col-lg-5">
-                    <div class="card shadow">
-                        <div class="card-body p-5">
-                            <div class="text-center mb-4">
-                                <a href="/" class="text-decoration-none">
-                                    <i class="fas fa-plane text-primary" style="font-size: 3rem;"></i>
-                                    <h3 class="fw-bold mt-3 text-primary">Apni Holidays</h3>
-                                </a>
-                                <p class="text-muted">Welcome back! Please sign in to your account</p>
-                            </div>
-                            
-                            """ + (f'<div class="alert alert-danger">{error_message}</div>' if error_message else '') + """
-                            
-                            <div class="d-grid mb-3">
-                                <button type="button" id="googleSignInBtn" class="btn btn-danger btn-lg">
-                                    <i class="fab fa-google me-2"></i>Continue with Google
-                                </button>
-                            </div>
-                            
-                            <div class="text-center mb-3">
-                                <small class="text-muted">OR</small>
-                            </div>
-                            
-                            <form method="POST">
-                                <div class="mb-3">
-                                    <label class="form-label">Email Address</label>
-                                    <input type="email" class="form-control" name="email" required>
-                                </div>
-                                
-                                <div class="mb-4">
-                                    <label class="form-label">Password</label>
-                                    <input type="password" class="form-control" name="password" required>
-                                </div>
-                                
-                                <button type="submit" class="btn btn-primary w-100 py-2 mb-3">
-                                    <i class="fas fa-sign-in-alt me-2"></i>Sign In
-                                </button>
-                            </form>
-                            
-                            <div class="text-center">
-                                <p class="text-muted mb-0">
-                                    Don't have an account? 
-                                    <a href="/auth/register" class="text-decoration-none">Sign up here</a>
-                                </p>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <!-- Firebase SDK -->
-    <script src="https://www.gstatic.com/firebasejs/9.23.0/firebase-app-compat.js"></script>
-    <script src="https://www.gstatic.com/firebasejs/9.23.0/firebase-auth-compat.js"></script>
-    
-    <script>
-        // Firebase configuration
-        const firebaseConfig = """ + json.dumps(FIREBASE_CONFIG) + """;
-        
-        // Initialize Firebase
-        firebase.initializeApp(firebaseConfig);
-        const auth = firebase.auth();
-        
-        // Google sign-in
-        document.getElementById('googleSignInBtn').addEventListener('click', function() {
-            console.log('Current domain:', window.location.hostname);
-            console.log('Current origin:', window.location.origin);
-            const provider = new firebase.auth.GoogleAuthProvider();
-            auth.signInWithPopup(provider)
-                .then((result) => {
-                    const user = result.user;
-                    // Send user data to backend
-                    fetch('/auth/google-login', {
-                        method: 'POST',
-                        headers: {
-                            'Content-Type': 'application/json',
-                        },
-                        body: JSON.stringify({
-                            uid: user.uid,
-                            email: user.email,
-                            name: user.displayName,
-                            photo: user.photoURL
-                        })
-                    })
-                    .then(response => response.json())
-                    .then(data => {
-                        if (data.status === 'success') {
-                            window.location.href = '/';
-                        } else {
-                            alert('Login failed: ' + data.message);
-                        }
-                    })
-                    .catch((error) => {
-                        console.error('Error:', error);
-                        alert('Login failed. Please try again.');
-                    });
-                })
-                .catch((error) => {
-                    console.error('Google sign-in error:', error);
-                    alert('Google sign-in failed: ' + error.message);
-                });
-        });
-    </script>
-</body>
-</html>
-    """, error_message=error_message)
+    return render_template('login.html', error_message=error_message, firebase_config=FIREBASE_CONFIG)
 
 @app.route('/auth/google-login', methods=['POST'])
 def google_login():
@@ -1363,7 +365,7 @@ def google_login():
     try:
         data = request.get_json()
         uid = data.get('uid')
-        email = data.get('email')
+        email = normalize_email(data.get('email'))
         name = data.get('name')
         photo = data.get('photo')
         
@@ -1379,7 +381,7 @@ def google_login():
             user_name = user.get('name')
             # Update Firebase UID if not set
             if not user.get('firebase_uid'):
-                update_user_data(user_id, {'firebase_uid': uid, 'last_login': datetime.now()})
+                update_user(user_id, {'firebase_uid': uid})
         else:
             # Create new user
             user_id = f"user_google_{uid[-8:]}"
@@ -1389,20 +391,20 @@ def google_login():
                 'email': email,
                 'firebase_uid': uid,
                 'status': 'active',
-                'created_at': datetime.now(),
-                'last_login': datetime.now()
+                'created_at': datetime.now()
             }
-            create_user(user_data)
+            add_user(user_data)
             user_name = name
-            
-            # Set session
-            from flask import session
-            session['user_id'] = user_id
-            session['user_name'] = user_name
-            session['user_email'] = email
-            session['firebase_uid'] = uid
-            
-            return jsonify({'status': 'success', 'message': 'Login successful'})
+        record_login(user_id)
+        
+        # Set session
+        from flask import session
+        session['user_id'] = user_id
+        session['user_name'] = user_name
+        session['user_email'] = email
+        session['firebase_uid'] = uid
+        
+        return jsonify({'status': 'success', 'message': 'Login successful'})
             
     except Exception as e:
         print(f"Google login error: {e}")
@@ -1414,7 +416,7 @@ def admin_google_login():
     try:
         data = request.get_json()
         uid = data.get('uid')
-        email = data.get('email')
+        email = normalize_email(data.get('email'))
         name = data.get('name')
         
         if not uid or not email:
@@ -1462,135 +464,7 @@ def admin_google_login():
 @app.route('/auth/register')
 def auth_register():
     """User registration page"""
-    return render_template_string("""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Register - Apni Holidays</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-</head>
-<body class="bg-light">
-    <div class="min-vh-100 d-flex align-items-center">
-        <div class="container">
-            <div class="row justify-content-center">
-                <div class="col-md-6 col-lg-5">
-                    <div class="card shadow">
-                        <div class="card-body p-5">
-                            <div class="text-center mb-4">
-                                <a href="/" class="text-decoration-none">
-                                    <i class="fas fa-plane text-primary" style="font-size: 3rem;"></i>
-                                    <h3 class="fw-bold mt-3 text-primary">Apni Holidays</h3>
-                                </a>
-                                <p class="text-muted">Create your account to start booking</p>
-                            </div>
-                            
-                            <form>
-                                <div class="mb-3">
-                                    <label class="form-label">Full Name</label>
-                                    <input type="text" class="form-control" required>
-                                </div>
-                                
-                                <div class="mb-3">
-                                    <label class="form-label">Email Address</label>
-                                    <input type="email" class="form-control" required>
-                                </div>
-                                
-                                <div class="mb-3">
-                                    <label class="form-label">Phone Number</label>
-                                    <input type="tel" class="form-control" required>
-                                </div>
-                                
-                                <div class="mb-4">
-                                    <label class="form-label">Password</label>
-                                    <input type="password" class="form-control" required>
-                                </div>
-                                
-                                <button type="submit" class="btn btn-primary w-100 py-2 mb-3">
-                                    <i class="fas fa-user-plus me-2"></i>Create Account
-                                </button>
-                            </form>
-                            
-                            <div class="text-center my-3">
-                                <span class="text-muted">OR</span>
-                            </div>
-                            
-                            <div class="d-grid mb-3">
-                                <button type="button" id="registerGoogleSignInBtn" class="btn btn-danger">
-                                    <i class="fab fa-google me-2"></i>Sign up with Google
-                                </button>
-                            </div>
-                            
-                            <div class="text-center">
-                                <p class="text-muted mb-0">
-                                    Already have an account? 
-                                    <a href="/auth/login" class="text-decoration-none">Sign in here</a>
-                                </p>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <!-- Firebase SDK -->
-    <script src="https://www.gstatic.com/firebasejs/9.23.0/firebase-app-compat.js"></script>
-    <script src="https://www.gstatic.com/firebasejs/9.23.0/firebase-auth-compat.js"></script>
-    
-    <script>
-        // Firebase configuration
-        const firebaseConfig = """ + json.dumps(FIREBASE_CONFIG) + """;
-        
-        // Initialize Firebase
-        firebase.initializeApp(firebaseConfig);
-        const auth = firebase.auth();
-        
-        // Google sign-up
-        document.getElementById('registerGoogleSignInBtn').addEventListener('click', function() {
-            console.log('Register - Current domain:', window.location.hostname);
-            console.log('Register - Current origin:', window.location.origin);
-            const provider = new firebase.auth.GoogleAuthProvider();
-            auth.signInWithPopup(provider)
-                .then((result) => {
-                    const user = result.user;
-                    // Send user data to backend
-                    fetch('/auth/google-login', {
-                        method: 'POST',
-                        headers: {
-                            'Content-Type': 'application/json',
-                        },
-                        body: JSON.stringify({
-                            uid: user.uid,
-                            email: user.email,
-                            name: user.displayName,
-                            photo: user.photoURL
-                        })
-                    })
-                    .then(response => response.json())
-                    .then(data => {
-                        if (data.status === 'success') {
-                            window.location.href = '/';
-                        } else {
-                            alert('Registration failed: ' + data.message);
-                        }
-                    })
-                    .catch((error) => {
-                        console.error('Error:', error);
-                        alert('Registration failed. Please try again.');
-                    });
-                })
-                .catch((error) => {
-                    console.error('Google sign-in error:', error);
-                    alert('Google sign-in failed: ' + error.message);
-                });
-        });
-    </script>
-</body>
-</html>
-    """)
+    return render_template('register.html', firebase_config=FIREBASE_CONFIG)
 
 @app.route('/admin')
 def admin():
@@ -1603,20 +477,25 @@ def admin_login():
     error_message = ''
     
     if request.method == 'POST':
-        email = request.form.get('email')
+        email = normalize_email(request.form.get('email'))
         password = request.form.get('password')
         
+        if not allow_login_attempt(request.remote_addr, email):
+            return render_template('admin_login.html', error_message=THROTTLED_MESSAGE,
+                                   firebase_config=FIREBASE_CONFIG), 429
+        
         # Check admin credentials using Firestore
         try:
             admin = get_user_by_email(email)
             
             if admin and admin.get('role') == 'admin' and admin.get('status') == 'active':
-                stored_password = admin.get('password_hash') or admin.get('password')
+                stored_password = stored_password_hash(admin)
                 if stored_password:
-                    # Verify password using werkzeug security
-                    from werkzeug.security import check_password_hash
+                    # Verify password on the hashing pool
                     try:
-                        if check_password_hash(stored_password, password):
+                        if verify_password(stored_password, password):
+                            upgrade_password_hash(admin, password)
+                            record_login(admin['id'])
                             from flask import session
                             # Set admin session
                             session['is_admin'] = True
@@ -1629,6 +508,8 @@ def admin_login():
                             return redirect('/admin/dashboard')
                         else:
                             error_message = 'Invalid email or password'
+                    except HashingBusy:
+                        error_message = BUSY_MESSAGE
                     except Exception as e:
                         print(f"Password verification error: {e}")
                         error_message = 'Invalid email or password'
@@ -1640,129 +521,13 @@ def admin_login():
             print(f"Admin login error: {e}")
             error_message = 'Login failed. Please try again.'
     
-    error_div = f'<div class="alert alert-danger">{error_message}</div>' if error_message else ''
-    return render_template_string(admin_login_template % {'error_div': error_div})
-
-admin_login_template = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Admin Login - Apni Holidays</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-</head>
-<body class="bg-dark">
-    <div class="min-vh-100 d-flex align-items-center">
-        <div class="container">
-            <div class="row justify-content-center">
-                <div class="col-md-6 col-lg-4">
-                    <div class="card shadow">
-                        <div class="card-body p-5">
-                            <div class="text-center mb-4">
-                                <i class="fas fa-shield-alt text-primary" style="font-size: 3rem;"></i>
-                                <h3 class="fw-bold mt-3">Admin Panel</h3>
-                                <p class="text-muted">Apni Holidays Administration</p>
-                            </div>
-                            
-                            %(error_div)s
-                            
-                            <form method="POST">
-                                <div class="mb-3">
-                                    <label class="form-label">Email Address</label>
-                                    <input type="email" class="form-control" name="email" required 
-                                           placeholder="Enter your admin email">
-                                </div>
-                                
-                                <div class="mb-4">
-                                    <label class="form-label">Password</label>
-                                    <input type="password" class="form-control" name="password" required 
-                                           placeholder="Enter your password">
-                                </div>
-                                
-                                <button type="submit" class="btn btn-primary w-100 py-2">
-                                    <i class="fas fa-sign-in-alt me-2"></i>Admin Login
-                                </button>
-                            </form>
-                            
-                            <div class="text-center my-3">
-                                <span class="text-muted">OR</span>
-                            </div>
-                            
-                            <div class="d-grid">
-                                <button type="button" id="adminGoogleSignInBtn" class="btn btn-danger">
-                                    <i class="fab fa-google me-2"></i>Continue with Google
-                                </button>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <!-- Firebase SDK -->
-    <script src="https://www.gstatic.com/firebasejs/9.23.0/firebase-app-compat.js"></script>
-    <script src="https://www.gstatic.com/firebasejs/9.23.0/firebase-auth-compat.js"></script>
-    
-    <script>
-        // Firebase configuration
-        const firebaseConfig = """ + json.dumps(FIREBASE_CONFIG) + """;
-        
-        // Initialize Firebase
-        firebase.initializeApp(firebaseConfig);
-        const auth = firebase.auth();
-        
-        // Admin Google sign-in
-        document.getElementById('adminGoogleSignInBtn').addEventListener('click', function() {
-            console.log('Admin - Current domain:', window.location.hostname);
-            console.log('Admin - Current origin:', window.location.origin);
-            const provider = new firebase.auth.GoogleAuthProvider();
-            auth.signInWithPopup(provider)
-                .then((result) => {
-                    const user = result.user;
-                    // Send user data to backend for admin verification
-                    fetch('/admin/google-login', {
-                        method: 'POST',
-                        headers: {
-                            'Content-Type': 'application/json',
-                        },
-                        body: JSON.stringify({
-                            uid: user.uid,
-                            email: user.email,
-                            name: user.displayName,
-                            photo: user.photoURL
-                        })
-                    })
-                    .then(response => response.json())
-                    .then(data => {
-                        if (data.status === 'success') {
-                            window.location.href = '/admin/dashboard';
-                        } else {
-                            alert('Admin login failed: ' + data.message);
-                        }
-                    })
-                    .catch((error) => {
-                        console.error('Error:', error);
-                        alert('Admin login failed. Please try again.');
-                    });
-                })
-                .catch((error) => {
-                    console.error('Google sign-in error:', error);
-                    alert('Google sign-in failed: ' + error.message);
-                });
-        });
-    </script>
-</body>
-</html>
-"""
+    return render_template('admin_login.html', error_message=error_message, firebase_config=FIREBASE_CONFIG)
 
 @app.route('/admin/dashboard')
 def admin_dashboard():
     """Admin dashboard"""
     from flask import session
-    if not session.get('is_admin'):
+    if not g.is_admin:
         return redirect('/admin/login')
     
     # Get statistics from Firestore
@@ -1780,152 +545,7 @@ def admin_dashboard():
         print(f"Admin dashboard error: {e}")
         stats = {'packages': 0, 'users': 0, 'featured': 0, 'inquiries': 0}
     
-    return render_template_string("""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Admin Dashboard - Apni Holidays</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-</head>
-<body>
-    <nav class="navbar navbar-expand-lg navbar-dark bg-dark">
-        <div class="container">
-            <a class="navbar-brand fw-bold" href="/admin/dashboard">
-                <i class="fas fa-cog me-2"></i>Admin Panel
-            </a>
-            <div class="navbar-nav ms-auto">
-                <a class="nav-link" href="/admin/logout">
-                    <i class="fas fa-sign-out-alt me-1"></i>Logout
-                </a>
-            </div>
-        </div>
-    </nav>
-
-    <div class="container-fluid py-4">
-        <div class="row">
-            <div class="col-12 mb-4">
-                <h2>Welcome back, {{ session['admin_name'] }}!</h2>
-                <p class="text-muted">Here's what's happening with your travel packages today.</p>
-            </div>
-        </div>
-        
-        <div class="row">
-            <div class="col-xl-3 col-md-6 mb-4">
-                <div class="card border-left-primary shadow h-100 py-2">
-                    <div class="card-body">
-                        <div class="row no-gutters align-items-center">
-                            <div class="col mr-2">
-                                <div class="text-xs font-weight-bold text-primary text-uppercase mb-1">
-                                    Total Packages</div>
-                                <div class="h5 mb-0 font-weight-bold text-gray-800">{{ stats.packages }}</div>
-                            </div>
-                            <div class="col-auto">
-                                <i class="fas fa-suitcase fa-2x text-gray-300"></i>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-            
-            <div class="col-xl-3 col-md-6 mb-4">
-                <div class="card border-left-success shadow h-100 py-2">
-                    <div class="card-body">
-                        <div class="row no-gutters align-items-center">
-                            <div class="col mr-2">
-                                <div class="text-xs font-weight-bold text-success text-uppercase mb-1">
-                                    Featured Packages</div>
-                                <div class="h5 mb-0 font-weight-bold text-gray-800">{{ stats.featured }}</div>
-                            </div>
-                            <div class="col-auto">
-                                <i class="fas fa-star fa-2x text-gray-300"></i>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-            
-            <div class="col-xl-3 col-md-6 mb-4">
-                <div class="card border-left-info shadow h-100 py-2">
-                    <div class="card-body">
-                        <div class="row no-gutters align-items-center">
-                            <div class="col mr-2">
-                                <div class="text-xs font-weight-bold text-info text-uppercase mb-1">
-                                    Total Users</div>
-                                <div class="h5 mb-0 font-weight-bold text-gray-800">{{ stats.users }}</div>
-                            </div>
-                            <div class="col-auto">
-                                <i class="fas fa-users fa-2x text-gray-300"></i>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-            
-            <div class="col-xl-3 col-md-6 mb-4">
-                <div class="card border-left-warning shadow h-100 py-2">
-                    <div class="card-body">
-                        <div class="row no-gutters align-items-center">
-                            <div class="col mr-2">
-                                <div class="text-xs font-weight-bold text-warning text-uppercase mb-1">
-                                    New Inquiries</div>
-                                <div class="h5 mb-0 font-weight-bold text-gray-800">{{ stats.inquiries }}</div>
-                            </div>
-                            <div class="col-auto">
-                                <i class="fas fa-envelope fa-2x text-gray-300"></i>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <div class="row">
-            <div class="col-12">
-                <div class="card shadow">
-                    <div class="card-header py-3">
-                        <h6 class="m-0 font-weight-bold text-primary">Quick Actions</h6>
-                    </div>
-                    <div class="card-body">
-                        <div class="row">
-                            <div class="col-md-3 mb-3">
-                                <a href="/admin/packages/add" class="btn btn-primary w-100">
-                                    <i class="fas fa-plus me-2"></i>Add Package
-                                </a>
-                            </div>
-                            <div class="col-md-3 mb-3">
-                                <a href="/admin/packages" class="btn btn-outline-primary w-100">
-                                    <i class="fas fa-list me-2"></i>Manage Packages
-                                </a>
-                            </div>
-                            <div class="col-md-3 mb-3">
-                                <a href="/admin/users" class="btn btn-outline-success w-100">
-                                    <i class="fas fa-users me-2"></i>Manage Users
-                                </a>
-                            </div>
-                            <div class="col-md-3 mb-3">
-                                <a href="/" class="btn btn-outline-info w-100" target="_blank">
-                                    <i class="fas fa-globe me-2"></i>View Website
-                                </a>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <style>
-    .border-left-primary { border-left: .25rem solid #4e73df!important; }
-    .border-left-success { border-left: .25rem solid #1cc88a!important; }
-    .border-left-info { border-left: .25rem solid #36b9cc!important; }
-    .border-left-warning { border-left: .25rem solid #f6c23e!important; }
-    </style>
-</body>
-</html>
-    """, stats=stats, session=session)
+    return render_template('admin_dashboard.html', stats=stats, session=session)
 
 @app.route('/auth/logout')
 def auth_logout():
@@ -1938,212 +558,33 @@ def auth_logout():
 def profile():
     """User profile page"""
     from flask import session
-    if not session.get('user_id'):
+    if not g.user_id:
         return redirect('/auth/login')
     
-    user_id = session.get('user_id')
+    user_id = g.user_id
     user_name = session.get('user_name')
     user_email = session.get('user_email')
     
-    return render_template_string("""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>My Profile - Apni Holidays</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-</head>
-<body>
-    <nav class="navbar navbar-expand-lg navbar-light bg-white shadow-sm">
-        <div class="container">
-            <a class="navbar-brand fw-bold" href="/">
-                <i class="fas fa-plane text-primary"></i> Apni Holidays
-            </a>
-            <div class="navbar-nav ms-auto">
-                <a class="nav-link" href="/">
-                    <i class="fas fa-home me-1"></i>Home
-                </a>
-                <a class="nav-link" href="/auth/logout">
-                    <i class="fas fa-sign-out-alt me-1"></i>Logout
-                </a>
-            </div>
-        </div>
-    </nav>
-
-    <div class="container py-5">
-        <div class="row">
-            <div class="col-md-8 mx-auto">
-                <div class="card shadow">
-                    <div class="card-header bg-primary text-white">
-                        <h4 class="mb-0">
-                            <i class="fas fa-user me-2"></i>My Profile
-                        </h4>
-                    </div>
-                    <div class="card-body p-4">
-                        <div class="row">
-                            <div class="col-md-6 mb-3">
-                                <label class="form-label fw-bold">Name</label>
-                                <p class="form-control-plaintext">{{ user_name }}</p>
-                            </div>
-                            <div class="col-md-6 mb-3">
-                                <label class="form-label fw-bold">Email</label>
-                                <p class="form-control-plaintext">{{ user_email }}</p>
-                            </div>
-                            <div class="col-md-6 mb-3">
-                                <label class="form-label fw-bold">User ID</label>
-                                <p class="form-control-plaintext">{{ user_id }}</p>
-                            </div>
-                            <div class="col-md-6 mb-3">
-                                <label class="form-label fw-bold">Account Status</label>
-                                <p class="form-control-plaintext">
-                                    <span class="badge bg-success">Active</span>
-                                </p>
-                            </div>
-                        </div>
-                        
-                        <div class="mt-4">
-                            <a href="/my-bookings" class="btn btn-primary me-2">
-                                <i class="fas fa-suitcase me-2"></i>View My Bookings
-                            </a>
-                            <a href="/packages" class="btn btn-outline-primary">
-                                <i class="fas fa-plane me-2"></i>Browse Packages
-                            </a>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-</body>
-</html>
-    """, user_name=user_name, user_email=user_email, user_id=user_id)
+    return render_template('profile.html', user_name=user_name, user_email=user_email, user_id=user_id)
 
 @app.route('/my-bookings')
 def my_bookings():
     """User bookings page"""
     from flask import session
-    if not session.get('user_id'):
+    if not g.user_id:
         return redirect('/auth/login')
     
-    user_id = session.get('user_id')
+    user_id = g.user_id
     user_name = session.get('user_name')
     
-    # Get user bookings
+    # Get user bookings, with their packages fetched in one batch
     try:
-        conn = get_db_connection()
-        bookings = []
-        if conn:
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT b.id, b.traveler_name, b.traveler_email, b.number_of_travelers,
-                       b.travel_date, b.total_amount, b.booking_status, b.created_at,
-                       p.title, p.destination, p.days
-                FROM bookings b
-                LEFT JOIN packages p ON b.package_id = p.id
-                WHERE b.user_id = %s
-                ORDER BY b.created_at DESC
-            """, (user_id,))
-            bookings = cur.fetchall()
-            cur.close()
-            conn.close()
+        bookings = get_bookings(user_id=user_id)
     except Exception as e:
         print(f"Error fetching bookings: {e}")
         bookings = []
     
-    return render_template_string("""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>My Bookings - Apni Holidays</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-</head>
-<body>
-    <nav class="navbar navbar-expand-lg navbar-light bg-white shadow-sm">
-        <div class="container">
-            <a class="navbar-brand fw-bold" href="/">
-                <i class="fas fa-plane text-primary"></i> Apni Holidays
-            </a>
-            <div class="navbar-nav ms-auto">
-                <a class="nav-link" href="/">
-                    <i class="fas fa-home me-1"></i>Home
-                </a>
-                <a class="nav-link" href="/profile">
-                    <i class="fas fa-user me-1"></i>Profile
-                </a>
-                <a class="nav-link" href="/auth/logout">
-                    <i class="fas fa-sign-out-alt me-1"></i>Logout
-                </a>
-            </div>
-        </div>
-    </nav>
-
-    <div class="container py-5">
-        <div class="row">
-            <div class="col-12">
-                <div class="d-flex justify-content-between align-items-center mb-4">
-                    <h2><i class="fas fa-suitcase me-2"></i>My Bookings</h2>
-                    <a href="/packages" class="btn btn-primary">
-                        <i class="fas fa-plus me-2"></i>Book New Trip
-                    </a>
-                </div>
-                
-                {% if bookings %}
-                <div class="row">
-                    {% for booking in bookings %}
-                    <div class="col-lg-6 mb-4">
-                        <div class="card shadow-sm">
-                            <div class="card-header d-flex justify-content-between align-items-center">
-                                <h6 class="mb-0">{{ booking[8] }}</h6>
-                                <span class="badge {% if booking[6] == 'confirmed' %}bg-success{% elif booking[6] == 'pending' %}bg-warning{% else %}bg-secondary{% endif %}">
-                                    {{ booking[6].title() }}
-                                </span>
-                            </div>
-                            <div class="card-body">
-                                <p class="mb-2">
-                                    <i class="fas fa-map-marker-alt text-primary me-2"></i>
-                                    {{ booking[9] }} ({{ booking[10] }} days)
-                                </p>
-                                <p class="mb-2">
-                                    <i class="fas fa-calendar text-primary me-2"></i>
-                                    Travel Date: {{ booking[4] }}
-                                </p>
-                                <p class="mb-2">
-                                    <i class="fas fa-users text-primary me-2"></i>
-                                    Travelers: {{ booking[3] }}
-                                </p>
-                                <p class="mb-2">
-                                    <i class="fas fa-rupee-sign text-primary me-2"></i>
-                                    Total: ₹{{ "{:,.0f}".format(booking[5]) }}
-                                </p>
-                                <small class="text-muted">
-                                    Booking ID: {{ booking[0] }} | Booked on: {{ booking[7].strftime('%d %b %Y') }}
-                                </small>
-                            </div>
-                        </div>
-                    </div>
-                    {% endfor %}
-                </div>
-                {% else %}
-                <div class="text-center py-5">
-                    <i class="fas fa-suitcase fa-3x text-muted mb-3"></i>
-                    <h4>No bookings yet</h4>
-                    <p class="text-muted mb-4">Start planning your next adventure!</p>
-                    <a href="/packages" class="btn btn-primary btn-lg">
-                        <i class="fas fa-plane me-2"></i>Browse Travel Packages
-                    </a>
-                </div>
-                {% endif %}
-            </div>
-        </div>
-    </div>
-</body>
-</html>
-    """, bookings=bookings, user_name=user_name)
+    return render_template('my_bookings.html', bookings=bookings, user_name=user_name)
 
 # Admin routes for package management
 
@@ -2157,148 +598,17 @@ def admin_logout():
 @app.route('/admin/packages')
 def admin_packages():
     """Admin packages management"""
-    from flask import session
-    if not session.get('is_admin'):
+    if not g.is_admin:
         return redirect('/admin/login')
     
-    # Get all packages from Firestore
-    try:
-        packages = get_packages()
-        # Sort by created_at descending - handle different date types
-        packages.sort(key=lambda x: x.get('created_at', datetime.min) if isinstance(x.get('created_at'), datetime) else datetime.min, reverse=True)
-    except Exception as e:
-        print(f"Error fetching admin packages: {e}")
-        packages = []
-    
-    return render_template_string("""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Manage Packages - Admin Panel</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-</head>
-<body>
-    <nav class="navbar navbar-expand-lg navbar-dark bg-dark">
-        <div class="container">
-            <a class="navbar-brand fw-bold" href="/admin/dashboard">
-                <i class="fas fa-cog me-2"></i>Admin Panel
-            </a>
-            <div class="navbar-nav ms-auto">
-                <a class="nav-link" href="/admin/dashboard">Dashboard</a>
-                <a class="nav-link" href="/admin/logout">
-                    <i class="fas fa-sign-out-alt me-1"></i>Logout
-                </a>
-            </div>
-        </div>
-    </nav>
-
-    <div class="container-fluid py-4">
-        <div class="d-flex justify-content-between align-items-center mb-4">
-            <h2>Manage Packages</h2>
-            <a href="/admin/packages/add" class="btn btn-primary">
-                <i class="fas fa-plus me-2"></i>Add New Package
-            </a>
-        </div>
-        
-        <div class="card shadow">
-            <div class="card-body">
-                <div class="table-responsive">
-                    <table class="table table-hover">
-                        <thead class="table-dark">
-                            <tr>
-                                <th>ID</th>
-                                <th>Title</th>
-                                <th>Destination</th>
-                                <th>Days</th>
-                                <th>Price</th>
-                                <th>Status</th>
-                                <th>Featured</th>
-                                <th>Actions</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            {% for package in packages %}
-                            <tr>
-                                <td>{{ package.id }}</td>
-                                <td>{{ package.title }}</td>
-                                <td>{{ package.destination }}</td>
-                                <td>{{ package.days }} days</td>
-                                <td>
-                                    {% if package.discount_price %}
-                                        <span class="text-decoration-line-through text-muted">₹{{ "{:,.0f}".format(package.price) }}</span><br>
-                                        <strong>₹{{ "{:,.0f}".format(package.discount_price) }}</strong>
-                                    {% else %}
-                                        <strong>₹{{ "{:,.0f}".format(package.price) }}</strong>
-                                    {% endif %}
-                                </td>
-                                <td>
-                                    <span class="badge {% if package.status == 'active' %}bg-success{% else %}bg-secondary{% endif %}">
-                                        {{ package.status.title() }}
-                                    </span>
-                                </td>
-                                <td>
-                                    <span class="badge {% if package.featured %}bg-warning text-dark{% else %}bg-light text-dark{% endif %}">
-                                        {% if package.featured %}Featured{% else %}Regular{% endif %}
-                                    </span>
-                                </td>
-                                <td>
-                                    <div class="btn-group" role="group">
-                                        <a href="/admin/packages/edit/{{ package.id }}" class="btn btn-sm btn-outline-primary">
-                                            <i class="fas fa-edit"></i>
-                                        </a>
-                                        <button class="btn btn-sm btn-outline-danger" onclick="deletePackage({{ package.id }})">
-                                            <i class="fas fa-trash"></i>
-                                        </button>
-                                        <a href="/package-details?id={{ package.id }}" class="btn btn-sm btn-outline-info" target="_blank">
-                                            <i class="fas fa-eye"></i>
-                                        </a>
-                                    </div>
-                                </td>
-                            </tr>
-                            {% endfor %}
-                        </tbody>
-                    </table>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <script>
-    function deletePackage(packageId) {
-        if (confirm('Are you sure you want to delete this package?')) {
-            fetch('/admin/packages/delete/' + packageId, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                }
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.success) {
-                    location.reload();
-                } else {
-                    alert('Error deleting package: ' + data.message);
-                }
-            })
-            .catch(error => {
-                console.error('Error:', error);
-                alert('Error deleting package');
-            });
-        }
-    }
-    </script>
-</body>
-</html>
-    """, packages=packages)
+    # Stream packages straight from Firestore, newest first, as rows are rendered
+    return stream_page('admin_packages.html', packages=iter_packages())
 
 @app.route('/admin/packages/delete/<package_id>', methods=['POST'])
 def admin_delete_package(package_id):
     """Delete package"""
-    from flask import session, jsonify
-    if not session.get('is_admin'):
+    from flask import jsonify
+    if not g.is_admin:
         return jsonify({'success': False, 'message': 'Unauthorized'})
     
     try:
@@ -2314,8 +624,7 @@ def admin_delete_package(package_id):
 @app.route('/admin/packages/add', methods=['GET', 'POST'])
 def admin_add_package():
     """Add new package"""
-    from flask import session
-    if not session.get('is_admin'):
+    if not g.is_admin:
         return redirect('/admin/login')
     
     if request.method == 'POST':
@@ -2366,528 +675,76 @@ def admin_add_package():
             print(f"Error adding package: {e}")
             return f"Error adding package: {e}", 500
     
-    return render_template_string("""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Add Package - Admin Panel</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-</head>
-<body>
-    <nav class="navbar navbar-expand-lg navbar-dark bg-dark">
-        <div class="container">
-            <a class="navbar-brand fw-bold" href="/admin/dashboard">
-                <i class="fas fa-cog me-2"></i>Admin Panel
-            </a>
-            <div class="navbar-nav ms-auto">
-                <a class="nav-link" href="/admin/packages">Back to Packages</a>
-                <a class="nav-link" href="/admin/logout">Logout</a>
-            </div>
-        </div>
-    </nav>
-
-    <div class="container py-4">
-        <h2 class="mb-4">Add New Package</h2>
-        
-        <div class="card shadow">
-            <div class="card-body">
-                <form method="POST">
-                    <div class="row">
-                        <div class="col-md-6 mb-3">
-                            <label class="form-label">Package Title *</label>
-                            <input type="text" class="form-control" name="title" required>
-                        </div>
-                        <div class="col-md-6 mb-3">
-                            <label class="form-label">Destination *</label>
-                            <input type="text" class="form-control" name="destination" required>
-                        </div>
-                        <div class="col-md-4 mb-3">
-                            <label class="form-label">Duration (Days) *</label>
-                            <input type="number" class="form-control" name="days" required>
-                        </div>
-                        <div class="col-md-4 mb-3">
-                            <label class="form-label">Price (₹) *</label>
-                            <input type="number" class="form-control" name="price" step="0.01" required>
-                        </div>
-                        <div class="col-md-4 mb-3">
-                            <label class="form-label">Discount Price (₹)</label>
-                            <input type="number" class="form-control" name="discount_price" step="0.01">
-                        </div>
-                        <div class="col-12 mb-3">
-                            <label class="form-label">Image URL *</label>
-                            <input type="url" class="form-control" name="image_url" required>
-                        </div>
-                        <div class="col-12 mb-3">
-                            <label class="form-label">Description *</label>
-                            <textarea class="form-control" name="description" rows="4" required></textarea>
-                        </div>
-                        <div class="col-12 mb-3">
-                            <label class="form-label">Highlights (comma separated)</label>
-                            <textarea class="form-control" name="highlights" rows="3"></textarea>
-                        </div>
-                        <div class="col-md-6 mb-3">
-                            <label class="form-label">Inclusions (comma separated)</label>
-                            <textarea class="form-control" name="inclusions" rows="4"></textarea>
-                        </div>
-                        <div class="col-md-6 mb-3">
-                            <label class="form-label">Exclusions (comma separated)</label>
-                            <textarea class="form-control" name="exclusions" rows="4"></textarea>
-                        </div>
-                        <div class="col-12 mb-3">
-                            <label class="form-label">Itinerary (one day per line)</label>
-                            <textarea class="form-control" name="itinerary" rows="6"></textarea>
-                        </div>
-                        <div class="col-12 mb-3">
-                            <div class="form-check">
-                                <input class="form-check-input" type="checkbox" name="featured" id="featured">
-                                <label class="form-check-label" for="featured">
-                                    Mark as Featured Package
-                                </label>
-                            </div>
-                        </div>
-                    </div>
-                    
-                    <div class="text-end">
-                        <a href="/admin/packages" class="btn btn-secondary me-2">Cancel</a>
-                        <button type="submit" class="btn btn-primary">
-                            <i class="fas fa-save me-2"></i>Save Package
-                        </button>
-                    </div>
-                </form>
-            </div>
-        </div>
-    </div>
-</body>
-</html>
-    """)
+    return render_template('admin_add_package.html')
 
 @app.route('/admin/users')
 def admin_users():
     """Admin users management"""
-    from flask import session
-    if not session.get('is_admin'):
+    if not g.is_admin:
         return redirect('/admin/login')
     
-    # Get all users from Firestore
-    try:
-        users = get_all_users()
-        # Convert date objects to strings for template rendering and sort safely
-        for user in users:
-            if user.get('created_at'):
-                if hasattr(user['created_at'], 'strftime'):
-                    user['created_at_str'] = user['created_at'].strftime('%d %b %Y')
-                elif isinstance(user['created_at'], str):
-                    user['created_at_str'] = user['created_at']
-                else:
-                    user['created_at_str'] = 'N/A'
+    # Stream users from Firestore (ordered by name) and format each row as it is rendered
+    def user_rows():
+        for user in iter_users():
+            created_at = user.get('created_at')
+            if created_at and hasattr(created_at, 'strftime'):
+                user['created_at_str'] = created_at.strftime('%d %b %Y')
+            elif created_at and isinstance(created_at, str):
+                user['created_at_str'] = created_at
             else:
                 user['created_at_str'] = 'N/A'
-                
-        # Sort users by name instead of date to avoid timezone comparison issues
-        try:
-            users.sort(key=lambda x: str(x.get('name', '')).lower(), reverse=False)
-        except Exception as sort_error:
-            print(f"Sort error: {sort_error}")
-            # If sorting fails, just use the list as-is
-    except Exception as e:
-        print(f"Error fetching users: {e}")
-        users = []
+            yield user
     
-    return render_template_string("""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Manage Users - Admin Panel</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-</head>
-<body>
-    <nav class="navbar navbar-expand-lg navbar-dark bg-dark">
-        <div class="container">
-            <a class="navbar-brand fw-bold" href="/admin/dashboard">
-                <i class="fas fa-cog me-2"></i>Admin Panel
-            </a>
-            <div class="navbar-nav ms-auto">
-                <a class="nav-link" href="/admin/dashboard">Dashboard</a>
-                <a class="nav-link" href="/admin/logout">Logout</a>
-            </div>
-        </div>
-    </nav>
-
-    <div class="container-fluid py-4">
-        <div class="d-flex justify-content-between align-items-center mb-4">
-            <h2>Manage Users</h2>
-            <div>
-                <button class="btn btn-success me-2" onclick="showAddUserModal()">
-                    <i class="fas fa-plus me-2"></i>Add New User
-                </button>
-                <button class="btn btn-info" onclick="showAdminUsersModal()">
-                    <i class="fas fa-shield-alt me-2"></i>Manage Admins
-                </button>
-            </div>
-        </div>
-        
-        <div class="card shadow">
-            <div class="card-body">
-                <div class="table-responsive">
-                    <table class="table table-hover">
-                        <thead class="table-dark">
-                            <tr>
-                                <th>ID</th>
-                                <th>Name</th>
-                                <th>Email</th>
-                                <th>Phone</th>
-                                <th>Registration Date</th>
-                                <th>Status</th>
-                                <th>Actions</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            {% for user in users %}
-                            <tr>
-                                <td>{{ user.id }}</td>
-                                <td>{{ user.name }}</td>
-                                <td>{{ user.email }}</td>
-                                <td>{{ user.phone or 'N/A' }}</td>
-                                <td>{{ user.created_at_str }}</td>
-                                <td>
-                                    <span class="badge {% if user.status == 'active' %}bg-success{% else %}bg-secondary{% endif %}">
-                                        {{ user.status.title() }}
-                                    </span>
-                                </td>
-                                <td>
-                                    <div class="btn-group" role="group">
-                                        <button class="btn btn-sm btn-outline-primary" onclick="editUser('{{ user.id }}', '{{ user.name }}', '{{ user.email }}', '{{ user.phone or '' }}', '{{ user.status }}')" title="Edit User">
-                                            <i class="fas fa-edit"></i>
-                                        </button>
-                                        <button class="btn btn-sm btn-outline-warning" onclick="toggleUserStatus('{{ user.id }}', '{{ user.status }}')" title="Toggle Status">
-                                            <i class="fas fa-toggle-on"></i>
-                                        </button>
-                                        <button class="btn btn-sm btn-outline-info" onclick="promoteToAdmin('{{ user.id }}', '{{ user.name }}', '{{ user.email }}')" title="Make Admin">
-                                            <i class="fas fa-shield-alt"></i>
-                                        </button>
-                                        <button class="btn btn-sm btn-outline-danger" onclick="deleteUser('{{ user.id }}', '{{ user.name }}')" title="Delete User">
-                                            <i class="fas fa-trash"></i>
-                                        </button>
-                                    </div>
-                                </td>
-                            </tr>
-                            {% endfor %}
-                        </tbody>
-                    </table>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <!-- Add User Modal -->
-    <div class="modal fade" id="addUserModal" tabindex="-1">
-        <div class="modal-dialog">
-            <div class="modal-content">
-                <div class="modal-header">
-                    <h5 class="modal-title">Add New User</h5>
-                    <button type="button" class="btn-close" data-bs-dismiss="modal"></button>
-                </div>
-                <div class="modal-body">
-                    <form id="addUserForm">
-                        <div class="mb-3">
-                            <label class="form-label">Name *</label>
-                            <input type="text" class="form-control" name="name" required>
-                        </div>
-                        <div class="mb-3">
-                            <label class="form-label">Email *</label>
-                            <input type="email" class="form-control" name="email" required>
-                        </div>
-                        <div class="mb-3">
-                            <label class="form-label">Phone</label>
-                            <input type="tel" class="form-control" name="phone">
-                        </div>
-                        <div class="mb-3">
-                            <label class="form-label">Password *</label>
-                            <input type="password" class="form-control" name="password" required>
-                        </div>
-                        <div class="mb-3">
-                            <label class="form-label">Status</label>
-                            <select class="form-select" name="status">
-                                <option value="active">Active</option>
-                                <option value="inactive">Inactive</option>
-                            </select>
-                        </div>
-                    </form>
-                </div>
-                <div class="modal-footer">
-                    <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">Cancel</button>
-                    <button type="button" class="btn btn-success" onclick="submitAddUser()">Add User</button>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <!-- Edit User Modal -->
-    <div class="modal fade" id="editUserModal" tabindex="-1">
-        <div class="modal-dialog">
-            <div class="modal-content">
-                <div class="modal-header">
-                    <h5 class="modal-title">Edit User</h5>
-                    <button type="button" class="btn-close" data-bs-dismiss="modal"></button>
-                </div>
-                <div class="modal-body">
-                    <form id="editUserForm">
-                        <input type="hidden" name="user_id">
-                        <div class="mb-3">
-                            <label class="form-label">Name *</label>
-                            <input type="text" class="form-control" name="name" required>
-                        </div>
-                        <div class="mb-3">
-                            <label class="form-label">Email *</label>
-                            <input type="email" class="form-control" name="email" required>
-                        </div>
-                        <div class="mb-3">
-                            <label class="form-label">Phone</label>
-                            <input type="tel" class="form-control" name="phone">
-                        </div>
-                        <div class="mb-3">
-                            <label class="form-label">Status</label>
-                            <select class="form-select" name="status">
-                                <option value="active">Active</option>
-                                <option value="inactive">Inactive</option>
-                            </select>
-                        </div>
-                    </form>
-                </div>
-                <div class="modal-footer">
-                    <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">Cancel</button>
-                    <button type="button" class="btn btn-primary" onclick="submitEditUser()">Update User</button>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <!-- Admin Users Modal -->
-    <div class="modal fade" id="adminUsersModal" tabindex="-1">
-        <div class="modal-dialog modal-lg">
-            <div class="modal-content">
-                <div class="modal-header">
-                    <h5 class="modal-title">Manage Admin Users</h5>
-                    <button type="button" class="btn-close" data-bs-dismiss="modal"></button>
-                </div>
-                <div class="modal-body">
-                    <div id="adminUsersList">Loading...</div>
-                </div>
-                <div class="modal-footer">
-                    <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">Close</button>
-                </div>
-            </div>
-        </div>
-    </div>
+    return stream_page('admin_users.html', users=user_rows())
 
-    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
-    <script>
-    // Show Add User Modal
-    function showAddUserModal() {
-        new bootstrap.Modal(document.getElementById('addUserModal')).show();
-    }
-    
-    // Submit Add User Form
-    function submitAddUser() {
-        const form = document.getElementById('addUserForm');
-        const formData = new FormData(form);
-        
-        fetch('/admin/users/add', {
-            method: 'POST',
-            body: formData
-        })
-        .then(response => response.json())
-        .then(data => {
-            if (data.success) {
-                location.reload();
-            } else {
-                alert('Error adding user: ' + data.message);
-            }
-        })
-        .catch(error => {
-            console.error('Error:', error);
-            alert('Error adding user');
-        });
-    }
-    
-    // Edit User
-    function editUser(userId, name, email, phone, status) {
-        const form = document.getElementById('editUserForm');
-        form.querySelector('[name="user_id"]').value = userId;
-        form.querySelector('[name="name"]').value = name;
-        form.querySelector('[name="email"]').value = email;
-        form.querySelector('[name="phone"]').value = phone;
-        form.querySelector('[name="status"]').value = status;
-        
-        new bootstrap.Modal(document.getElementById('editUserModal')).show();
-    }
-    
-    // Submit Edit User Form
-    function submitEditUser() {
-        const form = document.getElementById('editUserForm');
-        const formData = new FormData(form);
-        const userId = formData.get('user_id');
-        
-        fetch('/admin/users/edit/' + userId, {
-            method: 'POST',
-            body: formData
-        })
-        .then(response => response.json())
-        .then(data => {
-            if (data.success) {
-                location.reload();
-            } else {
-                alert('Error updating user: ' + data.message);
-            }
-        })
-        .catch(error => {
-            console.error('Error:', error);
-            alert('Error updating user');
-        });
-    }
-    
-    // Toggle User Status
-    function toggleUserStatus(userId, currentStatus) {
-        const newStatus = currentStatus === 'active' ? 'inactive' : 'active';
-        if (confirm('Are you sure you want to ' + newStatus + ' this user?')) {
-            fetch('/admin/users/toggle/' + userId, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({status: newStatus})
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.success) {
-                    location.reload();
-                } else {
-                    alert('Error updating user status: ' + data.message);
-                }
-            })
-            .catch(error => {
-                console.error('Error:', error);
-                alert('Error updating user status');
-            });
-        }
-    }
+@app.route('/admin/timing')
+def admin_timing():
+    """Per-route timing histograms for this worker"""
+    if not g.is_admin:
+        return jsonify({'success': False, 'message': 'Unauthorized'})
     
-    // Promote User to Admin
-    function promoteToAdmin(userId, name, email) {
-        if (confirm('Are you sure you want to promote ' + name + ' to admin?')) {
-            fetch('/admin/users/promote/' + userId, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({name: name, email: email})
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.success) {
-                    alert('User promoted to admin successfully!');
-                    location.reload();
-                } else {
-                    alert('Error promoting user: ' + data.message);
-                }
-            })
-            .catch(error => {
-                console.error('Error:', error);
-                alert('Error promoting user');
-            });
-        }
-    }
+    return jsonify({'success': True, 'pid': os.getpid(), 'routes': dump_timings()})
+
+@app.route('/admin/bookings')
+def admin_bookings():
+    """Latest bookings with their packages"""
+    if not g.is_admin:
+        return jsonify({'success': False, 'message': 'Unauthorized'})
     
-    // Delete User
-    function deleteUser(userId, name) {
-        if (confirm('Are you sure you want to delete user: ' + name + '? This action cannot be undone!')) {
-            fetch('/admin/users/delete/' + userId, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                }
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.success) {
-                    location.reload();
-                } else {
-                    alert('Error deleting user: ' + data.message);
-                }
-            })
-            .catch(error => {
-                console.error('Error:', error);
-                alert('Error deleting user');
-            });
-        }
-    }
+    bookings = get_bookings(limit=min(request.args.get('limit', 100, type=int), 500))
+    return jsonify({'success': True, 'bookings': [_booking_json(b) for b in bookings]})
+
+@app.route('/admin/inquiries')
+def admin_inquiries():
+    """Inquiry inbox with the packages asked about"""
+    if not g.is_admin:
+        return jsonify({'success': False, 'message': 'Unauthorized'})
     
-    // Show Admin Users Modal
-    function showAdminUsersModal() {
-        fetch('/admin/users/admins')
-        .then(response => response.json())
-        .then(data => {
-            let html = '<div class="table-responsive"><table class="table table-sm"><thead><tr><th>Name</th><th>Email</th><th>Role</th><th>Status</th><th>Actions</th></tr></thead><tbody>';
-            data.admins.forEach(admin => {
-                html += `<tr>
-                    <td>${admin.name}</td>
-                    <td>${admin.email}</td>
-                    <td><span class="badge bg-primary">${admin.role}</span></td>
-                    <td><span class="badge ${admin.status === 'active' ? 'bg-success' : 'bg-secondary'}">${admin.status}</span></td>
-                    <td>
-                        <button class="btn btn-sm btn-outline-warning" onclick="toggleAdminStatus(${admin.id}, '${admin.status}')">
-                            <i class="fas fa-toggle-on"></i>
-                        </button>
-                    </td>
-                </tr>`;
-            });
-            html += '</tbody></table></div>';
-            document.getElementById('adminUsersList').innerHTML = html;
-        })
-        .catch(error => {
-            document.getElementById('adminUsersList').innerHTML = '<div class="alert alert-danger">Error loading admin users</div>';
-        });
-        
-        new bootstrap.Modal(document.getElementById('adminUsersModal')).show();
-    }
+    inquiries = get_inquiries(status=request.args.get('status') or None,
+                              limit=min(request.args.get('limit', 100, type=int), 500))
+    return jsonify({'success': True, 'inquiries': [_booking_json(i) for i in inquiries]})
+
+def _booking_json(row):
+    """A booking or inquiry for JSON, with a short summary of its package"""
+    package = row.get('package')
+    row = project({k: v for k, v in row.items() if k != 'package'})
+    row['package'] = project(package, ['title', 'destination', 'days']) if package else None
+    return row
+
+@app.route('/admin/cache-stats')
+def admin_cache_stats():
+    """Hit/miss counters of this worker's caches"""
+    if not g.is_admin:
+        return jsonify({'success': False, 'message': 'Unauthorized'})
     
-    // Toggle Admin Status
-    function toggleAdminStatus(adminId, currentStatus) {
-        const newStatus = currentStatus === 'active' ? 'inactive' : 'active';
-        if (confirm('Are you sure you want to ' + newStatus + ' this admin?')) {
-            fetch('/admin/users/admin-toggle/' + adminId, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({status: newStatus})
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.success) {
-                    showAdminUsersModal(); // Refresh the modal
-                } else {
-                    alert('Error updating admin status: ' + data.message);
-                }
-            });
-        }
-    }
-    </script>
-</body>
-</html>
-    """, users=users)
+    return jsonify({'success': True, 'pid': os.getpid(), 'pages': page_cache.stats(),
+                    'users': user_cache_stats(), 'user_writes': user_write_stats(),
+                    'login_throttle': throttle_stats(), **package_cache_stats()})
 
 @app.route('/admin/packages/edit/<package_id>', methods=['GET', 'POST'])
 def admin_edit_package(package_id):
     """Edit package"""
-    from flask import session
-    if not session.get('is_admin'):
+    if not g.is_admin:
         return redirect('/admin/login')
     
     if request.method == 'POST':
@@ -2959,117 +816,13 @@ def admin_edit_package(package_id):
     if not package:
         return redirect('/admin/packages')
     
-    return render_template_string("""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Edit Package - Admin Panel</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-</head>
-<body>
-    <nav class="navbar navbar-expand-lg navbar-dark bg-dark">
-        <div class="container">
-            <a class="navbar-brand fw-bold" href="/admin/dashboard">
-                <i class="fas fa-cog me-2"></i>Admin Panel
-            </a>
-            <div class="navbar-nav ms-auto">
-                <a class="nav-link" href="/admin/packages">Back to Packages</a>
-                <a class="nav-link" href="/admin/logout">Logout</a>
-            </div>
-        </div>
-    </nav>
-
-    <div class="container py-4">
-        <h2 class="mb-4">Edit Package: {{ package.title }}</h2>
-        
-        <div class="card shadow">
-            <div class="card-body">
-                <form method="POST">
-                    <div class="row">
-                        <div class="col-md-6 mb-3">
-                            <label class="form-label">Package Title *</label>
-                            <input type="text" class="form-control" name="title" value="{{ package.title }}" required>
-                        </div>
-                        <div class="col-md-6 mb-3">
-                            <label class="form-label">Destination *</label>
-                            <input type="text" class="form-control" name="destination" value="{{ package.destination }}" required>
-                        </div>
-                        <div class="col-md-3 mb-3">
-                            <label class="form-label">Duration (Days) *</label>
-                            <input type="number" class="form-control" name="days" value="{{ package.days }}" required>
-                        </div>
-                        <div class="col-md-3 mb-3">
-                            <label class="form-label">Price (₹) *</label>
-                            <input type="number" class="form-control" name="price" value="{{ package.price }}" step="0.01" required>
-                        </div>
-                        <div class="col-md-3 mb-3">
-                            <label class="form-label">Discount Price (₹)</label>
-                            <input type="number" class="form-control" name="discount_price" value="{{ package.discount_price or '' }}" step="0.01">
-                        </div>
-                        <div class="col-md-3 mb-3">
-                            <label class="form-label">Status</label>
-                            <select class="form-control" name="status">
-                                <option value="active" {{ 'selected' if package.status == 'active' else '' }}>Active</option>
-                                <option value="inactive" {{ 'selected' if package.status == 'inactive' else '' }}>Inactive</option>
-                                <option value="draft" {{ 'selected' if package.status == 'draft' else '' }}>Draft</option>
-                            </select>
-                        </div>
-                        <div class="col-12 mb-3">
-                            <label class="form-label">Image URL *</label>
-                            <input type="url" class="form-control" name="image_url" value="{{ package.image_url }}" required>
-                        </div>
-                        <div class="col-12 mb-3">
-                            <label class="form-label">Description *</label>
-                            <textarea class="form-control" name="description" rows="4" required>{{ package.description }}</textarea>
-                        </div>
-                        <div class="col-12 mb-3">
-                            <label class="form-label">Highlights (comma separated)</label>
-                            <textarea class="form-control" name="highlights" rows="3">{{ package.highlights or '' }}</textarea>
-                        </div>
-                        <div class="col-md-6 mb-3">
-                            <label class="form-label">Inclusions (comma separated)</label>
-                            <textarea class="form-control" name="inclusions" rows="4">{{ package.inclusions or '' }}</textarea>
-                        </div>
-                        <div class="col-md-6 mb-3">
-                            <label class="form-label">Exclusions (comma separated)</label>
-                            <textarea class="form-control" name="exclusions" rows="4">{{ package.exclusions or '' }}</textarea>
-                        </div>
-                        <div class="col-12 mb-3">
-                            <label class="form-label">Itinerary (one day per line)</label>
-                            <textarea class="form-control" name="itinerary" rows="6">{{ package.itinerary or '' }}</textarea>
-                        </div>
-                        <div class="col-12 mb-3">
-                            <div class="form-check">
-                                <input class="form-check-input" type="checkbox" name="featured" id="featured" {{ 'checked' if package.featured else '' }}>
-                                <label class="form-check-label" for="featured">
-                                    Mark as Featured Package
-                                </label>
-                            </div>
-                        </div>
-                    </div>
-                    
-                    <div class="text-end">
-                        <a href="/admin/packages" class="btn btn-secondary me-2">Cancel</a>
-                        <button type="submit" class="btn btn-primary">
-                            <i class="fas fa-save me-2"></i>Update Package
-                        </button>
-                    </div>
-                </form>
-            </div>
-        </div>
-    </div>
-</body>
-</html>
-    """, package=package)
+    return render_template('admin_edit_package.html', package=package)
 
 @app.route('/admin/users/toggle/<user_id>', methods=['POST'])
 def admin_toggle_user_status(user_id):
     """Toggle user status"""
-    from flask import session, jsonify
-    if not session.get('is_admin'):
+    from flask import jsonify
+    if not g.is_admin:
         return jsonify({'success': False, 'message': 'Unauthorized'})
     
     try:
@@ -3089,13 +842,13 @@ def admin_toggle_user_status(user_id):
 @app.route('/admin/users/add', methods=['POST'])
 def admin_add_user():
     """Add new user"""
-    from flask import session, jsonify
-    if not session.get('is_admin'):
+    from flask import jsonify
+    if not g.is_admin:
         return jsonify({'success': False, 'message': 'Unauthorized'})
     
     try:
         name = request.form.get('name')
-        email = request.form.get('email')
+        email = normalize_email(request.form.get('email'))
         phone = request.form.get('phone', '')
         status = request.form.get('status', 'active')
         
@@ -3108,7 +861,7 @@ def admin_add_user():
             return jsonify({'success': False, 'message': 'Email already exists'})
         
         # Create new user with default password
-        password_hash = generate_password_hash('Rajesh@123')
+        password_hash = hash_password('Rajesh@123')
         user_id = f"usr_{int(datetime.now().timestamp())}"
         
         user_data = {
@@ -3116,7 +869,7 @@ def admin_add_user():
             'name': name,
             'email': email,
             'phone': phone,
-            'password': password_hash,
+            'password_hash': password_hash,
             'status': status,
             'role': 'user',
             'created_at': datetime.now(),
@@ -3124,12 +877,14 @@ def admin_add_user():
         }
         
         # Add user to Firestore
-        success = create_user(user_data)
+        success = add_user(user_data)
         if success:
             return jsonify({'success': True, 'message': 'User added successfully with password: Rajesh@123'})
         else:
             return jsonify({'success': False, 'message': 'Failed to create user'})
             
+    except HashingBusy:
+        return jsonify({'success': False, 'message': BUSY_MESSAGE})
     except Exception as e:
         print(f"Error adding user: {e}")
         return jsonify({'success': False, 'message': str(e)})
@@ -3137,14 +892,14 @@ def admin_add_user():
 @app.route('/admin/users/update', methods=['POST'])
 def admin_update_user():
     """Update user"""
-    from flask import session, jsonify
-    if not session.get('is_admin'):
+    from flask import jsonify
+    if not g.is_admin:
         return jsonify({'success': False, 'message': 'Unauthorized'})
     
     try:
         user_id = request.form.get('user_id')
         name = request.form.get('name')
-        email = request.form.get('email')
+        email = normalize_email(request.form.get('email'))
         phone = request.form.get('phone', '')
         status = request.form.get('status', 'active')
         
@@ -3177,8 +932,8 @@ def admin_update_user():
 @app.route('/admin/users/delete/<user_id>', methods=['POST'])
 def admin_delete_user(user_id):
     """Delete user"""
-    from flask import session, jsonify
-    if not session.get('is_admin'):
+    from flask import jsonify
+    if not g.is_admin:
         return jsonify({'success': False, 'message': 'Unauthorized'})
     
     try:
@@ -3195,8 +950,8 @@ def admin_delete_user(user_id):
 @app.route('/admin/users/promote/<user_id>', methods=['POST'])
 def admin_promote_user(user_id):
     """Promote user to admin"""
-    from flask import session, jsonify
-    if not session.get('is_admin'):
+    from flask import jsonify
+    if not g.is_admin:
         return jsonify({'success': False, 'message': 'Unauthorized'})
     
     try:
@@ -3242,8 +997,8 @@ def admin_promote_user(user_id):
 @app.route('/admin/users/admins')
 def admin_get_admins():
     """Get all admin users"""
-    from flask import session, jsonify
-    if not session.get('is_admin'):
+    from flask import jsonify
+    if not g.is_admin:
         return jsonify({'success': False, 'message': 'Unauthorized'})
     
     try:
@@ -3272,8 +1027,8 @@ def admin_get_admins():
 @app.route('/admin/users/admin-toggle/<int:admin_id>', methods=['POST'])
 def admin_toggle_admin_status(admin_id):
     """Toggle admin status"""
-    from flask import session, jsonify
-    if not session.get('is_admin'):
+    from flask import jsonify
+    if not g.is_admin:
         return jsonify({'success': False, 'message': 'Unauthorized'})
     
     try:
@@ -3295,6 +1050,8 @@ def admin_toggle_admin_status(admin_id):
         return jsonify({'success': False, 'message': str(e)})
 
 
+# Compile all page templates once per worker instead of on every request
+precompile_templates(app)
 
 if __name__ == "__main__":
     debug_mode = os.environ.get("FLASK_DEBUG", "false").lower() == "true"
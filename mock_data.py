@@ -175,4 +175,8 @@ USERS = [
         'created_at': datetime.now(),
         'last_login': None
     }
-]
\ No newline at end of file
+]
+
+# Bookings and inquiries made while running on mock data (kept in memory)
+BOOKINGS = []
+INQUIRIES = []
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Password hashing for Apni Holidays
+Runs password hashing and verification (hash_policy.py) in a small per-worker
+process pool, so a burst of logins occupies at most HASH_POOL_SIZE cores
+and leaves the worker's GIL free for other requests. Once HASH_QUEUE_LIMIT
+hashes are in flight further calls fail fast with HashingBusy instead of
+queueing behind them.
+
+The calling thread still waits for its hash, so the worker only keeps
+serving other requests meanwhile when it has spare threads: run gunicorn
+with --worker-class gthread (see Procfile).
+"""
+
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from hash_policy import check_hash, generate_hash
+
+HASH_POOL_SIZE = int(os.environ.get("HASH_POOL_SIZE", "2"))  # 0 hashes inline
+HASH_QUEUE_LIMIT = int(os.environ.get("HASH_QUEUE_LIMIT", "8"))  # Running + waiting
+HASH_TIMEOUT = float(os.environ.get("HASH_TIMEOUT", "5"))
+
+
+class HashingBusy(Exception):
+    """Too many hashes in flight; the caller should ask the client to retry"""
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(HASH_QUEUE_LIMIT, 1))
+
+
+def _get_pool():
+    global _pool, _pool_pid
+    with _pool_lock:
+        # gunicorn forks workers after import, each needs its own pool. By
+        # then the worker runs Firestore, listener and write-behind threads,
+        # so pool processes come from a clean forkserver rather than a fork
+        # of the worker. (Under "python main.py" they import main.py once.)
+        if _pool is None or _pool_pid != os.getpid():
+            context = multiprocessing.get_context('forkserver')
+            context.set_forkserver_preload(['hash_policy'])
+            _pool = ProcessPoolExecutor(max_workers=HASH_POOL_SIZE, mp_context=context)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
+def _run(func, *args):
+    if HASH_POOL_SIZE <= 0:
+        return func(*args)
+    if not _slots.acquire(blocking=False):
+        raise HashingBusy()
+    try:
+        future = _get_pool().submit(func, *args)
+    except BrokenProcessPool:
+        _slots.release()
+        _reset_pool()
+        raise
+    except Exception:
+        _slots.release()
+        raise
+    # Freed when the hash really finishes, even if we stop waiting for it
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=HASH_TIMEOUT)
+    except FutureTimeout:
+        raise HashingBusy()
+    except BrokenProcessPool:
+        _reset_pool()
+        raise
+
+
+def verify_password(stored_hash, password):
+    """check_hash() on the pool; raises HashingBusy when saturated"""
+    if not stored_hash or not password:
+        return False
+    return _run(check_hash, stored_hash, password)
+
+
+def hash_password(password):
+    """generate_hash() under the configured policy, on the pool; raises
+    HashingBusy when saturated"""
+    return _run(generate_hash, password)
+
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Full-page response cache for Apni Holidays
+Serves the shared catalog pages from memory, invalidated on package writes
+"""
+
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+from urllib.parse import urlencode
+from flask import request, make_response
+from werkzeug.http import is_resource_modified
+
+from firestore_utils import on_package_change
+from compression import encode_response
+
+PAGE_CACHE_SIZE = int(os.environ.get("PAGE_CACHE_SIZE", "512"))
+# Safety net for writes made by other workers, which only invalidate their own cache
+PAGE_CACHE_TTL = int(os.environ.get("PAGE_CACHE_TTL", "300"))
+
+
+class ResponseCache:
+    """Thread-safe LRU of rendered pages keyed by normalized path and query.
+
+    ``generation`` is bumped by clear(), so a page rendered before an
+    invalidation can be dropped instead of stored.
+    """
+
+    def __init__(self, max_entries=PAGE_CACHE_SIZE, ttl=PAGE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry['stored_at'] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, entry, generation=None):
+        """Store ``entry``, unless the cache was cleared since ``generation``"""
+        entry['stored_at'] = time.monotonic()
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+page_cache = ResponseCache()
+
+# Any package write can change every listing page, so drop the whole cache
+on_package_change(lambda package_id: page_cache.clear())
+
+
+def make_cache_key(path, args, params):
+    """Normalize path and the query params the page actually uses.
+
+    Empty values are dropped and params are sorted, so /packages?destination=
+    and /packages share an entry, and tracking params (utm_*, fbclid, ...)
+    never fragment the cache.
+    """
+    path = path.rstrip('/') or '/'
+    query = sorted((name, args.get(name, '').strip()) for name in params)
+    query = urlencode([(name, value) for name, value in query if value])
+    return f"{path}?{query}" if query else path
+
+
+def cached_page(*params):
+    """Cache the view's response and serve it to every visitor.
+
+    Only for pages that render no per-user state; the navbar is filled in
+    client-side from /api/session-nav. ``params`` lists the query
+    parameters that change the page output.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+
+            key = make_cache_key(request.path, request.args, params)
+            entry = page_cache.get(key)
+            if entry is not None:
+                if entry['etag']:
+                    not_modified = conditional_response(entry['etag'], entry['last_modified'])
+                    if not_modified is not None:
+                        return not_modified
+                response = make_response(entry['body'])
+                response.content_type = entry['content_type']
+                if entry['etag']:
+                    set_validators(response, entry['etag'], entry['last_modified'])
+                response.headers['X-Cache'] = 'HIT'
+                return encode_response(response, entry['encoded'])
+
+            # A package write during rendering clears the cache; don't then
+            # store the page rendered from the old catalog
+            generation = page_cache.generation
+            response = make_response(view(*args, **kwargs))
+            response.headers['X-Cache'] = 'MISS'
+            if response.status_code == 200 and not response.direct_passthrough:
+                entry = {
+                    'body': response.get_data(),
+                    'content_type': response.content_type,
+                    'etag': response.get_etag()[0],
+                    'last_modified': response.last_modified,
+                    'encoded': {},  # compressed bodies by Content-Encoding
+                }
+                page_cache.set(key, entry, generation)
+                encode_response(response, entry['encoded'])
+            return response
+        return wrapper
+    return decorator
+
+
+# ------------------ Conditional GET ------------------
+
+def package_validators(packages, extra=''):
+    """ETag and Last-Modified for a page built from ``packages``.
+
+    Last-Modified is the newest ``updated_at`` in the result set. The ETag
+    also covers the package ids, so a package dropping out of the result
+    set changes it, plus any ``extra`` state the page depends on.
+    """
+    last_modified = None
+    parts = [str(extra)]
+    for pkg in packages:
+        updated = pkg.get('updated_at') or pkg.get('created_at')
+        if isinstance(updated, datetime):
+            if updated.tzinfo is not None:
+                updated = updated.astimezone(timezone.utc).replace(tzinfo=None)
+            if last_modified is None or updated > last_modified:
+                last_modified = updated
+        parts.append(f"{pkg.get('id')}@{updated}")
+    etag = hashlib.sha1('|'.join(parts).encode()).hexdigest()
+    return etag, last_modified
+
+
+def set_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Let clients keep the page but revalidate it on every visit
+    response.cache_control.no_cache = True
+    return response
+
+
+def conditional_response(etag, last_modified):
+    """Return a 304 response if the client's copy is current, else None"""
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return set_validators(make_response('', 304), etag, last_modified)
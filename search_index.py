@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Full-text package search for Apni Holidays
+Inverted index over package text with BM25 ranking, phrase and prefix matching
+"""
+
+import re
+import math
+import heapq
+import threading
+from bisect import bisect_left
+
+from catalog import matches_conditions
+from firestore_utils import get_package_catalog
+
+# Indexed summary fields and their weight (term frequency multiplier);
+# search_text is the full description and itinerary (catalog.search_text)
+SEARCH_FIELDS = {
+    'title': 3.0,
+    'destination': 3.0,
+    'highlights': 2.0,
+    'search_text': 1.0,
+}
+# Position gap between fields so a phrase can't match across two of them
+FIELD_GAP = 1000
+# Cap on how many index terms a single prefix may expand to
+MAX_PREFIX_EXPANSIONS = 50
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(str(text).lower()) if text else []
+
+
+def parse_query(query):
+    """Split a query into phrases (lists of tokens).
+
+    "quoted text" is a phrase; every other word is a one-token phrase.
+    Words are matched as prefixes, so "thai" also finds "thailand".
+    """
+    phrases = []
+    for quoted, word in _QUERY_RE.findall(query or ''):
+        tokens = tokenize(quoted if quoted else word)
+        if tokens:
+            phrases.append(tokens)
+    return phrases
+
+
+class PackageSearchIndex:
+    """Inverted index kept in step with the package catalog.
+
+    ``sync`` re-tokenizes only the packages that were added, removed or
+    whose indexed fields changed. Reloads that rebuild every package dict
+    (mock mode, the CATALOG_TTL path) therefore cost one comparison per
+    package rather than a full rebuild.
+    """
+
+    def __init__(self):
+        self.postings = {}      # term -> {package_id: [positions]}
+        self.weights = {}       # term -> {package_id: weighted term frequency}
+        self.doc_terms = {}     # package_id -> set of terms, for removal
+        self.doc_lengths = {}   # package_id -> weighted length
+        self.total_length = 0.0
+        self.sorted_terms = None
+        self._indexed = {}      # package_id -> package dict that was indexed
+        self._fingerprints = {}  # package_id -> indexed field values
+        self._source = None
+        self._lock = threading.Lock()
+
+    # ---- maintenance ----
+
+    def _remove(self, package_id):
+        for term in self.doc_terms.pop(package_id, ()):
+            self.postings[term].pop(package_id, None)
+            self.weights[term].pop(package_id, None)
+            if not self.postings[term]:
+                del self.postings[term]
+                del self.weights[term]
+                self.sorted_terms = None
+        self.total_length -= self.doc_lengths.pop(package_id, 0.0)
+        self._indexed.pop(package_id, None)
+        self._fingerprints.pop(package_id, None)
+
+    def _add(self, package_id, package):
+        terms = set()
+        length = 0.0
+        offset = 0
+        for field, weight in SEARCH_FIELDS.items():
+            tokens = tokenize(package.get(field))
+            for i, token in enumerate(tokens):
+                if token not in self.postings:
+                    self.postings[token] = {}
+                    self.weights[token] = {}
+                    self.sorted_terms = None
+                self.postings[token].setdefault(package_id, []).append(offset + i)
+                self.weights[token][package_id] = self.weights[token].get(package_id, 0.0) + weight
+                terms.add(token)
+            length += weight * len(tokens)
+            offset += len(tokens) + FIELD_GAP
+        self.doc_terms[package_id] = terms
+        self.doc_lengths[package_id] = length
+        self.total_length += length
+        self._indexed[package_id] = package
+        self._fingerprints[package_id] = _fingerprint(package)
+
+    def sync(self, catalog):
+        """Bring the index in line with ``catalog`` (id -> package dict)"""
+        if catalog is self._source:
+            return
+        for package_id in [pid for pid in self._indexed if pid not in catalog]:
+            self._remove(package_id)
+        for package_id, package in catalog.items():
+            indexed = self._indexed.get(package_id)
+            if indexed is package:
+                continue
+            if indexed is not None and self._fingerprints[package_id] == _fingerprint(package):
+                self._indexed[package_id] = package
+                continue
+            self._remove(package_id)
+            self._add(package_id, package)
+        self._source = catalog
+
+    # ---- querying ----
+
+    def _expand(self, token, allow_prefix):
+        """Index terms matching ``token``: itself, plus longer terms it prefixes"""
+        if not allow_prefix:
+            return [token] if token in self.postings else []
+        if self.sorted_terms is None:
+            self.sorted_terms = sorted(self.postings)
+        terms = []
+        i = bisect_left(self.sorted_terms, token)
+        while i < len(self.sorted_terms) and self.sorted_terms[i].startswith(token):
+            terms.append(self.sorted_terms[i])
+            if len(terms) >= MAX_PREFIX_EXPANSIONS:
+                break
+            i += 1
+        return terms
+
+    def _phrase_matches(self, phrase):
+        """package_id -> matched terms for a phrase of two or more tokens
+        (AND of its tokens in order)"""
+        # Exact tokens in sequence, except the last one which may be a prefix
+        term_lists = [self._expand(token, allow_prefix=(i == len(phrase) - 1))
+                      for i, token in enumerate(phrase)]
+        if not all(term_lists):
+            return {}
+        matches = {}
+        for last_term in term_lists[-1]:
+            terms = [tl[0] for tl in term_lists[:-1]] + [last_term]
+            candidates = set(self.postings[terms[0]])
+            for term in terms[1:]:
+                candidates &= self.postings[term].keys()
+            for package_id in candidates:
+                starts = set(self.postings[terms[0]][package_id])
+                for k, term in enumerate(terms[1:], 1):
+                    starts &= {p - k for p in self.postings[term][package_id]}
+                    if not starts:
+                        break
+                if starts:
+                    matches.setdefault(package_id, []).extend(terms)
+        return matches
+
+    def _idf(self, term):
+        n = len(self._indexed)
+        df = len(self.postings[term])
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def _bm25(self, term, package_id, avg_length, idf=None):
+        tf = self.weights[term][package_id]
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[package_id] / avg_length)
+        return (idf if idf is not None else self._idf(term)) * tf * (BM25_K1 + 1) / (tf + norm)
+
+    def _phrase_scores(self, phrase, avg_length, candidates=None):
+        """package_id -> BM25 score of one phrase, for the packages it matches
+        (only those in ``candidates``, when given)"""
+        scores = {}
+        if len(phrase) == 1:
+            # Scored straight off the postings, once per matching term
+            lengths = self.doc_lengths
+            for term in self._expand(phrase[0], allow_prefix=True):
+                idf = self._idf(term) * (BM25_K1 + 1)
+                weights = self.weights[term]
+                if candidates is not None and len(candidates) < len(weights):
+                    weights = {pid: weights[pid] for pid in candidates if pid in weights}
+                for package_id, tf in weights.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[package_id] / avg_length)
+                    scores[package_id] = scores.get(package_id, 0.0) + idf * tf / (tf + norm)
+            return scores
+        for package_id, terms in self._phrase_matches(phrase).items():
+            if candidates is None or package_id in candidates:
+                scores[package_id] = sum(self._bm25(term, package_id, avg_length) for term in set(terms))
+        return scores
+
+    def _match_estimate(self, phrase):
+        """Upper bound on how many packages a phrase can match"""
+        return min(sum(len(self.postings[term]) for term in self._expand(token, allow_prefix=True))
+                   for token in phrase)
+
+    def search(self, query, catalog=None):
+        """package_id -> BM25 score for the packages matching every phrase"""
+        phrases = parse_query(query)
+        if not phrases:
+            return {}
+        with self._lock:
+            self.sync(catalog if catalog is not None else get_package_catalog())
+            if not self._indexed:
+                return {}
+
+            avg_length = (self.total_length / len(self._indexed)) or 1.0
+            scores = None
+            # Rarest phrase first, so the others only score its matches
+            for phrase in sorted(phrases, key=self._match_estimate):
+                phrase_scores = self._phrase_scores(phrase, avg_length, scores)
+                if scores is None:
+                    scores = phrase_scores
+                else:
+                    scores = {package_id: score + phrase_scores[package_id]
+                              for package_id, score in scores.items() if package_id in phrase_scores}
+                if not scores:
+                    return {}
+        return scores
+
+
+def _fingerprint(package):
+    return tuple(package.get(field) for field in SEARCH_FIELDS)
+
+
+package_index = PackageSearchIndex()
+
+
+def relevance_key(scores):
+    """Sort key for search results: best score first, then by id"""
+    return lambda pkg: (-scores[pkg['id']], str(pkg['id']))
+
+
+def _valid_relevance_key(after):
+    """True for a (negated score, id) pair as built by relevance_key()"""
+    if not isinstance(after, (tuple, list)) or len(after) != 2:
+        return False
+    score, package_id = after
+    if isinstance(score, bool) or not isinstance(score, (int, float)):
+        return False
+    return isinstance(package_id, str) and not math.isnan(score)
+
+
+def search_packages(query, filters=(), limit=None, after=None, catalog=None):
+    """Catalog packages matching ``query`` and the (field, op, value)
+    ``filters``, best match first.
+
+    Returns (packages, scores) where scores maps package id to its BM25
+    score. With ``limit``, only the best ``limit`` packages ranked after
+    the ``after`` relevance key are returned: matches come off a heap in
+    rank order and are checked against ``filters`` only until the page is
+    full, instead of filtering and sorting every match. Raises ValueError
+    unless ``after`` is a (negated score, id) relevance key.
+    """
+    if after is not None and not _valid_relevance_key(after):
+        raise ValueError(f"Invalid search cursor: {after!r}")
+    if catalog is None:
+        catalog = get_package_catalog()
+    scores = package_index.search(query, catalog)
+    ranked = [(-score, str(package_id), package_id) for package_id, score in scores.items()]
+    if after is not None:
+        after = tuple(after)
+        ranked = [entry for entry in ranked if entry[:2] > after]
+    if limit is None:
+        ranked.sort()
+        entries = iter(ranked)
+    else:
+        heapq.heapify(ranked)
+        entries = (heapq.heappop(ranked) for _ in range(len(ranked)))
+
+    results = []
+    for _, _, package_id in entries:
+        package = catalog.get(package_id)
+        if package is not None and matches_conditions(package, filters):
+            results.append(package)
+            if limit is not None and len(results) >= limit:
+                break
+    return results, scores
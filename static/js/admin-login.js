@@ -0,0 +1,43 @@
+// Initialize Firebase
+firebase.initializeApp(firebaseConfig);
+const auth = firebase.auth();
+
+// Admin Google sign-in
+document.getElementById('adminGoogleSignInBtn').addEventListener('click', function() {
+    console.log('Admin - Current domain:', window.location.hostname);
+    console.log('Admin - Current origin:', window.location.origin);
+    const provider = new firebase.auth.GoogleAuthProvider();
+    auth.signInWithPopup(provider)
+        .then((result) => {
+            const user = result.user;
+            // Send user data to backend for admin verification
+            fetch('/admin/google-login', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    uid: user.uid,
+                    email: user.email,
+                    name: user.displayName,
+                    photo: user.photoURL
+                })
+            })
+            .then(response => response.json())
+            .then(data => {
+                if (data.status === 'success') {
+                    window.location.href = '/admin/dashboard';
+                } else {
+                    alert('Admin login failed: ' + data.message);
+                }
+            })
+            .catch((error) => {
+                console.error('Error:', error);
+                alert('Admin login failed. Please try again.');
+            });
+        })
+        .catch((error) => {
+            console.error('Google sign-in error:', error);
+            alert('Google sign-in failed: ' + error.message);
+        });
+});
@@ -0,0 +1,22 @@
+function deletePackage(packageId) {
+    if (confirm('Are you sure you want to delete this package?')) {
+        fetch('/admin/packages/delete/' + packageId, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            }
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                location.reload();
+            } else {
+                alert('Error deleting package: ' + data.message);
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            alert('Error deleting package');
+        });
+    }
+}
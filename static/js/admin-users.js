@@ -0,0 +1,190 @@
+// Show Add User Modal
+function showAddUserModal() {
+    new bootstrap.Modal(document.getElementById('addUserModal')).show();
+}
+
+// Submit Add User Form
+function submitAddUser() {
+    const form = document.getElementById('addUserForm');
+    const formData = new FormData(form);
+
+    fetch('/admin/users/add', {
+        method: 'POST',
+        body: formData
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            location.reload();
+        } else {
+            alert('Error adding user: ' + data.message);
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('Error adding user');
+    });
+}
+
+// Edit User
+function editUser(userId, name, email, phone, status) {
+    const form = document.getElementById('editUserForm');
+    form.querySelector('[name="user_id"]').value = userId;
+    form.querySelector('[name="name"]').value = name;
+    form.querySelector('[name="email"]').value = email;
+    form.querySelector('[name="phone"]').value = phone;
+    form.querySelector('[name="status"]').value = status;
+
+    new bootstrap.Modal(document.getElementById('editUserModal')).show();
+}
+
+// Submit Edit User Form
+function submitEditUser() {
+    const form = document.getElementById('editUserForm');
+    const formData = new FormData(form);
+    const userId = formData.get('user_id');
+
+    fetch('/admin/users/edit/' + userId, {
+        method: 'POST',
+        body: formData
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            location.reload();
+        } else {
+            alert('Error updating user: ' + data.message);
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('Error updating user');
+    });
+}
+
+// Toggle User Status
+function toggleUserStatus(userId, currentStatus) {
+    const newStatus = currentStatus === 'active' ? 'inactive' : 'active';
+    if (confirm('Are you sure you want to ' + newStatus + ' this user?')) {
+        fetch('/admin/users/toggle/' + userId, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({status: newStatus})
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                location.reload();
+            } else {
+                alert('Error updating user status: ' + data.message);
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            alert('Error updating user status');
+        });
+    }
+}
+
+// Promote User to Admin
+function promoteToAdmin(userId, name, email) {
+    if (confirm('Are you sure you want to promote ' + name + ' to admin?')) {
+        fetch('/admin/users/promote/' + userId, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({name: name, email: email})
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                alert('User promoted to admin successfully!');
+                location.reload();
+            } else {
+                alert('Error promoting user: ' + data.message);
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            alert('Error promoting user');
+        });
+    }
+}
+
+// Delete User
+function deleteUser(userId, name) {
+    if (confirm('Are you sure you want to delete user: ' + name + '? This action cannot be undone!')) {
+        fetch('/admin/users/delete/' + userId, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            }
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                location.reload();
+            } else {
+                alert('Error deleting user: ' + data.message);
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            alert('Error deleting user');
+        });
+    }
+}
+
+// Show Admin Users Modal
+function showAdminUsersModal() {
+    fetch('/admin/users/admins')
+    .then(response => response.json())
+    .then(data => {
+        let html = '<div class="table-responsive"><table class="table table-sm"><thead><tr><th>Name</th><th>Email</th><th>Role</th><th>Status</th><th>Actions</th></tr></thead><tbody>';
+        data.admins.forEach(admin => {
+            html += `<tr>
+                <td>${admin.name}</td>
+                <td>${admin.email}</td>
+                <td><span class="badge bg-primary">${admin.role}</span></td>
+                <td><span class="badge ${admin.status === 'active' ? 'bg-success' : 'bg-secondary'}">${admin.status}</span></td>
+                <td>
+                    <button class="btn btn-sm btn-outline-warning" onclick="toggleAdminStatus(${admin.id}, '${admin.status}')">
+                        <i class="fas fa-toggle-on"></i>
+                    </button>
+                </td>
+            </tr>`;
+        });
+        html += '</tbody></table></div>';
+        document.getElementById('adminUsersList').innerHTML = html;
+    })
+    .catch(error => {
+        document.getElementById('adminUsersList').innerHTML = '<div class="alert alert-danger">Error loading admin users</div>';
+    });
+
+    new bootstrap.Modal(document.getElementById('adminUsersModal')).show();
+}
+
+// Toggle Admin Status
+function toggleAdminStatus(adminId, currentStatus) {
+    const newStatus = currentStatus === 'active' ? 'inactive' : 'active';
+    if (confirm('Are you sure you want to ' + newStatus + ' this admin?')) {
+        fetch('/admin/users/admin-toggle/' + adminId, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({status: newStatus})
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                showAdminUsersModal(); // Refresh the modal
+            } else {
+                alert('Error updating admin status: ' + data.message);
+            }
+        });
+    }
+}
@@ -0,0 +1,21 @@
+document.getElementById('bookingForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+    const formData = new FormData(this);
+
+    try {
+        const response = await fetch('/booking', {
+            method: 'POST',
+            body: formData
+        });
+        const result = await response.json();
+
+        if (result.status === 'success') {
+            alert('Booking submitted successfully! Booking ID: ' + result.booking_id + '. Total amount: ₹' + result.total_amount.toLocaleString());
+            this.reset();
+        } else {
+            alert('Booking failed: ' + result.message);
+        }
+    } catch (error) {
+        alert('Failed to submit booking. Please try again.');
+    }
+});
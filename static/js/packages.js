@@ -0,0 +1,60 @@
+// Apni Holidays package listing
+// The page links to the next page of results; with JavaScript the next
+// page is fetched and appended when the link scrolls into view.
+
+document.addEventListener('DOMContentLoaded', function() {
+    initInfiniteScroll();
+});
+
+function initInfiniteScroll() {
+    const pager = document.getElementById('package-pager');
+    if (!pager || !('IntersectionObserver' in window)) {
+        return;
+    }
+
+    let loading = false;
+    const observer = new IntersectionObserver(entries => {
+        if (entries[0].isIntersecting && !loading) {
+            loading = true;
+            loadNextPage(observer).finally(() => {
+                loading = false;
+            });
+        }
+    }, { rootMargin: '400px' });
+    observer.observe(pager);
+}
+
+function loadNextPage(observer) {
+    const link = document.getElementById('load-more-packages');
+    if (!link) {
+        observer.disconnect();
+        return Promise.resolve();
+    }
+
+    return fetch(link.href, { credentials: 'same-origin' })
+        .then(response => response.text())
+        .then(html => {
+            const page = new DOMParser().parseFromString(html, 'text/html');
+            const grid = document.getElementById('package-grid');
+            const newCards = page.querySelectorAll('#package-grid > *');
+            newCards.forEach(card => grid.appendChild(document.importNode(card, true)));
+
+            const count = document.getElementById('package-count');
+            if (count) {
+                count.textContent = grid.children.length;
+            }
+
+            const nextLink = page.getElementById('load-more-packages');
+            if (nextLink) {
+                link.setAttribute('href', nextLink.getAttribute('href'));
+            } else {
+                document.getElementById('package-pager').remove();
+                observer.disconnect();
+            }
+        })
+        .catch(error => {
+            // Leave the link in place as a plain "next page" fallback
+            console.error('Package page error:', error);
+            observer.disconnect();
+        });
+}
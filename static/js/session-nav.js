@@ -0,0 +1,25 @@
+// Apni Holidays session navbar
+// Public pages are rendered once for every visitor with the logged-out
+// navbar; this swaps in the user's dropdown from /api/session-nav.
+
+document.addEventListener('DOMContentLoaded', function() {
+    loadSessionNav();
+});
+
+function loadSessionNav() {
+    const nav = document.getElementById('session-nav');
+    if (!nav) {
+        return;
+    }
+
+    fetch('/api/session-nav', { credentials: 'same-origin' })
+        .then(response => response.json())
+        .then(data => {
+            if (data.logged_in) {
+                nav.innerHTML = data.html;
+            }
+        })
+        .catch(error => {
+            console.error('Session nav error:', error);
+        });
+}
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Template registry for Apni Holidays
+Compiles every page template in templates/ once per worker at startup
+"""
+
+from flask import Response, current_app, stream_with_context
+
+
+def precompile_templates(app):
+    """Compile all page templates into the app's Jinja cache.
+
+    Flask keeps compiled templates in ``app.jinja_env.cache`` keyed by name,
+    so once a page is loaded here ``render_template`` only renders it.
+    Outside debug mode ``auto_reload`` is off and the cache is never
+    revalidated against the files on disk.
+    """
+    env = app.jinja_env
+    names = env.list_templates(extensions=['html'])
+
+    # Make sure the cache can hold every page so none gets evicted and recompiled
+    if env.cache is not None and getattr(env.cache, 'capacity', len(names)) < len(names):
+        from jinja2.utils import LRUCache
+        env.cache = LRUCache(len(names) * 2)
+
+    compiled = {}
+    for name in names:
+        try:
+            compiled[name] = env.get_template(name)
+        except Exception as e:
+            print(f"Error compiling template {name}: {e}")
+    print(f"✅ Precompiled {len(compiled)} page templates")
+    return compiled
+
+
+def stream_page(name, buffer_size=20, **context):
+    """Render a precompiled page as a streamed response.
+
+    Output is flushed every ``buffer_size`` template chunks, so the page
+    shell goes out with the first few table rows and the rest follows as
+    the template consumes its (lazy) context.
+    """
+    app = current_app._get_current_object()
+    template = app.jinja_env.get_template(name)
+    app.update_template_context(context)
+    stream = template.stream(context)
+    stream.enable_buffering(buffer_size)
+    return Response(stream_with_context(stream), mimetype='text/html')
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Request timing for Apni Holidays
+Splits each request into Firestore time, template render time and total,
+reported as a Server-Timing header and kept as per-route histograms.
+"""
+
+import os
+import time
+import inspect
+import threading
+from bisect import bisect_left
+from functools import wraps
+from flask import g, request, has_app_context, before_render_template, template_rendered
+
+TIMING_ENABLED = os.environ.get("SERVER_TIMING", "true").lower() == "true"
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open-ended
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+METRICS = ('db', 'render', 'total')
+
+_histograms = {}
+_lock = threading.Lock()
+
+
+def _current():
+    """The timing record of the current request, if any"""
+    if has_app_context():
+        return g.get('_timing')
+    return None
+
+
+def timed_db(func):
+    """Count the time spent in a Firestore helper towards the request's db time.
+
+    Generators are timed per item, so documents streamed into a response
+    after the view has returned are still counted. Helpers called from
+    another timed helper are already inside its time, so only the
+    outermost call counts.
+    """
+    if inspect.isgeneratorfunction(func):
+        @wraps(func)
+        def gen_wrapper(*args, **kwargs):
+            record = _current()
+            iterator = func(*args, **kwargs)
+            while True:
+                outermost = record is not None and record['db_depth'] == 0
+                if record is not None:
+                    record['db_depth'] += 1
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    if record is not None:
+                        record['db_depth'] -= 1
+                        if outermost:
+                            record['db'] += time.perf_counter() - start
+                yield item
+        return gen_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        record = _current()
+        if record is None or record['db_depth']:
+            return func(*args, **kwargs)
+        record['db_depth'] += 1
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record['db_depth'] -= 1
+            record['db'] += time.perf_counter() - start
+            record['db_calls'] += 1
+    return wrapper
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, value_ms):
+        self.counts[bisect_left(BUCKETS_MS, value_ms)] += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def to_dict(self):
+        count = sum(self.counts)
+        labels = [f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return {
+            'count': count,
+            'mean_ms': round(self.total_ms / count, 3) if count else 0,
+            'max_ms': round(self.max_ms, 3),
+            'buckets': [[label, n] for label, n in zip(labels, self.counts)],
+        }
+
+
+def record_timings(route, record):
+    with _lock:
+        route_histograms = _histograms.get(route)
+        if route_histograms is None:
+            route_histograms = _histograms[route] = {metric: Histogram() for metric in METRICS}
+        for metric in METRICS:
+            route_histograms[metric].add(record[metric] * 1000)
+
+
+def dump_timings():
+    """Snapshot of every route's histograms"""
+    with _lock:
+        return {route: {metric: h.to_dict() for metric, h in hists.items()}
+                for route, hists in sorted(_histograms.items())}
+
+
+def reset_timings():
+    with _lock:
+        _histograms.clear()
+
+
+# ------------------ Flask hooks ------------------
+
+def _start_request():
+    # db_depth: how many timed_db helpers are running, see timed_db()
+    g._timing = {'start': time.perf_counter(), 'db': 0.0, 'db_calls': 0, 'db_depth': 0,
+                 'render': 0.0, 'render_start': None, 'total': 0.0}
+
+
+def _start_render(sender, template, context, **extra):
+    record = _current()
+    if record is not None:
+        record['render_start'] = time.perf_counter()
+
+
+def _end_render(sender, template, context, **extra):
+    record = _current()
+    if record is not None and record['render_start'] is not None:
+        record['render'] += time.perf_counter() - record['render_start']
+        record['render_start'] = None
+
+
+def _finish_request(response):
+    record = g.get('_timing')
+    if record is None:
+        return response
+
+    record['total'] = time.perf_counter() - record['start']
+    response.headers['Server-Timing'] = (
+        f"db;desc=\"Firestore ({record['db_calls']} calls)\";dur={record['db'] * 1000:.2f}, "
+        f"render;dur={record['render'] * 1000:.2f}, "
+        f"total;dur={record['total'] * 1000:.2f}"
+    )
+
+    route = request.url_rule.rule if request.url_rule else '<unmatched>'
+    if response.is_streamed:
+        # The body is rendered (and the db queried) while it is sent, so
+        # record the histograms once the response has been fully written
+        def on_close():
+            record['total'] = time.perf_counter() - record['start']
+            record_timings(route, record)
+        response.call_on_close(on_close)
+    else:
+        record_timings(route, record)
+    return response
+
+
+def init_timing(app):
+    if not TIMING_ENABLED:
+        return
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    before_render_template.connect(_start_render, app)
+    template_rendered.connect(_end_render, app)
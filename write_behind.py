@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Write-behind buffer for Apni Holidays
+Coalesces small per-document field updates in memory and hands them to a
+flush function in batches, every WRITE_BEHIND_INTERVAL seconds or once
+WRITE_BEHIND_MAX_PENDING documents are waiting, and once more at exit.
+Only for fields where losing the last few seconds on a crash is acceptable
+(last_login and the like).
+"""
+
+import os
+import atexit
+import threading
+
+WRITE_BEHIND_INTERVAL = float(os.environ.get("WRITE_BEHIND_INTERVAL", "5"))
+WRITE_BEHIND_MAX_PENDING = int(os.environ.get("WRITE_BEHIND_MAX_PENDING", "200"))
+
+
+class WriteBehindBuffer:
+    """Pending field updates per key; later values for a field replace earlier ones.
+
+    ``flush_func`` receives a dict of key -> fields and should raise if
+    nothing was written, in which case the updates are kept for the next
+    flush (unless newer values arrived meanwhile).
+    """
+
+    def __init__(self, flush_func, interval=WRITE_BEHIND_INTERVAL, max_pending=WRITE_BEHIND_MAX_PENDING):
+        self.flush_func = flush_func
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread_pid = None
+        atexit.register(self.flush)
+
+    def add(self, key, fields):
+        with self._lock:
+            self._pending.setdefault(key, {}).update(fields)
+            full = len(self._pending) >= self.max_pending
+            self._ensure_thread()
+        if full:
+            self._wake.set()
+
+    def _ensure_thread(self):
+        # Threads don't survive gunicorn's fork, so start one per worker
+        if self._thread_pid != os.getpid():
+            self._thread_pid = os.getpid()
+            threading.Thread(target=self._run, name='write-behind', daemon=True).start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write everything pending now; returns the number of keys flushed"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            try:
+                self.flush_func(pending)
+                return len(pending)
+            except Exception as e:
+                print(f"Error flushing {len(pending)} buffered writes: {e}")
+                with self._lock:
+                    for key, fields in pending.items():
+                        # Keep newer values queued since the swap
+                        self._pending[key] = dict(fields, **self._pending.get(key, {}))
+                return 0
+
+    def stats(self):
+        with self._lock:
+            return {'pending': len(self._pending)}